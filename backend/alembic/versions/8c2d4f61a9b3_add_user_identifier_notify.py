@@ -0,0 +1,47 @@
+"""Notify on new or changed user identifiers.
+
+Revision ID: 8c2d4f61a9b3
+Revises: 5b1e9c2f7a40
+Create Date: 2026-10-16 11:02:17.284410
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8c2d4f61a9b3"
+down_revision: Union[str, None] = "5b1e9c2f7a40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_user_identifiers() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify(
+                'user_identifiers',
+                json_build_object('u', NEW.username, 'e', NEW.email)::text
+            );
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER users_notify_identifiers
+        AFTER INSERT OR UPDATE OF username, email ON users
+        FOR EACH ROW EXECUTE FUNCTION notify_user_identifiers()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS users_notify_identifiers ON users")
+    op.execute("DROP FUNCTION IF EXISTS notify_user_identifiers()")
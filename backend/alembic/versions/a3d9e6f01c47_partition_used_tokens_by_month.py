@@ -0,0 +1,151 @@
+"""Partition used_tokens by month on created_at.
+
+The existing table is not copied: it gets a (id, created_at) primary key and
+is attached as the historic partition `used_tokens_legacy`, covering
+everything before the first month boundary after the migration runs. That
+partition is retired as a whole once it passes the retention period.
+
+Revision ID: a3d9e6f01c47
+Revises: f2c7b8d41e05
+Create Date: 2026-10-16 16:21:40.518337
+
+"""
+
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a3d9e6f01c47"
+down_revision: Union[str, None] = "f2c7b8d41e05"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+INDEXES = (
+    "ix_used_tokens_token_hash",
+    "ix_used_tokens_issued",
+    "ix_used_tokens_user_purpose_status",
+    "ix_used_tokens_live_created_at",
+    "ix_used_tokens_created_at",
+)
+
+
+def _month(offset: int) -> datetime:
+    now = datetime.now(timezone.utc)
+    index = now.year * 12 + now.month - 1 + offset
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def _rename_index(name: str, table: str) -> None:
+    op.execute(f"ALTER INDEX {name} RENAME TO {name.replace('used_tokens', table)}")
+
+
+def _create_indexes() -> None:
+    op.create_index("ix_used_tokens_token_hash", "used_tokens", ["token_hash"])
+    op.create_index(
+        "ix_used_tokens_issued",
+        "used_tokens",
+        ["token_hash"],
+        postgresql_where=sa.text("status = 'ISSUED'"),
+        postgresql_include=["user_id", "purpose", "redeemed_at"],
+    )
+    op.create_index(
+        "ix_used_tokens_user_purpose_status",
+        "used_tokens",
+        ["user_id", "purpose", "status"],
+    )
+    op.create_index(
+        "ix_used_tokens_live_created_at",
+        "used_tokens",
+        ["created_at"],
+        postgresql_where=sa.text("status IN ('PENDING', 'ISSUED')"),
+    )
+    op.create_index("ix_used_tokens_created_at", "used_tokens", ["created_at"])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    cutover = _month(1)
+
+    # Turn the current table into a valid partition of the new parent
+    op.execute("LOCK TABLE used_tokens IN ACCESS EXCLUSIVE MODE")
+    op.execute("UPDATE used_tokens SET created_at = now() WHERE created_at IS NULL")
+    op.rename_table("used_tokens", "used_tokens_legacy")
+    op.alter_column("used_tokens_legacy", "created_at", nullable=False)
+    op.drop_constraint("used_tokens_pkey", "used_tokens_legacy", type_="primary")
+    op.create_primary_key(
+        "used_tokens_legacy_pkey", "used_tokens_legacy", ["id", "created_at"]
+    )
+    # Replaced by a plain index, so token_hash uniqueness is no longer enforced:
+    # a unique index must include the partition key, which would let the same
+    # hash in under another created_at. Tokens stay unique in practice since
+    # every JWT carries a random `jti` and opaque tokens are random
+    op.drop_index("ix_used_tokens_token_hash", table_name="used_tokens_legacy")
+    for name in INDEXES[1:]:
+        _rename_index(name, "used_tokens_legacy")
+
+    # Lets ATTACH PARTITION skip its validation scan
+    op.create_check_constraint(
+        "used_tokens_legacy_bound",
+        "used_tokens_legacy",
+        sa.text(f"created_at < '{cutover.isoformat()}'"),
+    )
+
+    # Copy the column definitions from the table as it exists
+    op.execute(
+        "CREATE TABLE used_tokens (LIKE used_tokens_legacy INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    op.create_primary_key("used_tokens_pkey", "used_tokens", ["id", "created_at"])
+    op.create_foreign_key(
+        "used_tokens_user_id_fkey", "used_tokens", "users", ["user_id"], ["id"]
+    )
+    # Matching indexes on the legacy table are attached rather than rebuilt
+    _create_indexes()
+
+    op.execute(
+        "ALTER TABLE used_tokens ATTACH PARTITION used_tokens_legacy "
+        f"FOR VALUES FROM (MINVALUE) TO ('{cutover.isoformat()}')"
+    )
+    op.drop_constraint("used_tokens_legacy_bound", "used_tokens_legacy")
+
+    for offset in range(1, MONTHS_AHEAD + 2):
+        lower, upper = _month(offset), _month(offset + 1)
+        op.execute(
+            f"CREATE TABLE used_tokens_p{lower:%Y_%m} PARTITION OF used_tokens "
+            f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+    op.execute("CREATE TABLE used_tokens_default PARTITION OF used_tokens DEFAULT")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.rename_table("used_tokens", "used_tokens_partitioned")
+    for name in INDEXES:
+        _rename_index(name, "used_tokens_partitioned")
+    for name in ("used_tokens_pkey", "used_tokens_user_id_fkey"):
+        op.execute(
+            f"ALTER TABLE used_tokens_partitioned RENAME CONSTRAINT {name} "
+            f"TO {name.replace('used_tokens', 'used_tokens_partitioned')}"
+        )
+
+    op.execute(
+        "CREATE TABLE used_tokens (LIKE used_tokens_partitioned INCLUDING DEFAULTS)"
+    )
+    op.create_primary_key("used_tokens_pkey", "used_tokens", ["id"])
+    op.create_foreign_key(
+        "used_tokens_user_id_fkey", "used_tokens", "users", ["user_id"], ["id"]
+    )
+    op.execute("INSERT INTO used_tokens SELECT * FROM used_tokens_partitioned")
+    op.drop_table("used_tokens_partitioned")
+
+    _create_indexes()
+    op.drop_index("ix_used_tokens_token_hash", table_name="used_tokens")
+    op.create_index(
+        "ix_used_tokens_token_hash", "used_tokens", ["token_hash"], unique=True
+    )
@@ -0,0 +1,39 @@
+"""Add failed login tracking to users.
+
+Revision ID: b41e7a0c93d2
+Revises: 8c2d4f61a9b3
+Create Date: 2026-10-16 12:26:03.918554
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b41e7a0c93d2"
+down_revision: Union[str, None] = "8c2d4f61a9b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "users",
+        sa.Column(
+            "failed_login_count", sa.Integer(), server_default="0", nullable=False
+        ),
+    )
+    op.add_column(
+        "users",
+        sa.Column("last_failed_login_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "last_failed_login_at")
+    op.drop_column("users", "failed_login_count")
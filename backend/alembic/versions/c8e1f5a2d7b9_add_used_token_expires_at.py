@@ -0,0 +1,34 @@
+"""Add expires_at to used_tokens for opaque one-time tokens.
+
+Revision ID: c8e1f5a2d7b9
+Revises: a3d9e6f01c47
+Create Date: 2026-10-16 18:42:11.204376
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c8e1f5a2d7b9"
+down_revision: Union[str, None] = "a3d9e6f01c47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable with no default: a metadata-only change on every partition.
+    # Existing rows keep NULL and are expired by `created_at` as before.
+    op.add_column(
+        "used_tokens",
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("used_tokens", "expires_at")
@@ -0,0 +1,32 @@
+"""Add users.locked_until so failed-login lockouts expire.
+
+Revision ID: d4b8a1f6e3c2
+Revises: c8e1f5a2d7b9
+Create Date: 2026-10-17 09:14:52.336108
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d4b8a1f6e3c2"
+down_revision: Union[str, None] = "c8e1f5a2d7b9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "users",
+        sa.Column("locked_until", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "locked_until")
@@ -0,0 +1,71 @@
+"""Store token hashes as bytea and add composite token indexes.
+
+Revision ID: e5a90d7b2c18
+Revises: b41e7a0c93d2
+Create Date: 2026-10-16 13:47:52.106392
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e5a90d7b2c18"
+down_revision: Union[str, None] = "b41e7a0c93d2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index(op.f("ix_used_tokens_token_hash"), table_name="used_tokens")
+    op.alter_column(
+        "used_tokens",
+        "token_hash",
+        type_=sa.LargeBinary(length=32),
+        existing_type=sa.String(),
+        existing_nullable=False,
+        postgresql_using="decode(token_hash, 'hex')",
+    )
+    op.create_index(
+        op.f("ix_used_tokens_token_hash"), "used_tokens", ["token_hash"], unique=True
+    )
+    op.create_index(
+        "ix_used_tokens_issued",
+        "used_tokens",
+        ["token_hash"],
+        unique=False,
+        postgresql_where=sa.text("status = 'ISSUED'"),
+        postgresql_include=["user_id", "purpose", "redeemed_at"],
+    )
+    op.create_index(
+        "ix_used_tokens_user_purpose_status",
+        "used_tokens",
+        ["user_id", "purpose", "status"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_used_tokens_user_purpose_status", table_name="used_tokens")
+    op.drop_index(
+        "ix_used_tokens_issued",
+        table_name="used_tokens",
+        postgresql_where=sa.text("status = 'ISSUED'"),
+    )
+    op.drop_index(op.f("ix_used_tokens_token_hash"), table_name="used_tokens")
+    op.alter_column(
+        "used_tokens",
+        "token_hash",
+        type_=sa.String(),
+        existing_type=sa.LargeBinary(length=32),
+        existing_nullable=False,
+        postgresql_using="encode(token_hash, 'hex')",
+    )
+    op.create_index(
+        op.f("ix_used_tokens_token_hash"), "used_tokens", ["token_hash"], unique=False
+    )
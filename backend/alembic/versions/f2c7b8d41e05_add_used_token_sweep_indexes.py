@@ -0,0 +1,55 @@
+"""Add used token indexes for the sweeper.
+
+Revision ID: f2c7b8d41e05
+Revises: e5a90d7b2c18
+Create Date: 2026-10-16 15:08:33.612904
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f2c7b8d41e05"
+down_revision: Union[str, None] = "e5a90d7b2c18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so a large used_tokens table keeps taking writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_used_tokens_live_created_at",
+            "used_tokens",
+            ["created_at"],
+            unique=False,
+            postgresql_where=sa.text("status IN ('PENDING', 'ISSUED')"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_used_tokens_created_at",
+            "used_tokens",
+            ["created_at"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_used_tokens_created_at",
+            table_name="used_tokens",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_used_tokens_live_created_at",
+            table_name="used_tokens",
+            postgresql_concurrently=True,
+        )
@@ -8,61 +8,131 @@ from starlette.responses import JSONResponse
 from app.constants.messages import Auth
 from app.core.config import settings
 from app.core.db import get_db
-from app.core.security import check_password, hash_password
+from app.core.limiting import limiter
+from app.core.security import check_password_async, needs_rehash
 from app.core.tokens.base import create_token
 from app.core.tokens.purposes import TokenPurpose
-from app.schemas.auth import LoginRequest
+from app.models.user import User
+from app.schemas.auth import LoginRequest, RefreshRequest
+from app.services.auth import (
+    CurrentUser,
+    get_current_user,
+    issue_refresh_token,
+    redeem_refresh_token,
+    revoke_sessions,
+)
+from app.services.login_guard import LoginGuard, get_login_guard
+from app.services.rehash import get_rehash_queue
 from app.services.user import get_user_by_email, get_user_by_username
 
 router = APIRouter()
 
 
-@router.post("/login")
-async def login_user(
-    request: Request, credentials: LoginRequest, db: AsyncSession = Depends(get_db)
-):
-    identifier = credentials.identifier.strip().lower()
-
+async def _authenticate(
+    identifier: str, password: str, db: AsyncSession, guard: LoginGuard
+) -> User:
     try:
         if "@" in identifier:
             user = await get_user_by_email(identifier, db)
         else:
             user = await get_user_by_username(identifier, db)
     except HTTPException:
+        guard.record_failure(identifier)
+        raise HTTPException(status_code=401, detail=Auth.INVALID_CREDENTIALS)
+    if not user:
+        guard.record_failure(identifier)
         raise HTTPException(status_code=401, detail=Auth.INVALID_CREDENTIALS)
-    if user:
-        if user.is_locked:
-            raise HTTPException(status_code=403, detail=Auth.LOCKED)
-
-        if not check_password(
-            password=credentials.password, hashed_password=user.hashed_password
-        ):
-            raise HTTPException(status_code=401, detail=Auth.INVALID_CREDENTIALS)
-
-        session_token = create_token(
-            user_id=user.id,
-            purpose=TokenPurpose.SESSION,
-            expires_delta=timedelta(minutes=settings.AUTH_SESSION_DURATION),
-            secret=settings.AUTH_SESSION_TOKEN_SECRET,
-            version=None,
-        )
 
-        response_body = {
-            "sessionToken": session_token,
-            "expiresIn": settings.AUTH_SESSION_DURATION,
-        }
-    else:
+    if user.is_locked:
+        raise HTTPException(status_code=403, detail=Auth.LOCKED)
+    guard.check_account(user)
+
+    if not await check_password_async(
+        password=password, hashed_password=user.hashed_password, lane="login"
+    ):
+        guard.record_failure(identifier, user.id)
         raise HTTPException(status_code=401, detail=Auth.INVALID_CREDENTIALS)
 
+    guard.record_success(identifier, user)
+    return user
+
+
+@router.post("/login")
+@limiter.limit("20/minute")
+async def login_user(
+    request: Request, credentials: LoginRequest, db: AsyncSession = Depends(get_db)
+):
+    identifier = credentials.identifier.strip().lower()
+
+    # Reject identifiers under attack before any lookup or password hashing,
+    # counting attempts still in flight so a burst cannot outrun the backoff
+    guard = get_login_guard()
+    guard.check(identifier)
+    try:
+        user = await _authenticate(identifier, credentials.password, db, guard)
+    finally:
+        guard.release(identifier)
+
+    # Upgrade hashes made with older parameters, after the response
+    if settings.REHASH_ENABLED and needs_rehash(user.hashed_password):
+        get_rehash_queue().schedule(user.id, credentials.password, user.hashed_password)
+
+    session_token = create_token(
+        user_id=user.id,
+        purpose=TokenPurpose.SESSION,
+        expires_delta=timedelta(minutes=settings.AUTH_SESSION_DURATION),
+        secret=settings.AUTH_SESSION_TOKEN_SECRET,
+        version=user.token_version,
+    )
+
+    response_body = {
+        "sessionToken": session_token,
+        "expiresIn": settings.AUTH_SESSION_DURATION,
+    }
+
     if credentials.remember_me:
-        refresh_token = create_token(
-            user_id=user.id,
-            purpose=TokenPurpose.REFRESH,
-            expires_delta=timedelta(minutes=settings.AUTH_REFRESH_DURATION),
-            secret=settings.AUTH_REFRESH_TOKEN_SECRET,
-            version=None,
+        response_body["refreshToken"] = issue_refresh_token(
+            user.id, user.token_version, db
         )
-        response_body["refreshToken"] = refresh_token
         response_body["refreshTokenExpiresIn"] = settings.AUTH_REFRESH_DURATION
+        await db.commit()
 
     return JSONResponse(status_code=200, content=response_body)
+
+
+@router.get("/me")
+async def read_current_user(user: CurrentUser = Depends(get_current_user)):
+    return {"userId": str(user.id), "expiresAt": user.expires_at}
+
+
+@router.post("/refresh")
+@limiter.limit("30/minute")
+async def refresh_session(
+    request: Request, body: RefreshRequest, db: AsyncSession = Depends(get_db)
+):
+    user = await redeem_refresh_token(body.refresh_token, db)
+
+    # Rotate: the client replaces both tokens with freshly minted ones, and
+    # the old refresh token is redeemed in the same commit
+    session_token = create_token(
+        user_id=user.id,
+        purpose=TokenPurpose.SESSION,
+        expires_delta=timedelta(minutes=settings.AUTH_SESSION_DURATION),
+        secret=settings.AUTH_SESSION_TOKEN_SECRET,
+        version=user.token_version,
+    )
+    refresh_token = issue_refresh_token(user.id, user.token_version, db)
+    await db.commit()
+    return {
+        "sessionToken": session_token,
+        "expiresIn": settings.AUTH_SESSION_DURATION,
+        "refreshToken": refresh_token,
+        "refreshTokenExpiresIn": settings.AUTH_REFRESH_DURATION,
+    }
+
+
+@router.post("/logout-all")
+async def logout_everywhere(user: CurrentUser = Depends(get_current_user)):
+    # Bumping the version revokes every session and refresh token issued so far
+    await revoke_sessions(user.id)
+    return {"message": Auth.LOGGED_OUT}
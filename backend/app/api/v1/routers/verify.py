@@ -6,11 +6,11 @@ from app.constants.messages import Errors, Verification
 from app.core.config import settings
 from app.core.db import get_db
 from app.core.limiting import limiter
-from app.core.tokens.base import mark_user_verified, modify_token_status, validate_token
+from app.core.tokens.base import redeem_token
 from app.core.tokens.purposes import TokenPurpose
 from app.exceptions.handlers import TokenValidationError
 from app.schemas.auth import VerifyEmailToken
-from app.services.onboarding import onboard_after_user_created
+from app.services.onboarding import resend_verification
 from app.services.user import get_user_by_email, get_user_by_username
 
 router = APIRouter()
@@ -24,7 +24,7 @@ async def verify_email(
     db: AsyncSession = Depends(get_db),
 ):
     try:
-        user_id = await validate_token(
+        user_id = await redeem_token(
             token=query.token,
             purpose=TokenPurpose.EMAIL_VERIFICATION,
             secret=settings.EMAIL_TOKEN_SECRET,
@@ -33,16 +33,6 @@ async def verify_email(
     except TokenValidationError as e:
         return JSONResponse(status_code=400, content={"message": str(e)})
 
-    try:
-        await modify_token_status(
-            token=query.token,
-            purpose=TokenPurpose.EMAIL_VERIFICATION,
-            db=db,
-        )
-        await mark_user_verified(user_id=user_id, db=db)
-    except HTTPException as e:
-        raise e
-
     return {"message": Verification.SUCCESS, "userId": user_id}
 
 
@@ -63,7 +53,7 @@ async def resend_verification_email(
 
     if user:
         try:
-            await onboard_after_user_created(user, db)
+            await resend_verification(user, db)
         except Exception:
             pass
 
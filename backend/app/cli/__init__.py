@@ -0,0 +1,6 @@
+"""
+Operational command-line entry points.
+
+Each module is runnable with `python -m app.cli.<name>` from the backend
+directory and uses the same settings and database as the application.
+"""
@@ -0,0 +1,79 @@
+"""
+Calibrate Argon2 cost parameters for this host and report throughput.
+
+Measures hashing here, picks the strongest parameters within
+`ARGON2_TARGET_MS` (never below the configured floor), writes them to
+`ARGON2_PARAMS_FILE` for every worker to load, and reports single-hash
+latency and hashes per second through a hash-pool-sized process pool.
+Restart the application afterwards to pick up the new parameters.
+
+Usage (from the backend directory):
+    python -m app.cli.calibrate_argon2 [--target-ms 250] [--output PATH]
+    python -m app.cli.calibrate_argon2 --report-only
+"""
+
+import argparse
+
+from loguru import logger
+
+from app.core.hash_calibration import (
+    Argon2Params,
+    calibrate,
+    load_params,
+    measure_hash_seconds,
+    measure_throughput,
+    save_params,
+)
+from app.core.hash_pool import compute_pool_size
+from app.core.logging import setup_logger_from_settings
+from app.core.security import DEFAULT_PARAMS
+
+
+def report(params: Argon2Params, throughput_hashes: int) -> None:
+    seconds = measure_hash_seconds(params)
+    workers = compute_pool_size(params.memory_cost)
+    hashes = max(throughput_hashes, workers)
+    aggregate = measure_throughput(params, workers, hashes)
+
+    print(f"m={params.memory_cost} KiB, t={params.time_cost}, p={params.parallelism}")
+    print(f"  single hash      {seconds * 1000:8.1f} ms")
+    print(f"  one process      {1 / seconds:8.1f} hashes/s")
+    print(f"  {workers:2d} pool workers  {aggregate:8.1f} hashes/s")
+
+
+def main(
+    target_ms: float | None,
+    output: str | None,
+    report_only: bool,
+    throughput_hashes: int,
+) -> None:
+    if report_only:
+        params = load_params(output) or DEFAULT_PARAMS
+    else:
+        params = calibrate(target_ms=target_ms)
+        path = save_params(params, output)
+        logger.info("Wrote Argon2 parameters to {}", path)
+    report(params, throughput_hashes)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--target-ms", type=float, default=None)
+    parser.add_argument(
+        "--output", default=None, help="parameters file (default ARGON2_PARAMS_FILE)"
+    )
+    parser.add_argument(
+        "--report-only",
+        action="store_true",
+        help="only report throughput of the current parameters",
+    )
+    parser.add_argument(
+        "--throughput-hashes",
+        type=int,
+        default=64,
+        help="hashes to run when measuring pool throughput",
+    )
+    args = parser.parse_args()
+
+    setup_logger_from_settings()
+    main(args.target_ms, args.output, args.report_only, args.throughput_hashes)
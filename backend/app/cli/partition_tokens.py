@@ -0,0 +1,77 @@
+"""
+Maintain the monthly partitions of the used-token table.
+
+Creates the upcoming partitions and, with `--retire`, archives and drops
+(or only detaches) partitions past `TOKEN_RETENTION_DAYS`. The in-process
+sweeper does the same on every pass; this command is for cron-driven
+deployments and for running maintenance by hand.
+
+Usage (from the backend directory):
+    python -m app.cli.partition_tokens [--months-ahead N] [--retire] [--detach-only]
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timezone
+
+from loguru import logger
+
+from app.core.db import async_session, engine
+from app.core.logging import setup_logger_from_settings
+from app.services import token_partitions
+from app.services.token_sweeper import TokenSweeper
+
+
+async def main(months_ahead: int | None, retire: bool, detach_only: bool) -> None:
+    sweeper = TokenSweeper(
+        months_ahead=months_ahead, drop_partitions=False if detach_only else None
+    )
+    try:
+        async with async_session() as session:
+            if not await token_partitions.is_partitioned(session):
+                logger.error("used_tokens is not partitioned; run the migrations")
+                return
+
+        await sweeper.create_partitions()
+
+        if retire:
+            sweeper.archive_dir.mkdir(parents=True, exist_ok=True)
+            stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+            segment = sweeper.archive_dir / f"used_tokens-{stamp}.ndjson.gz"
+            archived = await sweeper.retire_partitions(segment)
+            logger.info("Archived {} tokens from retired partitions", archived)
+
+        async with async_session() as session:
+            for partition in await token_partitions.list_partitions(session):
+                logger.info(
+                    "{}: {} .. {}",
+                    partition.name,
+                    partition.lower or "MINVALUE",
+                    partition.upper or "MAXVALUE",
+                )
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--months-ahead",
+        type=int,
+        default=None,
+        help="future months to create (default: TOKEN_PARTITION_MONTHS_AHEAD)",
+    )
+    parser.add_argument(
+        "--retire",
+        action="store_true",
+        help="archive and retire partitions past the retention period",
+    )
+    parser.add_argument(
+        "--detach-only",
+        action="store_true",
+        help="detach retired partitions but keep their tables",
+    )
+    args = parser.parse_args()
+
+    setup_logger_from_settings()
+    asyncio.run(main(args.months_ahead, args.retire, args.detach_only))
@@ -0,0 +1,46 @@
+"""
+Run the used-token sweeper from the command line.
+
+Useful for cron-driven deployments that disable the in-process sweeper, and
+for draining a large backlog once after enabling it.
+
+Usage (from the backend directory):
+    python -m app.cli.sweep_tokens [--until-done] [--batch-size N]
+"""
+
+import argparse
+import asyncio
+
+from loguru import logger
+
+from app.core.db import engine
+from app.core.logging import setup_logger_from_settings
+from app.services.token_sweeper import TokenSweeper
+
+
+async def main(until_done: bool, batch_size: int | None) -> None:
+    sweeper = TokenSweeper(batch_size=batch_size)
+    try:
+        while True:
+            result = await sweeper.run_once()
+            logger.info("Expired {expired} and archived {archived} tokens", **result)
+            # A pass stops after TOKEN_SWEEP_MAX_BATCHES batches per phase
+            limit = sweeper.batch_size * sweeper.max_batches
+            if not until_done or max(result.values()) < limit:
+                break
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--until-done",
+        action="store_true",
+        help="repeat passes until the backlog is drained",
+    )
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+
+    setup_logger_from_settings()
+    asyncio.run(main(args.until_done, args.batch_size))
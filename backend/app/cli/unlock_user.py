@@ -0,0 +1,47 @@
+"""
+Lift a failed-login lockout before it expires.
+
+Clears the account's `locked_until` and stored failure count. Accounts
+disabled by an administrator (`is_locked`) are not affected.
+
+Usage (from the backend directory):
+    python -m app.cli.unlock_user <username-or-email>
+"""
+
+import argparse
+import asyncio
+import sys
+
+from loguru import logger
+from sqlalchemy import select
+
+from app.core.db import async_session, engine
+from app.core.logging import setup_logger_from_settings
+from app.models.user import User
+from app.services.login_guard import LoginGuard
+
+
+async def main(identifier: str) -> bool:
+    identifier = identifier.strip().lower()
+    column = User.email if "@" in identifier else User.username
+    try:
+        async with async_session() as session:
+            user_id = await session.scalar(select(User.id).where(column == identifier))
+        if user_id is None:
+            logger.error("No user matches {}", identifier)
+            return False
+
+        await LoginGuard().unlock(user_id)
+        logger.info("Unlocked {}", identifier)
+        return True
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("identifier", help="username or email address")
+    args = parser.parse_args()
+
+    setup_logger_from_settings()
+    sys.exit(0 if asyncio.run(main(args.identifier)) else 1)
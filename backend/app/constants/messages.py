@@ -30,3 +30,6 @@ class Auth:
     INACTIVE_ACCOUNT = "Your account is not active yet. Please verify your email."
     LOGIN_SUCCESS = "Welcome back!"
     LOCKED = "Your account has been disabled."
+    NOT_AUTHENTICATED = "Not authenticated."
+    INVALID_SESSION = "Your session is invalid or has expired."
+    LOGGED_OUT = "You have been signed out on all devices."
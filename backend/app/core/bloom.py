@@ -0,0 +1,81 @@
+"""
+Compact Bloom filter for string membership tests.
+
+A Bloom filter answers "definitely not present" or "possibly present" using a
+fixed bit array and `k` hash positions per key. It never yields false
+negatives, and the false-positive rate is bounded by the sizing chosen at
+construction time, which makes it a cheap guard in front of database lookups.
+
+Positions are derived from a single 128-bit BLAKE2b digest using double
+hashing (h1 + i * h2), so adding or checking a key costs one hash call.
+"""
+
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over UTF-8 strings.
+
+    Attributes:
+        capacity (int): Number of keys the filter was sized for.
+        num_bits (int): Size of the bit array.
+        num_hashes (int): Bit positions set per key.
+        count (int): Distinct keys added so far (approximate).
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+
+        self.capacity = max(capacity, 1)
+        self.num_bits = max(
+            64, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, key: str) -> bool:
+        """
+        Insert a key.
+
+        Args:
+            key (str): The key to insert.
+
+        Returns:
+            bool: True if the key was not already (possibly) present.
+        """
+        added = False
+        for pos in self._positions(key):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not self._bits[byte] & mask:
+                self._bits[byte] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key)
+        )
+
+    @property
+    def size_bytes(self) -> int:
+        """Memory used by the bit array."""
+        return len(self._bits)
+
+    @property
+    def false_positive_rate(self) -> float:
+        """Estimated false-positive rate at the current fill level."""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** (
+            self.num_hashes
+        )
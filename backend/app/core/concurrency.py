@@ -0,0 +1,205 @@
+"""
+Adaptive concurrency limits and load shedding for expensive routes.
+
+Rate limits bound how often a client may call, not how much work the
+worker is doing at once. Under overload, requests for login and
+registration keep being accepted and queue (on the hash pool, the database
+pool, the event loop) until all of them time out. `AdaptiveConcurrency`
+caps the number of in-flight requests per route and finds the cap from
+observed latency, AIMD style:
+
+- Each route tracks a latency baseline: the lowest latency seen, allowed
+  to drift upwards slowly so a lasting change (new Argon2 parameters, a
+  slower database) is absorbed.
+- A response slower than `ADAPTIVE_LATENCY_TOLERANCE` times the baseline,
+  or a 5xx, means requests are queueing: the limit is multiplied by
+  `ADAPTIVE_BACKOFF`, at most once per baseline latency so one episode
+  does not collapse the limit.
+- Otherwise, while the route is using at least half its limit, each
+  response adds 1 / limit, i.e. about one more slot per limit's worth of
+  requests.
+- 409, 422 and 429 responses are not sampled: duplicates, invalid input
+  and throttled logins are answered before any real work and would drag
+  the baseline below the cost of a real login or signup. A 401 from a
+  wrong password did pay for a full hash verification, so it is sampled;
+  otherwise credential stuffing would load the route without moving its
+  limit.
+- Requests beyond the limit are shed immediately with 503 and
+  `Retry-After`, before any work is done.
+
+Only the exact paths in `ADAPTIVE_CONCURRENCY_PATHS` are limited, so
+`/health` and every other route always go through, and unknown paths
+cannot create limiter state. Current limits, in-flight counts and shed
+requests are exported as metrics.
+"""
+
+import json
+import time
+from collections.abc import Callable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import (
+    ADAPTIVE_CONCURRENCY_IN_FLIGHT,
+    ADAPTIVE_CONCURRENCY_LIMIT,
+    ADAPTIVE_CONCURRENCY_SHED,
+)
+
+# Drift of the latency baseline towards slower samples, per sample
+_BASELINE_DRIFT = 0.01
+
+# Statuses answered before the expensive work, kept out of the latency samples
+_UNSAMPLED_STATUSES = frozenset((409, 422, 429))
+
+_SHED_BODY = json.dumps(
+    {
+        "error": "SERVICE_UNAVAILABLE",
+        "errorCode": "SERVER_BUSY",
+        "errorMessage": "The server is busy. Please try again shortly.",
+    }
+).encode()
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD in-flight limit for one route.
+
+    Attributes:
+        route (str): Path the limit applies to, used as the metrics label.
+        limit (float): Current in-flight limit (its floor is enforced).
+        min_limit (int): Lowest limit the backoff can reach.
+        max_limit (int): Highest limit the increase can reach.
+        tolerance (float): Latency multiple of the baseline treated as overload.
+        backoff (float): Factor applied to the limit on overload.
+        in_flight (int): Requests currently admitted.
+        baseline (float | None): Latency baseline in seconds.
+    """
+
+    def __init__(
+        self,
+        route: str,
+        initial_limit: int | None = None,
+        min_limit: int | None = None,
+        max_limit: int | None = None,
+        tolerance: float | None = None,
+        backoff: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.route = route
+        self.limit = float(initial_limit or settings.ADAPTIVE_CONCURRENCY_INITIAL)
+        self.min_limit = min_limit or settings.ADAPTIVE_CONCURRENCY_MIN
+        self.max_limit = max_limit or settings.ADAPTIVE_CONCURRENCY_MAX
+        self.tolerance = tolerance or settings.ADAPTIVE_LATENCY_TOLERANCE
+        self.backoff = backoff or settings.ADAPTIVE_BACKOFF
+        self.in_flight = 0
+        self.baseline: float | None = None
+        self._clock = clock
+        self._last_decrease = float("-inf")
+
+        self._limit_gauge = ADAPTIVE_CONCURRENCY_LIMIT.labels(route=route)
+        self._in_flight_gauge = ADAPTIVE_CONCURRENCY_IN_FLIGHT.labels(route=route)
+        self._shed_counter = ADAPTIVE_CONCURRENCY_SHED.labels(route=route)
+        self._limit_gauge.set(int(self.limit))
+
+    def try_acquire(self) -> bool:
+        """
+        Admit a request if the route is under its limit.
+
+        Returns:
+            bool: False if the request should be shed.
+        """
+        if self.in_flight >= int(self.limit):
+            self._shed_counter.inc()
+            return False
+        self.in_flight += 1
+        self._in_flight_gauge.set(self.in_flight)
+        return True
+
+    def release(self, latency: float | None, overloaded: bool = False) -> None:
+        """
+        Finish an admitted request and adapt the limit.
+
+        Args:
+            latency (float | None): Seconds the request took, or None to
+                release without sampling.
+            overloaded (bool): The response itself signalled overload (5xx).
+        """
+        in_flight = self.in_flight
+        self.in_flight -= 1
+        self._in_flight_gauge.set(self.in_flight)
+        if latency is None:
+            return
+
+        baseline = self.baseline
+        if baseline is None or latency < baseline:
+            self.baseline = baseline = latency
+        else:
+            self.baseline = baseline + (latency - baseline) * _BASELINE_DRIFT
+
+        now = self._clock()
+        if overloaded or latency > baseline * self.tolerance:
+            # One decrease per round trip, not one per request in the episode
+            if now - self._last_decrease >= baseline:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = now
+        elif in_flight * 2 >= self.limit:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self._limit_gauge.set(int(self.limit))
+
+
+class AdaptiveConcurrencyMiddleware:
+    """
+    ASGI middleware applying an `AdaptiveConcurrency` limit per route.
+
+    Attributes:
+        limits (dict[str, AdaptiveConcurrency]): Limits by exact request path.
+    """
+
+    def __init__(self, app: ASGIApp, paths: list[str] | None = None):
+        self.app = app
+        paths = settings.ADAPTIVE_CONCURRENCY_PATHS if paths is None else paths
+        self.limits = {path: AdaptiveConcurrency(path) for path in paths}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not limit.try_acquire():
+            await _shed(send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if status in _UNSAMPLED_STATUSES:
+                latency = None
+            else:
+                latency = time.perf_counter() - started
+            limit.release(latency, overloaded=status >= 500)
+
+
+async def _shed(send: Send) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(_SHED_BODY)).encode()),
+                (b"retry-after", b"1"),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": _SHED_BODY})
@@ -8,6 +8,8 @@ All fields can be populated via a `.env` file or environment variables,
 enabling clean separation of secrets and deployment-specific config.
 """
 
+from typing import Literal
+
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -26,6 +28,12 @@ class Settings(BaseSettings):
         DEBUG (bool): Enables debug mode — should be False in production.
         EMAIL_TOKEN_SECRET (str): Secret used to sign email verification tokens.
         EMAIL_TOKEN_EXPIRES_MINUTES (int): Expiration time for email tokens, in minutes.
+        PASSWORD_RESET_TOKEN_EXPIRES_MINUTES (int): Expiration time for password
+            reset tokens, in minutes.
+        ONE_TIME_TOKEN_FORMAT (str): "jwt" or "opaque" for new verification and
+            reset tokens; both formats are accepted on redeem.
+        EMAIL_RESEND_COOLDOWN_SECONDS (int): Minimum age of the last verification
+            token before a resend mints a new one.
         EMAIL_USERNAME (str): Username credential for sending email.
         EMAIL_PASSWORD (str): Password credential for sending email.
         EMAIL_FROM (str): From-address used in outbound emails.
@@ -35,6 +43,87 @@ class Settings(BaseSettings):
         EMAIL_USE_TLS (bool): Whether to use TLS for email connection.
         EMAIL_USE_SSL (bool): Whether to use SSL for email connection.
         CLIENT_ORIGIN (str): Allowed client origin (CORS) for front-end requests.
+        EMAIL_TEMPLATE_CACHE_DIR (str | None): Optional Jinja2 bytecode cache directory.
+        EMAIL_POOL_SIZE (int): Persistent SMTP connections kept per process.
+        EMAIL_POOL_MAX_MESSAGES (int): Messages per SMTP connection before recycling.
+        EMAIL_POOL_HEALTH_CHECK_SECONDS (float): Idle time before a NOOP probe.
+        EMAIL_OUTBOX_ENABLED (bool): Run the outbox delivery worker in this process.
+        EMAIL_OUTBOX_BATCH_SIZE (int): Outbox entries claimed per transaction.
+        EMAIL_OUTBOX_POLL_SECONDS (float): Idle delay between outbox scans.
+        EMAIL_OUTBOX_MAX_ATTEMPTS (int): Delivery attempts before giving up.
+        EMAIL_OUTBOX_BACKOFF_SECONDS (float): Base retry delay, doubled per attempt.
+        EMAIL_OUTBOX_BACKOFF_MAX_SECONDS (float): Upper bound for the retry delay.
+        EMAIL_OUTBOX_DRAIN_SECONDS (float): Max time spent draining on shutdown.
+        HASH_POOL_WORKERS (int): Password hashing processes; 0 sizes to CPU cores.
+        HASH_POOL_MAX_QUEUE (int): Hash jobs allowed to wait for a free process.
+        HASH_POOL_MEMORY_BUDGET_MB (int): RAM cap for concurrent Argon2 hashes.
+        ARGON2_PARAMS_FILE (str): Calibrated Argon2 parameters, shared by all
+            workers on a host.
+        ARGON2_CALIBRATE_ON_STARTUP (bool): Calibrate at startup if no parameters file.
+        ARGON2_TARGET_MS (float): Hash time budget that calibration aims for.
+        ARGON2_MIN_TIME_COST (int): Security floor for the Argon2 time cost.
+        ARGON2_MIN_MEMORY_KIB (int): Security floor for the Argon2 memory cost.
+        ARGON2_MAX_MEMORY_KIB (int): Upper bound for the calibrated memory cost.
+        LOOP_MONITOR_ENABLED (bool): Measure event loop lag and log stacks of
+            blocking callbacks.
+        LOOP_MONITOR_INTERVAL_SECONDS (float): Interval between event loop lag probes.
+        LOOP_MONITOR_WINDOW (int): Recent lag samples the exported percentiles cover.
+        LOOP_BLOCK_THRESHOLD_MS (float): Loop stall that gets its stack logged.
+        CPU_SCHEDULER_ENABLED (bool): Schedule hash pool slots across lanes by weight.
+        CPU_LANE_WEIGHTS (dict[str, float]): Share of hash pool slots per lane under
+            contention.
+        CPU_LANE_MAX_QUEUE (dict[str, int]): Jobs allowed to wait per lane.
+        CPU_LANE_DEADLINE_SECONDS (dict[str, float]): Longest queueing delay per lane
+            before rejecting.
+        REHASH_ENABLED (bool): Upgrade outdated password hashes in the background.
+        REHASH_BATCH_SIZE (int): Password hashes rewritten per batched UPDATE.
+        REHASH_FLUSH_SECONDS (float): Interval between background rehash batches.
+        REHASH_MAX_PENDING (int): Rehashes queued per process before dropping more.
+        REHASH_COUNT_SECONDS (float): Interval for recounting outdated hashes.
+        TOKEN_SWEEP_ENABLED (bool): Run the used-token sweeper in this process.
+        TOKEN_SWEEP_INTERVAL_SECONDS (float): Delay between sweeper passes.
+        TOKEN_SWEEP_BATCH_SIZE (int): Token rows expired or archived per transaction.
+        TOKEN_SWEEP_MAX_BATCHES (int): Batches per phase in one sweeper pass.
+        TOKEN_SWEEP_PAUSE_SECONDS (float): Pause between batches to spare replicas.
+        TOKEN_RETENTION_DAYS (int): Age after which finished tokens are archived.
+        TOKEN_ARCHIVE_DIR (str): Directory for compressed NDJSON token archives.
+        TOKEN_PARTITION_MONTHS_AHEAD (int): Monthly token partitions created in advance.
+        TOKEN_PARTITION_DROP (bool): Drop retired token partitions; if False they are
+            only detached.
+        METRICS_ENABLED (bool): Serve Prometheus metrics on `/metrics` and time
+            every request.
+        ADAPTIVE_CONCURRENCY_ENABLED (bool): Shed load on expensive routes with an
+            adaptive in-flight limit.
+        ADAPTIVE_CONCURRENCY_PATHS (list[str]): Exact request paths with an adaptive
+            limit.
+        ADAPTIVE_CONCURRENCY_INITIAL (int): In-flight limit per route before adapting.
+        ADAPTIVE_CONCURRENCY_MIN (int): Lowest in-flight limit per route.
+        ADAPTIVE_CONCURRENCY_MAX (int): Highest in-flight limit per route.
+        ADAPTIVE_LATENCY_TOLERANCE (float): Latency, as a multiple of the baseline,
+            treated as overload.
+        ADAPTIVE_BACKOFF (float): Factor applied to a route's limit on overload.
+        RATE_LIMIT_STORAGE_URI (str): slowapi storage; `shm://<path>` shares limits
+            across workers.
+        LOGIN_FAILURE_WINDOW_SECONDS (float): Sliding window for failed login counts.
+        LOGIN_FREE_ATTEMPTS (int): Failures per window before backoff starts.
+        LOGIN_BACKOFF_BASE_SECONDS (float): First backoff delay, doubled per failure.
+        LOGIN_BACKOFF_MAX_SECONDS (float): Upper bound for a single backoff delay.
+        AUTH_CLAIMS_CACHE_SIZE (int): Verified session tokens cached per worker.
+        AUTH_CHECK_TOKEN_VERSION (bool): Check a session's `ver` against
+            `User.token_version`.
+        AUTH_VERSION_CACHE_TTL_SECONDS (float): How long a worker trusts a cached
+            `User.token_version`.
+        AUTH_REFRESH_ACCEPT_UNTRACKED (bool): Accept refresh tokens issued before
+            they were recorded, once each; may be turned off one
+            `AUTH_REFRESH_DURATION` after upgrading.
+        LOGIN_LOCK_THRESHOLD (int): Stored failures that lock an account; 0 disables.
+        LOGIN_LOCK_SECONDS (float): How long such a lock lasts.
+        LOGIN_GUARD_MAX_ENTRIES (int): Identifiers tracked in memory per process.
+        LOGIN_FAILURE_FLUSH_SECONDS (float): Interval for persisting failure counts.
+        IDENTIFIER_FILTER_ENABLED (bool): Short-circuit lookups of unknown identifiers.
+        IDENTIFIER_FILTER_CAPACITY (int): Fewest users the filter is sized for.
+        IDENTIFIER_FILTER_ERROR_RATE (float): Target false-positive rate of the filter.
+        IDENTIFIER_FILTER_REBUILD_SECONDS (float): Interval between filter rebuilds.
     """
 
     DATABASE_URL: str
@@ -44,6 +133,9 @@ class Settings(BaseSettings):
 
     EMAIL_TOKEN_SECRET: str
     EMAIL_TOKEN_EXPIRES_MINUTES: int = 15  # Overrideable via .env
+    PASSWORD_RESET_TOKEN_EXPIRES_MINUTES: int = 30
+    ONE_TIME_TOKEN_FORMAT: Literal["jwt", "opaque"] = "jwt"
+    EMAIL_RESEND_COOLDOWN_SECONDS: int = 60
     EMAIL_USERNAME: str
     EMAIL_PASSWORD: str
     EMAIL_FROM: str
@@ -54,10 +146,98 @@ class Settings(BaseSettings):
     EMAIL_USE_SSL: bool
     CLIENT_ORIGIN: str
 
+    EMAIL_TEMPLATE_CACHE_DIR: str | None = None
+
+    EMAIL_POOL_SIZE: int = 2
+    EMAIL_POOL_MAX_MESSAGES: int = 100
+    EMAIL_POOL_HEALTH_CHECK_SECONDS: float = 30.0
+
+    EMAIL_OUTBOX_ENABLED: bool = True
+    EMAIL_OUTBOX_BATCH_SIZE: int = 20
+    EMAIL_OUTBOX_POLL_SECONDS: float = 2.0
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 6
+    EMAIL_OUTBOX_BACKOFF_SECONDS: float = 5.0
+    EMAIL_OUTBOX_BACKOFF_MAX_SECONDS: float = 600.0
+    EMAIL_OUTBOX_DRAIN_SECONDS: float = 10.0
+
     AUTH_SESSION_TOKEN_SECRET: str
     AUTH_REFRESH_TOKEN_SECRET: str
     AUTH_SESSION_DURATION: int
     AUTH_REFRESH_DURATION: int
+    AUTH_CLAIMS_CACHE_SIZE: int = 10_000
+    AUTH_CHECK_TOKEN_VERSION: bool = False
+    AUTH_VERSION_CACHE_TTL_SECONDS: float = 10.0
+    AUTH_REFRESH_ACCEPT_UNTRACKED: bool = True
+
+    HASH_POOL_WORKERS: int = 0
+    HASH_POOL_MAX_QUEUE: int = 64
+    HASH_POOL_MEMORY_BUDGET_MB: int = 512
+
+    ARGON2_PARAMS_FILE: str = "argon2_params.json"
+    ARGON2_CALIBRATE_ON_STARTUP: bool = False
+    ARGON2_TARGET_MS: float = 250.0
+    ARGON2_MIN_TIME_COST: int = 2
+    ARGON2_MIN_MEMORY_KIB: int = 19456
+    ARGON2_MAX_MEMORY_KIB: int = 262144
+
+    LOOP_MONITOR_ENABLED: bool = False
+    LOOP_MONITOR_INTERVAL_SECONDS: float = 0.25
+    LOOP_MONITOR_WINDOW: int = 1200
+    LOOP_BLOCK_THRESHOLD_MS: float = 100.0
+
+    CPU_SCHEDULER_ENABLED: bool = True
+    CPU_LANE_WEIGHTS: dict[str, float] = {"login": 4, "register": 1, "background": 1}
+    CPU_LANE_MAX_QUEUE: dict[str, int] = {"login": 64, "register": 16, "background": 1}
+    CPU_LANE_DEADLINE_SECONDS: dict[str, float] = {
+        "login": 2.0,
+        "register": 5.0,
+        "background": 30.0,
+    }
+
+    REHASH_ENABLED: bool = True
+    REHASH_BATCH_SIZE: int = 100
+    REHASH_FLUSH_SECONDS: float = 5.0
+    REHASH_MAX_PENDING: int = 10_000
+    REHASH_COUNT_SECONDS: float = 300.0
+
+    TOKEN_SWEEP_ENABLED: bool = True
+    TOKEN_SWEEP_INTERVAL_SECONDS: float = 300.0
+    TOKEN_SWEEP_BATCH_SIZE: int = 1000
+    TOKEN_SWEEP_MAX_BATCHES: int = 100
+    TOKEN_SWEEP_PAUSE_SECONDS: float = 0.05
+    TOKEN_RETENTION_DAYS: int = 30
+    TOKEN_ARCHIVE_DIR: str = "archive/used_tokens"
+    TOKEN_PARTITION_MONTHS_AHEAD: int = 3
+    TOKEN_PARTITION_DROP: bool = True
+
+    RATE_LIMIT_STORAGE_URI: str = "memory://"
+
+    METRICS_ENABLED: bool = True
+
+    ADAPTIVE_CONCURRENCY_ENABLED: bool = True
+    ADAPTIVE_CONCURRENCY_PATHS: list[str] = [
+        "/api/v1/routers/auth/login",
+        "/api/v1/routers/auth/register",
+    ]
+    ADAPTIVE_CONCURRENCY_INITIAL: int = 20
+    ADAPTIVE_CONCURRENCY_MIN: int = 2
+    ADAPTIVE_CONCURRENCY_MAX: int = 200
+    ADAPTIVE_LATENCY_TOLERANCE: float = 2.0
+    ADAPTIVE_BACKOFF: float = 0.9
+
+    LOGIN_FAILURE_WINDOW_SECONDS: float = 900.0
+    LOGIN_FREE_ATTEMPTS: int = 5
+    LOGIN_BACKOFF_BASE_SECONDS: float = 1.0
+    LOGIN_BACKOFF_MAX_SECONDS: float = 900.0
+    LOGIN_LOCK_THRESHOLD: int = 50
+    LOGIN_LOCK_SECONDS: float = 900.0
+    LOGIN_GUARD_MAX_ENTRIES: int = 100_000
+    LOGIN_FAILURE_FLUSH_SECONDS: float = 5.0
+
+    IDENTIFIER_FILTER_ENABLED: bool = True
+    IDENTIFIER_FILTER_CAPACITY: int = 100_000
+    IDENTIFIER_FILTER_ERROR_RATE: float = 0.01
+    IDENTIFIER_FILTER_REBUILD_SECONDS: float = 3600.0
 
     # Meta config for pydantic_settings
     model_config = SettingsConfigDict(
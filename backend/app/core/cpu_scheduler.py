@@ -0,0 +1,254 @@
+"""
+Weighted fair scheduling of CPU-heavy auth work between routes.
+
+Every Argon2 hash and verification runs in the shared hash pool, which on
+its own serves jobs first come, first served: a burst of signups queues in
+front of logins for existing users. `CpuScheduler` sits in front of the
+pool and hands out its worker slots by lane:
+
+- Each route kind has a lane (`login`, `register`, `background` for the
+  rehash queue, ...) with a weight, a queue depth limit and a queueing
+  deadline, configured through `CPU_LANE_WEIGHTS`, `CPU_LANE_MAX_QUEUE` and
+  `CPU_LANE_DEADLINE_SECONDS`.
+- Waiting jobs are ordered by start-time fair queuing: a job's tag is its
+  lane's previous tag (or the current virtual time, if the lane was idle)
+  plus 1 / weight, and the smallest tag runs next. Under contention lanes
+  share the pool in proportion to their weights; an idle lane's share goes
+  to the others.
+- Admission is decided up front. A job is rejected immediately with
+  `HashingUnavailableError` (503 + Retry-After) when its lane is full, or
+  when the jobs tagged ahead of it, at the observed service time, would
+  keep it waiting past its lane's deadline. A job whose deadline passes
+  while queued anyway is rejected when it reaches the front instead of
+  being run for a client that has given up.
+
+Only as many jobs as the pool has workers are released at once, so the
+pool's own queue stays empty and the order chosen here is the order run.
+Per-lane queue lengths, wait times and rejections are exported as metrics.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+from app.core.config import settings
+from app.core.metrics import (
+    CPU_LANE_QUEUE_LENGTH,
+    CPU_LANE_REJECTIONS,
+    CPU_LANE_WAIT_SECONDS,
+)
+from app.exceptions.handlers import HashingUnavailableError
+
+# Global scheduler cache (lazy-loaded)
+_cpu_scheduler = None
+
+# Weight of the moving average of job run times
+_SERVICE_TIME_ALPHA = 0.2
+
+
+class _Job:
+    __slots__ = ("tag", "enqueued", "future")
+
+    def __init__(self, tag: float, enqueued: float, future: asyncio.Future):
+        self.tag = tag
+        self.enqueued = enqueued
+        self.future = future
+
+
+@dataclass
+class Lane:
+    """
+    One class of CPU work with its own share, queue and deadline.
+
+    Attributes:
+        name (str): Lane name, used as the metrics label.
+        weight (float): Relative share of pool slots under contention.
+        max_queue (int): Jobs allowed to wait in this lane.
+        deadline (float): Longest acceptable queueing delay, in seconds.
+    """
+
+    name: str
+    weight: float
+    max_queue: int
+    deadline: float
+    queue: deque = field(default_factory=deque, repr=False)
+    last_tag: float = 0.0
+
+
+def lanes_from_settings() -> dict[str, Lane]:
+    """
+    Build the configured lanes.
+
+    Lanes are the keys of `CPU_LANE_WEIGHTS`; missing queue limits fall back
+    to `HASH_POOL_MAX_QUEUE` and missing deadlines to the login lane's.
+
+    Returns:
+        dict[str, Lane]: Lanes by name.
+    """
+    fallback_deadline = settings.CPU_LANE_DEADLINE_SECONDS.get("login", 2.0)
+    return {
+        name: Lane(
+            name=name,
+            weight=weight,
+            max_queue=settings.CPU_LANE_MAX_QUEUE.get(
+                name, settings.HASH_POOL_MAX_QUEUE
+            ),
+            deadline=settings.CPU_LANE_DEADLINE_SECONDS.get(name, fallback_deadline),
+        )
+        for name, weight in settings.CPU_LANE_WEIGHTS.items()
+    }
+
+
+class CpuScheduler:
+    """
+    Start-time fair queuing of pool slots across lanes.
+
+    Attributes:
+        slots (int): Jobs allowed to run at once (the pool's worker count).
+        service_time (float | None): Moving average of job run time, seconds.
+    """
+
+    def __init__(
+        self,
+        slots: int,
+        lanes: dict[str, Lane] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.slots = slots
+        self.lanes = lanes if lanes is not None else lanes_from_settings()
+        self.service_time: float | None = None
+        self._clock = clock
+        self._free = slots
+        self._virtual_time = 0.0
+
+    @property
+    def queued(self) -> int:
+        """Jobs waiting in all lanes."""
+        return sum(len(lane.queue) for lane in self.lanes.values())
+
+    @asynccontextmanager
+    async def slot(self, lane_name: str):
+        """
+        Hold one pool slot for the duration of the block.
+
+        Args:
+            lane_name (str): The lane the work belongs to.
+
+        Raises:
+            HashingUnavailableError: If the lane is full or its deadline
+                cannot be met.
+            KeyError: If the lane is not configured.
+        """
+        lane = self.lanes[lane_name]
+        await self._acquire(lane)
+        started = self._clock()
+        try:
+            yield
+        finally:
+            self._observe(self._clock() - started)
+            self._release()
+
+    async def _acquire(self, lane: Lane) -> None:
+        now = self._clock()
+        tag = max(self._virtual_time, lane.last_tag) + 1 / lane.weight
+
+        if self._free > 0 and not self.queued:
+            self._free -= 1
+            self._virtual_time = lane.last_tag = tag
+            CPU_LANE_WAIT_SECONDS.labels(lane=lane.name).observe(0)
+            return
+
+        if len(lane.queue) >= lane.max_queue:
+            self._reject(lane, "queue_full")
+        if self._estimated_wait(tag) > lane.deadline:
+            self._reject(lane, "deadline")
+
+        job = _Job(tag, now, asyncio.get_running_loop().create_future())
+        lane.last_tag = tag
+        lane.queue.append(job)
+        CPU_LANE_QUEUE_LENGTH.labels(lane=lane.name).inc()
+        try:
+            await job.future
+        except asyncio.CancelledError:
+            if job.future.done() and not job.future.cancelled():
+                if job.future.exception() is None:
+                    # Granted just before the cancellation landed
+                    self._release()
+            else:
+                job.future.cancel()
+                self._remove(lane, job)
+            raise
+
+    def _estimated_wait(self, tag: float) -> float:
+        if self.service_time is None:
+            return 0.0
+        ahead = sum(
+            1 for lane in self.lanes.values() for job in lane.queue if job.tag <= tag
+        )
+        # Every slot is busy; this job starts once `ahead + 1` slots free up
+        return math.ceil((ahead + 1) / self.slots) * self.service_time
+
+    def _reject(self, lane: Lane, reason: str) -> None:
+        CPU_LANE_REJECTIONS.labels(lane=lane.name, reason=reason).inc()
+        raise HashingUnavailableError(f"{lane.name} queue is saturated")
+
+    def _remove(self, lane: Lane, job: _Job) -> None:
+        try:
+            lane.queue.remove(job)
+        except ValueError:
+            return
+        CPU_LANE_QUEUE_LENGTH.labels(lane=lane.name).dec()
+
+    def _observe(self, seconds: float) -> None:
+        if self.service_time is None:
+            self.service_time = seconds
+        else:
+            self.service_time += _SERVICE_TIME_ALPHA * (seconds - self.service_time)
+
+    def _release(self) -> None:
+        self._free += 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._free > 0:
+            heads = [lane for lane in self.lanes.values() if lane.queue]
+            if not heads:
+                return
+            lane = min(heads, key=lambda candidate: candidate.queue[0].tag)
+            job = lane.queue.popleft()
+            CPU_LANE_QUEUE_LENGTH.labels(lane=lane.name).dec()
+            if job.future.done():
+                continue
+
+            waited = self._clock() - job.enqueued
+            self._virtual_time = max(self._virtual_time, job.tag)
+            if waited > lane.deadline:
+                CPU_LANE_REJECTIONS.labels(lane=lane.name, reason="expired").inc()
+                job.future.set_exception(
+                    HashingUnavailableError(f"{lane.name} queue deadline passed")
+                )
+                continue
+
+            CPU_LANE_WAIT_SECONDS.labels(lane=lane.name).observe(waited)
+            self._free -= 1
+            job.future.set_result(None)
+
+
+def get_cpu_scheduler(slots: int) -> CpuScheduler:
+    """
+    Lazily create and return the process-wide CPU scheduler.
+
+    Args:
+        slots (int): Concurrent jobs allowed, used on first creation only.
+
+    Returns:
+        CpuScheduler: The shared scheduler.
+    """
+    global _cpu_scheduler
+    if _cpu_scheduler is None:
+        _cpu_scheduler = CpuScheduler(slots)
+    return _cpu_scheduler
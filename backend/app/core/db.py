@@ -11,9 +11,11 @@ from collections.abc import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.core.config import settings
+from app.core.telemetry import instrument_engine
 
 # Create the database engine using asyncpg and the configured DATABASE_URL
 engine = create_async_engine(settings.DATABASE_URL, echo=False)
+instrument_engine(engine)
 
 # Create a session factory bound to the engine
 # `expire_on_commit=False` prevents SQLAlchemy from expiring ORM objects
@@ -1,16 +1,19 @@
 """
-Email client singleton using FastAPI-Mail.
+Email client singletons.
 
-Provides a global `FastMail` instance based on settings,
-configured on-demand to send outbound emails.
+Provides a global `FastMail` instance and a global pooled SMTP transport,
+both configured on-demand from settings. Application mailers send through
+the pooled transport so SMTP connections and TLS sessions are reused.
 """
 
 from fastapi_mail import ConnectionConfig, FastMail
 
 from app.core.config import settings as s
+from app.core.smtp_pool import SMTPPool
 
-# Global client cache (lazy-loaded)
+# Global client caches (lazy-loaded)
 _email_client = None
+_smtp_pool = None
 
 
 def get_email_client() -> FastMail:
@@ -49,3 +52,38 @@ def reset_email_client() -> None:
     """
     global _email_client
     _email_client = None
+
+
+def get_smtp_pool() -> SMTPPool:
+    """
+    Lazily initialize and return the global pooled SMTP transport.
+
+    Returns:
+        SMTPPool: A connection pool configured from application settings.
+    """
+    global _smtp_pool
+    if _smtp_pool is None:
+        _smtp_pool = SMTPPool(
+            hostname=s.EMAIL_SERVER,
+            port=s.EMAIL_PORT,
+            size=s.EMAIL_POOL_SIZE,
+            username=s.EMAIL_USERNAME or None,
+            password=s.EMAIL_PASSWORD or None,
+            use_tls=s.EMAIL_USE_SSL,
+            start_tls=s.EMAIL_USE_TLS,
+            health_check_after=s.EMAIL_POOL_HEALTH_CHECK_SECONDS,
+            max_messages=s.EMAIL_POOL_MAX_MESSAGES,
+        )
+    return _smtp_pool
+
+
+async def close_smtp_pool() -> None:
+    """
+    Close all pooled SMTP connections and discard the pool.
+
+    Called on application shutdown and usable in tests to isolate state.
+    """
+    global _smtp_pool
+    if _smtp_pool is not None:
+        await _smtp_pool.close()
+        _smtp_pool = None
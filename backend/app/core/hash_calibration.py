@@ -0,0 +1,277 @@
+"""
+Per-host calibration of Argon2id cost parameters.
+
+Fixed parameters are wrong on most hosts: too slow for a small pod's login
+budget, too cheap for a large machine. `calibrate` measures hashing on the
+current host and picks the most expensive parameters that still hash within
+`ARGON2_TARGET_MS`, but never below the security floor
+(`ARGON2_MIN_MEMORY_KIB`, `ARGON2_MIN_TIME_COST`):
+
+1. Parallelism follows the core count, up to 4 lanes.
+2. Memory starts at the largest size that still lets the hash pool run one
+   hash per core inside `HASH_POOL_MEMORY_BUDGET_MB` (capped by
+   `ARGON2_MAX_MEMORY_KIB`), and is halved until the floor `time_cost`
+   meets the target.
+3. `time_cost` is then raised as far as the target allows. Hash time grows
+   linearly with it, so one extra measurement confirms the estimate.
+
+The result is written atomically to `ARGON2_PARAMS_FILE` and loaded by
+`app.core.security` at import time, so every worker process, including the
+hash pool's, uses the same parameters. Hashes made with earlier parameters
+are upgraded on login (see `app.services.rehash`).
+"""
+
+import fcntl
+import json
+import multiprocessing
+import os
+import statistics
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+from argon2 import PasswordHasher
+from loguru import logger
+
+from app.core.config import settings
+
+_SAMPLE_PASSWORD = "calibration-Password-1!"
+
+
+@dataclass(frozen=True)
+class Argon2Params:
+    """
+    Argon2id cost parameters and how they performed when chosen.
+
+    Attributes:
+        time_cost (int): Passes over memory.
+        memory_cost (int): Memory per hash, in KiB.
+        parallelism (int): Lanes (and threads) per hash.
+        hash_ms (float | None): Median single-hash time on the calibrating host.
+        calibrated_at (str | None): ISO timestamp of the calibration.
+        cpu_count (int | None): Cores seen by the calibrating host.
+    """
+
+    time_cost: int
+    memory_cost: int
+    parallelism: int
+    hash_ms: float | None = None
+    calibrated_at: str | None = None
+    cpu_count: int | None = None
+
+    def hasher(self) -> PasswordHasher:
+        """Build a hasher with these parameters."""
+        return PasswordHasher(
+            time_cost=self.time_cost,
+            memory_cost=self.memory_cost,
+            parallelism=self.parallelism,
+            hash_len=32,
+            salt_len=16,
+        )
+
+    def meets_floor(self) -> bool:
+        """Whether these parameters satisfy the configured security floor."""
+        return (
+            self.memory_cost >= settings.ARGON2_MIN_MEMORY_KIB
+            and self.time_cost >= settings.ARGON2_MIN_TIME_COST
+        )
+
+
+def measure_hash_seconds(params: Argon2Params, samples: int = 5) -> float:
+    """
+    Median wall time of one hash with the given parameters.
+
+    Args:
+        params (Argon2Params): Parameters to measure.
+        samples (int): Hashes to time, after one warm-up hash.
+
+    Returns:
+        float: Median seconds per hash.
+    """
+    hasher = params.hasher()
+    hasher.hash(_SAMPLE_PASSWORD)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash(_SAMPLE_PASSWORD)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def max_memory_kib(cpu_count: int) -> int:
+    """
+    Largest memory cost that still lets every core hash at once.
+
+    Args:
+        cpu_count (int): Cores available to the hash pool.
+
+    Returns:
+        int: Memory cost in KiB, a power of two, never below the floor.
+    """
+    budget = settings.HASH_POOL_MEMORY_BUDGET_MB * 1024 // max(cpu_count, 1)
+    ceiling = min(settings.ARGON2_MAX_MEMORY_KIB, budget)
+    memory = 1 << (max(ceiling, 1).bit_length() - 1)
+    return max(memory, settings.ARGON2_MIN_MEMORY_KIB)
+
+
+def calibrate(
+    target_ms: float | None = None,
+    cpu_count: int | None = None,
+    measure: Callable[[Argon2Params], float] = measure_hash_seconds,
+) -> Argon2Params:
+    """
+    Pick the strongest parameters that hash within the latency target.
+
+    Args:
+        target_ms (float, optional): Hash time budget; defaults to `ARGON2_TARGET_MS`.
+        cpu_count (int, optional): Cores to size for; defaults to this host's.
+        measure (Callable): Returns seconds per hash for given parameters.
+
+    Returns:
+        Argon2Params: The chosen parameters with their measured hash time.
+            If even the floor misses the target, the floor is returned.
+    """
+    target = (target_ms or settings.ARGON2_TARGET_MS) / 1000
+    cpus = cpu_count or os.cpu_count() or 1
+    parallelism = min(cpus, 4)
+    min_time = settings.ARGON2_MIN_TIME_COST
+    min_memory = settings.ARGON2_MIN_MEMORY_KIB
+
+    memory = max_memory_kib(cpus)
+    params = Argon2Params(min_time, memory, parallelism)
+    seconds = measure(params)
+    while seconds > target and memory > min_memory:
+        memory = max(memory // 2, min_memory)
+        params = Argon2Params(min_time, memory, parallelism)
+        seconds = measure(params)
+
+    if seconds > target:
+        logger.warning(
+            "Argon2 floor (m={} KiB, t={}) takes {:.0f} ms, over the {:.0f} ms target",
+            memory,
+            min_time,
+            seconds * 1000,
+            target * 1000,
+        )
+    else:
+        # Time is linear in time_cost; step back if the estimate overshoots
+        time_cost = max(min_time, int(target / (seconds / min_time)))
+        while time_cost > min_time:
+            candidate = Argon2Params(time_cost, memory, parallelism)
+            candidate_seconds = measure(candidate)
+            if candidate_seconds <= target:
+                params, seconds = candidate, candidate_seconds
+                break
+            time_cost -= 1
+
+    return Argon2Params(
+        time_cost=params.time_cost,
+        memory_cost=params.memory_cost,
+        parallelism=params.parallelism,
+        hash_ms=round(seconds * 1000, 2),
+        calibrated_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        cpu_count=cpus,
+    )
+
+
+def save_params(params: Argon2Params, path: str | Path | None = None) -> Path:
+    """
+    Atomically write parameters to the shared parameters file.
+
+    Args:
+        params (Argon2Params): Parameters to persist.
+        path (str | Path, optional): Defaults to `ARGON2_PARAMS_FILE`.
+
+    Returns:
+        Path: The file written.
+    """
+    path = Path(path or settings.ARGON2_PARAMS_FILE)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(asdict(params), indent=2) + "\n")
+    os.replace(tmp, path)
+    return path
+
+
+def load_params(path: str | Path | None = None) -> Argon2Params | None:
+    """
+    Read persisted parameters, if there are usable ones.
+
+    Files that are missing, unreadable or below the security floor are
+    ignored (the latter with a warning), leaving the built-in defaults.
+
+    Args:
+        path (str | Path, optional): Defaults to `ARGON2_PARAMS_FILE`.
+
+    Returns:
+        Argon2Params | None: The stored parameters, or None.
+    """
+    path = Path(path or settings.ARGON2_PARAMS_FILE)
+    try:
+        params = Argon2Params(**json.loads(path.read_text()))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, TypeError):
+        logger.exception("Ignoring unreadable Argon2 parameters in {}", path)
+        return None
+
+    if not params.meets_floor():
+        logger.warning("Ignoring Argon2 parameters below the floor in {}", path)
+        return None
+    return params
+
+
+def ensure_params() -> Argon2Params:
+    """
+    Load the persisted parameters, calibrating this host first if needed.
+
+    Workers starting together serialize on a lock file next to
+    `ARGON2_PARAMS_FILE`, so only the first one calibrates and all of them
+    end up with the same parameters.
+
+    Returns:
+        Argon2Params: The parameters every worker should use.
+    """
+    path = Path(settings.ARGON2_PARAMS_FILE)
+    with open(path.with_name(f".{path.name}.lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        params = load_params(path)
+        if params is None:
+            params = calibrate()
+            save_params(params, path)
+            logger.info(
+                "Calibrated Argon2: m={} KiB, t={}, p={} ({} ms per hash)",
+                params.memory_cost,
+                params.time_cost,
+                params.parallelism,
+                params.hash_ms,
+            )
+    return params
+
+
+def _hash_once(params: Argon2Params) -> None:
+    params.hasher().hash(_SAMPLE_PASSWORD)
+
+
+def measure_throughput(params: Argon2Params, workers: int, hashes: int) -> float:
+    """
+    Hashes per second with `workers` processes hashing concurrently.
+
+    Args:
+        params (Argon2Params): Parameters to measure.
+        workers (int): Processes, as in the hash pool.
+        hashes (int): Total hashes to run.
+
+    Returns:
+        float: Aggregate hashes per second.
+    """
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        # Start every process before timing
+        list(pool.map(_hash_once, [params] * workers))
+        start = time.perf_counter()
+        list(pool.map(_hash_once, [params] * hashes))
+        return hashes / (time.perf_counter() - start)
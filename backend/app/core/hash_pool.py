@@ -0,0 +1,161 @@
+"""
+Dedicated process pool for CPU-heavy password hashing.
+
+Argon2id is intentionally slow and memory-hard. Running it inline inside an
+async route blocks the event loop for the full duration of the hash, which
+stalls every other request served by the same worker. This module provides a
+`HashPool` that executes hashing callables in separate processes.
+
+The pool is sized to the number of CPU cores, capped by a memory budget
+(each in-flight Argon2 hash allocates `memory_cost` KiB), and guarded by a
+bounded admission queue so bursts are rejected quickly instead of piling up.
+"""
+
+import asyncio
+import multiprocessing
+import os
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from loguru import logger
+
+from app.core.config import settings
+from app.exceptions.handlers import HashingUnavailableError
+
+# Global pool cache (lazy-loaded)
+_hash_pool = None
+
+
+def compute_pool_size(memory_cost: int) -> int:
+    """
+    Determine how many hashing processes this host can afford.
+
+    Args:
+        memory_cost (int): Argon2 memory cost per hash, in KiB.
+
+    Returns:
+        int: Number of worker processes (always at least 1).
+    """
+    if settings.HASH_POOL_WORKERS > 0:
+        cores = settings.HASH_POOL_WORKERS
+    else:
+        cores = os.cpu_count() or 1
+
+    budget_kib = settings.HASH_POOL_MEMORY_BUDGET_MB * 1024
+    by_memory = budget_kib // max(memory_cost, 1)
+
+    return max(1, min(cores, by_memory))
+
+
+class HashPool:
+    """
+    Bounded process pool for running hashing functions off the event loop.
+
+    Attributes:
+        max_workers (int): Number of worker processes.
+        max_queue (int): Number of jobs allowed to wait behind busy workers.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._in_flight = 0
+        self._executor: ProcessPoolExecutor | None = None
+
+    @property
+    def capacity(self) -> int:
+        """Total number of jobs admitted at once (running + queued)."""
+        return self.max_workers + self.max_queue
+
+    @property
+    def in_flight(self) -> int:
+        """Number of jobs currently running or waiting for a worker."""
+        return self._in_flight
+
+    def start(self) -> None:
+        """
+        Create the underlying executor if it is not running yet.
+
+        Uses the `spawn` start method so child processes never inherit the
+        event loop, open sockets, or DB connections of the parent.
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info(
+                "Hash pool started: workers={}, max_queue={}",
+                self.max_workers,
+                self.max_queue,
+            )
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Execute `fn(*args)` in a worker process.
+
+        Args:
+            fn (Callable): A picklable, module-level function.
+            *args: Picklable positional arguments for `fn`.
+
+        Returns:
+            Any: The return value of `fn`.
+
+        Raises:
+            HashingUnavailableError: If the admission queue is full.
+        """
+        if self._in_flight >= self.capacity:
+            raise HashingUnavailableError()
+
+        self.start()
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self._in_flight -= 1
+
+    def shutdown(self) -> None:
+        """
+        Stop all worker processes, cancelling jobs that have not started.
+
+        Blocks until running jobs finish; from async code, call it through
+        `asyncio.to_thread`.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            logger.info("Hash pool stopped")
+
+
+def get_hash_pool(memory_cost: int) -> HashPool:
+    """
+    Lazily initialize and return the global hashing pool.
+
+    Args:
+        memory_cost (int): Argon2 memory cost in KiB, used to size the pool
+            on first creation. Ignored once the pool exists.
+
+    Returns:
+        HashPool: The shared process pool.
+    """
+    global _hash_pool
+    if _hash_pool is None:
+        _hash_pool = HashPool(
+            max_workers=compute_pool_size(memory_cost),
+            max_queue=settings.HASH_POOL_MAX_QUEUE,
+        )
+    return _hash_pool
+
+
+def shutdown_hash_pool() -> None:
+    """
+    Shut down and discard the global hashing pool.
+
+    Called on application shutdown and usable in tests to isolate state.
+    """
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown()
+        _hash_pool = None
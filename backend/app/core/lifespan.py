@@ -1,11 +1,23 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from loguru import logger
 
+from app.core import security
+from app.core.config import settings
+from app.core.email_client import close_smtp_pool
+from app.core.hash_calibration import ensure_params
+from app.core.hash_pool import get_hash_pool, shutdown_hash_pool
 from app.core.logging import setup_logger_from_settings
-
-# In the future: from app.services.telemetry import shutdown_telemetry
+from app.core.loop_monitor import get_loop_monitor
+from app.core.telemetry import shutdown_telemetry
+from app.services.email.outbox import get_outbox_worker
+from app.services.email.template import get_template_registry
+from app.services.identifier_filter import get_identifier_filter
+from app.services.login_guard import get_login_guard
+from app.services.rehash import get_rehash_queue
+from app.services.token_sweeper import get_token_sweeper
 
 
 @asynccontextmanager
@@ -14,11 +26,56 @@ async def lifespan(app: FastAPI):
     setup_logger_from_settings()
     logger.info("Project Nox starting up")
 
-    # 👇 You can add telemetry init here later
+    # Watch for sync work blocking the event loop
+    if settings.LOOP_MONITOR_ENABLED:
+        get_loop_monitor().start()
+
+    # Agree on this host's Argon2 parameters before any hashing process starts
+    if settings.ARGON2_CALIBRATE_ON_STARTUP:
+        security.configure_hasher(ensure_params())
+
+    # Spin up password hashing processes before the first login arrives
+    get_hash_pool(memory_cost=security.hasher.memory_cost).start()
+
+    # Compile email templates once instead of on the first send
+    compiled = get_template_registry().compile_all()
+    logger.info("Compiled {} email templates", compiled)
+
+    # Load known usernames/emails so lookups of unknown ones skip the database
+    if settings.IDENTIFIER_FILTER_ENABLED:
+        get_identifier_filter().start()
+
+    # Persist failed login counts in batches instead of per attempt
+    get_login_guard().start()
+
+    # Move password hashes to the current Argon2 parameters as users log in
+    if settings.REHASH_ENABLED:
+        get_rehash_queue().start()
+
+    # Expire and archive old verification tokens
+    if settings.TOKEN_SWEEP_ENABLED:
+        get_token_sweeper().start()
+
+    # Deliver queued emails in the background
+    if settings.EMAIL_OUTBOX_ENABLED:
+        get_outbox_worker().start()
 
     yield  # --- app runs here ---
 
     # ✅ Shutdown logic
     logger.info("Project Nox shutting down")
 
-    # 👇 Add telemetry flush/cleanup later
+    # Flush whatever mail is already due before the process exits
+    await get_outbox_worker().stop()
+    await close_smtp_pool()
+    await get_identifier_filter().stop()
+    await get_login_guard().stop()
+    await get_rehash_queue().stop()
+    await get_token_sweeper().stop()
+
+    # Waits for running hashes; keep the event loop free meanwhile
+    await asyncio.to_thread(shutdown_hash_pool)
+    await get_loop_monitor().stop()
+
+    # Drop this worker's live gauges from the shared metric files
+    shutdown_telemetry()
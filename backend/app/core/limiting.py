@@ -1,5 +1,13 @@
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-# 👇 Use in-memory for now
-limiter = Limiter(key_func=get_remote_address)
+from app.core import shm_storage  # noqa: F401  (registers the shm:// scheme)
+from app.core.config import settings
+
+# 👇 Set RATE_LIMIT_STORAGE_URI=shm:///dev/shm/nox-ratelimit to share limits
+# between all workers on a host; the default keeps per-process memory.
+limiter = Limiter(
+    key_func=get_remote_address,
+    storage_uri=settings.RATE_LIMIT_STORAGE_URI,
+    strategy="sliding-window-counter",
+)
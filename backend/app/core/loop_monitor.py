@@ -0,0 +1,179 @@
+"""
+Event loop lag monitor and blocking-call detector.
+
+Anything synchronous that runs on the event loop (template rendering, email
+validation, an accidental inline hash) stalls every request the worker is
+serving. `LoopMonitor` makes that visible in two ways:
+
+- A probe task sleeps for `LOOP_MONITOR_INTERVAL_SECONDS` at a time and
+  records how much later than requested it woke up. Each sample goes into
+  the `nox_event_loop_lag_seconds` histogram, and the p50 / p90 / p99 / max
+  of the last `LOOP_MONITOR_WINDOW` samples are exported as gauges.
+- A heartbeat callback re-arms itself with `call_later` every half
+  `LOOP_BLOCK_THRESHOLD_MS`, independent of the probe interval. A watchdog
+  thread compares the time since the last tick with the threshold; once it
+  is exceeded, it captures the loop thread's current stack with
+  `sys._current_frames()` and logs it, once per stall, while the offending
+  callback is still running.
+
+Both are opt-in (`LOOP_MONITOR_ENABLED`) and are started and stopped from
+the application lifespan. The probe costs one timer wakeup per interval and
+the heartbeat two per threshold; the watchdog only reads a float until a
+stall is detected.
+"""
+
+import asyncio
+import statistics
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from loguru import logger
+
+from app.core.config import settings
+from app.core.metrics import (
+    EVENT_LOOP_LAG_QUANTILE_SECONDS,
+    EVENT_LOOP_LAG_SECONDS,
+    EVENT_LOOP_STALLS,
+)
+
+# Global monitor cache (lazy-loaded)
+_loop_monitor = None
+
+_QUANTILES = {"0.5": 50, "0.9": 90, "0.99": 99}
+
+
+class LoopMonitor:
+    """
+    Measures event loop lag and logs the stack of long blocking callbacks.
+
+    Attributes:
+        interval (float): Seconds between lag probes.
+        threshold (float): Seconds without a tick before a stall is reported.
+        window (int): Recent samples the exported percentiles cover.
+    """
+
+    def __init__(
+        self,
+        interval: float | None = None,
+        threshold_ms: float | None = None,
+        window: int | None = None,
+    ):
+        self.interval = interval or settings.LOOP_MONITOR_INTERVAL_SECONDS
+        self.threshold = (threshold_ms or settings.LOOP_BLOCK_THRESHOLD_MS) / 1000
+        self.window = window or settings.LOOP_MONITOR_WINDOW
+        self.samples: deque[float] = deque(maxlen=self.window)
+
+        self._last_tick = time.monotonic()
+        self._tick_handle: asyncio.TimerHandle | None = None
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopping = threading.Event()
+
+    def percentiles(self) -> dict[str, float]:
+        """
+        Lag percentiles over the recent sample window.
+
+        Returns:
+            dict[str, float]: Seconds of lag by quantile ("0.5", ..., "max").
+        """
+        if not self.samples:
+            return {}
+        if len(self.samples) == 1:
+            (only,) = self.samples
+            cuts = [only] * 99
+        else:
+            cuts = statistics.quantiles(self.samples, n=100, method="inclusive")
+        result = {label: cuts[pct - 1] for label, pct in _QUANTILES.items()}
+        result["max"] = max(self.samples)
+        return result
+
+    def start(self) -> None:
+        """Start the probe and heartbeat on the running loop, and the watchdog."""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._stopping.clear()
+        self._tick()
+        self._task = asyncio.create_task(self._probe(), name="loop-monitor")
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Stop the probe, the heartbeat and the watchdog thread."""
+        if self._task is None:
+            return
+        self._stopping.set()
+        self._tick_handle.cancel()
+        self._tick_handle = None
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._watchdog.join(timeout=1)
+        self._watchdog = None
+
+    def record(self, lag: float) -> None:
+        """
+        Record one lag sample and refresh the exported percentiles.
+
+        Args:
+            lag (float): Seconds the probe woke up late.
+        """
+        self.samples.append(lag)
+        EVENT_LOOP_LAG_SECONDS.observe(lag)
+        for label, value in self.percentiles().items():
+            EVENT_LOOP_LAG_QUANTILE_SECONDS.labels(quantile=label).set(value)
+
+    async def _probe(self) -> None:
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, time.monotonic() - started - self.interval))
+
+    def _tick(self) -> None:
+        # Ticks well inside the threshold, so a quiet loop never looks stalled
+        # and a stall is seen however the probe's sleep lines up with it
+        self._last_tick = time.monotonic()
+        self._tick_handle = asyncio.get_running_loop().call_later(
+            self.threshold / 2, self._tick
+        )
+
+    def _watch(self) -> None:
+        reported = None
+        # Wake often enough to catch a stall close to the threshold
+        while not self._stopping.wait(self.threshold / 4):
+            last_tick = self._last_tick
+            stalled = time.monotonic() - last_tick
+            if stalled <= self.threshold or last_tick == reported:
+                continue
+            reported = last_tick
+            EVENT_LOOP_STALLS.inc()
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "<unknown>"
+            logger.warning(
+                "Event loop blocked: no tick for {:.0f} ms; loop thread stack:\n{}",
+                stalled * 1000,
+                stack,
+            )
+
+
+def get_loop_monitor() -> LoopMonitor:
+    """
+    Lazily create and return the process-wide loop monitor.
+
+    Returns:
+        LoopMonitor: The shared monitor.
+    """
+    global _loop_monitor
+    if _loop_monitor is None:
+        _loop_monitor = LoopMonitor()
+    return _loop_monitor
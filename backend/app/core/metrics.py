@@ -0,0 +1,134 @@
+"""
+Prometheus metrics shared across the application.
+
+Metrics are declared once here and updated by the components that own the
+measured behavior, so names and label sets stay consistent.
+
+With `PROMETHEUS_MULTIPROC_DIR` set, every worker process writes its values
+to memory-mapped files in that directory and `/metrics` sums them (see
+`app.core.telemetry`). Counters and histograms add up naturally; each gauge
+declares how its per-process values combine, with `live*` modes so values
+of exited workers are dropped.
+"""
+
+from prometheus_client import Counter, Gauge, Histogram
+
+IDENTIFIER_FILTER_KEYS = Gauge(
+    "nox_identifier_filter_keys",
+    "Usernames and emails loaded into the identifier membership filter",
+    multiprocess_mode="livemax",
+)
+IDENTIFIER_FILTER_BYTES = Gauge(
+    "nox_identifier_filter_bytes",
+    "Memory used by the identifier membership filter",
+    multiprocess_mode="livesum",
+)
+IDENTIFIER_FILTER_FALSE_POSITIVE_RATE = Gauge(
+    "nox_identifier_filter_false_positive_rate",
+    "Estimated false-positive rate of the identifier membership filter",
+    multiprocess_mode="livemax",
+)
+IDENTIFIER_FILTER_REBUILD_SECONDS = Gauge(
+    "nox_identifier_filter_rebuild_seconds",
+    "Duration of the last identifier membership filter rebuild",
+    multiprocess_mode="livemax",
+)
+IDENTIFIER_FILTER_SHORT_CIRCUITS = Counter(
+    "nox_identifier_filter_short_circuits_total",
+    "Lookups answered as absent without querying the database",
+    ["kind"],
+)
+PASSWORD_HASHES_OUTDATED = Gauge(
+    "nox_password_hashes_outdated",
+    "Stored password hashes not using the current Argon2 parameters",
+    multiprocess_mode="livemax",
+)
+PASSWORD_REHASHES = Counter(
+    "nox_password_rehashes_total",
+    "Background password rehashes by outcome",
+    ["result"],
+)
+CPU_LANE_QUEUE_LENGTH = Gauge(
+    "nox_cpu_lane_queue_length",
+    "Password hashing jobs waiting for a hash pool slot",
+    ["lane"],
+    multiprocess_mode="livesum",
+)
+CPU_LANE_WAIT_SECONDS = Histogram(
+    "nox_cpu_lane_wait_seconds",
+    "Time password hashing jobs waited for a hash pool slot",
+    ["lane"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+CPU_LANE_REJECTIONS = Counter(
+    "nox_cpu_lane_rejections_total",
+    "Password hashing jobs rejected by the CPU scheduler",
+    ["lane", "reason"],
+)
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "nox_event_loop_lag_seconds",
+    "How late the event loop ran a timer callback",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+EVENT_LOOP_LAG_QUANTILE_SECONDS = Gauge(
+    "nox_event_loop_lag_quantile_seconds",
+    "Event loop lag percentiles over the recent sample window",
+    ["quantile"],
+    multiprocess_mode="livemax",
+)
+EVENT_LOOP_STALLS = Counter(
+    "nox_event_loop_stalls_total",
+    "Times the event loop was blocked past the stall threshold",
+)
+ADAPTIVE_CONCURRENCY_LIMIT = Gauge(
+    "nox_adaptive_concurrency_limit",
+    "Current adaptive in-flight request limit",
+    ["route"],
+    multiprocess_mode="livesum",
+)
+ADAPTIVE_CONCURRENCY_IN_FLIGHT = Gauge(
+    "nox_adaptive_concurrency_in_flight",
+    "Requests currently admitted under the adaptive limit",
+    ["route"],
+    multiprocess_mode="livesum",
+)
+ADAPTIVE_CONCURRENCY_SHED = Counter(
+    "nox_adaptive_concurrency_shed_total",
+    "Requests rejected with 503 by the adaptive concurrency limit",
+    ["route"],
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "nox_http_request_duration_seconds",
+    "Time to serve HTTP requests by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    "nox_password_hash_seconds",
+    "Time to hash or verify a password in the hash pool",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+JWT_SECONDS = Histogram(
+    "nox_jwt_seconds",
+    "Time to encode or decode a JWT",
+    ["operation"],
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.005),
+)
+DB_QUERY_SECONDS = Histogram(
+    "nox_db_query_seconds",
+    "Time to execute a database statement",
+    ["statement"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+SMTP_SEND_SECONDS = Histogram(
+    "nox_smtp_send_seconds",
+    "Time to send an email over a pooled SMTP connection",
+    ["result"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+LIMITER_REJECTIONS = Counter(
+    "nox_limiter_rejections_total",
+    "Requests rejected by rate limits or login throttling",
+    ["limiter", "route"],
+)
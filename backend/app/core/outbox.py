@@ -0,0 +1,39 @@
+"""
+Enumerations for the transactional email outbox.
+
+Outbox rows are written in the same transaction as the records that require
+an email (e.g. a freshly minted verification token) and are delivered later
+by the background outbox worker.
+"""
+
+from enum import Enum
+
+
+class EmailKind(str, Enum):
+    """
+    Identifies which mailer an outbox entry is delivered through.
+
+    Values:
+        VERIFICATION: Email address verification link.
+    """
+
+    VERIFICATION = "verification"
+    # Add more as needed above this comment
+
+
+class OutboxStatus(str, Enum):
+    """
+    Represents the delivery status of an outbox entry.
+
+    Values:
+        PENDING: Waiting to be delivered (or retried).
+        SENT: Successfully handed to the mail server.
+        FAILED: Gave up after exhausting all delivery attempts.
+        CANCELLED: Superseded before delivery; will not be sent.
+    """
+
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    # Add more above this comment, as needed.
@@ -2,25 +2,59 @@
 Security utilities for password and string hashing.
 
 This module includes:
-- Argon2-based password hashing and verification
-- Rehash detection logic
-- SHA256 hashing for general-purpose tokens (e.g. reuse prevention)
+- Argon2-based password hashing and verification, with per-host cost
+  parameters from `ARGON2_PARAMS_FILE` when it has been calibrated
+- Async wrappers that run hashing in the dedicated process pool, scheduled
+  by lane (see `app.core.cpu_scheduler`)
+- Rehash detection logic, per hash and as a prefix for counting in SQL
+- SHA256 hashing for general-purpose tokens (e.g. reuse prevention), as hex
+  or as the raw 32-byte digest stored in `used_tokens.token_hash`
 """
 
 import hashlib
+import time
 
 from argon2 import PasswordHasher
 from argon2 import exceptions as argon2_exceptions
+from argon2.low_level import ARGON2_VERSION
 
-# Argon2 hasher instance with tuned security parameters
-hasher = PasswordHasher(
+from app.core.config import settings
+from app.core.cpu_scheduler import get_cpu_scheduler
+from app.core.hash_calibration import Argon2Params, load_params
+from app.core.hash_pool import get_hash_pool
+from app.core.metrics import PASSWORD_HASH_SECONDS
+
+# Used until this host has been calibrated (see app.core.hash_calibration)
+DEFAULT_PARAMS = Argon2Params(
     time_cost=3,  # Number of iterations (CPU cost)
     memory_cost=65536,  # Memory usage in KB
     parallelism=4,  # Number of parallel threads
-    hash_len=32,  # Length of resulting hash
-    salt_len=16,  # Random salt length
 )
 
+# Argon2 hasher instance; hash and salt lengths are fixed at 32 and 16 bytes
+hasher = (load_params() or DEFAULT_PARAMS).hasher()
+
+_HASH_SECONDS = PASSWORD_HASH_SECONDS.labels(operation="hash")
+_VERIFY_SECONDS = PASSWORD_HASH_SECONDS.labels(operation="verify")
+
+
+def configure_hasher(params: Argon2Params) -> PasswordHasher:
+    """
+    Switch this process to new Argon2 parameters.
+
+    Hash pool processes load `ARGON2_PARAMS_FILE` on their own; call this
+    before the pool starts so both agree.
+
+    Args:
+        params (Argon2Params): The parameters to hash with from now on.
+
+    Returns:
+        PasswordHasher: The new hasher.
+    """
+    global hasher
+    hasher = params.hasher()
+    return hasher
+
 
 def hash_password(password: str) -> str:
     """
@@ -56,6 +90,61 @@ def check_password(password: str, hashed_password: str) -> bool:
         return False
 
 
+async def _run_hashing(lane: str, histogram, fn, *args):
+    pool = get_hash_pool(memory_cost=hasher.memory_cost)
+    if not settings.CPU_SCHEDULER_ENABLED:
+        return await _run_timed(pool, histogram, fn, *args)
+    async with get_cpu_scheduler(slots=pool.max_workers).slot(lane):
+        return await _run_timed(pool, histogram, fn, *args)
+
+
+async def _run_timed(pool, histogram, fn, *args):
+    # Time the pool round trip only; scheduler waits have their own metric
+    started = time.perf_counter()
+    result = await pool.run(fn, *args)
+    histogram.observe(time.perf_counter() - started)
+    return result
+
+
+async def hash_password_async(password: str, lane: str = "register") -> str:
+    """
+    Hashes a password in the hashing process pool, off the event loop.
+
+    Args:
+        password (str): The plaintext password.
+        lane (str): CPU scheduler lane to queue in.
+
+    Returns:
+        str: The hashed password string (includes salt and metadata).
+
+    Raises:
+        HashingUnavailableError: If the hashing pool or the lane is saturated.
+    """
+    return await _run_hashing(lane, _HASH_SECONDS, hash_password, password)
+
+
+async def check_password_async(
+    password: str, hashed_password: str, lane: str = "login"
+) -> bool:
+    """
+    Verifies a password in the hashing process pool, off the event loop.
+
+    Args:
+        password (str): The input plaintext password.
+        hashed_password (str): The stored hash to verify against.
+        lane (str): CPU scheduler lane to queue in.
+
+    Returns:
+        bool: True if the password is valid, False otherwise.
+
+    Raises:
+        HashingUnavailableError: If the hashing pool or the lane is saturated.
+    """
+    return await _run_hashing(
+        lane, _VERIFY_SECONDS, check_password, password, hashed_password
+    )
+
+
 def needs_rehash(hashed: str) -> bool:
     """
     Checks whether the password hash needs to be rehashed based on current params.
@@ -69,6 +158,24 @@ def needs_rehash(hashed: str) -> bool:
     return hasher.check_needs_rehash(hashed)
 
 
+def current_hash_prefix() -> str:
+    """
+    The encoded-hash prefix produced by the current hasher parameters.
+
+    Argon2 hashes start with their type, version and cost parameters (e.g.
+    `$argon2id$v=19$m=65536,t=3,p=4$`), so hashes not starting with this
+    prefix need rehashing. Unlike `needs_rehash`, this ignores salt and
+    hash lengths, which lets the database count outdated hashes with LIKE.
+
+    Returns:
+        str: The prefix, ending with the `$` before the salt.
+    """
+    return (
+        f"$argon2{hasher.type.name.lower()}$v={ARGON2_VERSION}"
+        f"$m={hasher.memory_cost},t={hasher.time_cost},p={hasher.parallelism}$"
+    )
+
+
 def hash_str(string: str, purpose: str | None = None) -> str:
     """
     Generates a deterministic SHA256 hash for a string.
@@ -77,15 +184,33 @@ def hash_str(string: str, purpose: str | None = None) -> str:
 
     Args:
         string (str): The input string to hash.
-        purpose (str, optional): If provided, prepends a namespace for salt-like separation.
+        purpose (str, optional): If provided, prepends a namespace for salt-like
+            separation.
 
     Returns:
         str: A hex-encoded SHA256 hash of the input.
     """
+    return hash_token(string, purpose).hex()
+
+
+def hash_token(string: str, purpose: str | None = None) -> bytes:
+    """
+    Generates the raw SHA256 digest behind `hash_str`.
+
+    Stored as 32-byte `bytea`, which keeps token indexes half the size of
+    the hex form.
+
+    Args:
+        string (str): The input string to hash.
+        purpose (str, optional): If provided, prepends a namespace for salt-like
+            separation.
+
+    Returns:
+        bytes: The 32-byte SHA256 digest of the input.
+    """
     if purpose is not None:
         input_str = f"{purpose}:{string}"
     else:
         input_str = string
 
-    encoded = hashlib.sha256(input_str.encode("utf-8"))
-    return encoded.hexdigest()
+    return hashlib.sha256(input_str.encode("utf-8")).digest()
@@ -0,0 +1,308 @@
+"""
+Host-wide rate limit storage backed by a memory-mapped hash table.
+
+slowapi's default `memory://` storage lives inside one process, so with
+`uvicorn --workers N` every worker enforces its own counters and each limit
+is effectively multiplied by N. `SharedMemoryStorage` keeps the counters in
+a file mapped into every worker (on tmpfs such as /dev/shm by default), so
+all workers on the host share one view without a Redis dependency.
+
+Layout and concurrency:
+
+- The table is a fixed number of buckets with `bucket_size` slots each. A
+  key hashes to one bucket and never probes outside it, so every operation
+  touches a constant number of slots and memory per key is one 48-byte slot.
+- Each slot stores a sliding window counter (current and previous window
+  counts plus the window index), so a key never needs a second slot for the
+  previous window.
+- Buckets are guarded by striped locks: a `threading.Lock` per stripe for
+  threads in the same process plus an `fcntl` byte-range lock for other
+  processes. Check-and-increment is therefore atomic and never over-admits.
+- Expired slots are reused on insert and cleared by an incremental sweep
+  that runs every `sweep_every` operations. When a bucket is full of live
+  keys the entry closest to expiry is evicted.
+
+Enable with a URI such as `shm:///dev/shm/nox-ratelimit?buckets=8192`.
+Requires a POSIX platform (`fcntl`).
+"""
+
+import fcntl
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+import urllib.parse
+from contextlib import contextmanager
+
+from limits.errors import ConfigurationError
+from limits.storage import Storage
+from limits.storage.base import SlidingWindowCounterSupport
+
+_MAGIC = b"NOXRLv1\0"
+_HEADER = struct.Struct("<8sIII")  # magic, buckets, bucket_size, stripes
+_HEADER_SIZE = 64
+
+# fingerprint, window index (-1 for fixed windows), expires_at,
+# current count, previous count, expiry seconds, padding
+_SLOT = struct.Struct("<16sqdIIII")
+_EMPTY = bytes(16)
+_FIXED_WINDOW = -1
+
+
+class SharedMemoryStorage(Storage, SlidingWindowCounterSupport):
+    """
+    Rate limit storage shared by every process that maps the same file.
+
+    Attributes:
+        path (str): Backing file, ideally on a tmpfs mount.
+        buckets (int): Number of hash buckets.
+        bucket_size (int): Slots per bucket.
+        stripes (int): Number of bucket lock stripes.
+    """
+
+    STORAGE_SCHEME = ["shm"]
+
+    def __init__(
+        self,
+        uri: str = "shm:///dev/shm/nox-ratelimit",
+        wrap_exceptions: bool = False,
+        **options: float | str | bool,
+    ):
+        parsed = urllib.parse.urlparse(uri)
+        query = dict(urllib.parse.parse_qsl(parsed.query))
+        query.update({k: str(v) for k, v in options.items()})
+
+        self.path = parsed.path or "/dev/shm/nox-ratelimit"
+        self.buckets = int(query.get("buckets", 8192))
+        self.bucket_size = int(query.get("bucket_size", 8))
+        self.stripes = int(query.get("stripes", 256))
+        self.sweep_every = int(query.get("sweep_every", 1024))
+        self.sweep_buckets = int(query.get("sweep_buckets", 64))
+        if min(self.buckets, self.bucket_size, self.stripes) < 1:
+            raise ConfigurationError("shm:// storage sizes must be positive")
+
+        self._bucket_bytes = self.bucket_size * _SLOT.size
+        self._thread_locks = [threading.Lock() for _ in range(self.stripes)]
+        self._ops = 0
+        self._sweep_cursor = 0
+
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        size = _HEADER_SIZE + self.buckets * self._bucket_bytes
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            self._init_file(size)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._mm = mmap.mmap(self._fd, size)
+
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    def _init_file(self, size: int) -> None:
+        header = _HEADER.pack(_MAGIC, self.buckets, self.bucket_size, self.stripes)
+        current = os.pread(self._fd, _HEADER.size, 0)
+        if len(current) == _HEADER.size and current[:8] == _MAGIC:
+            if current != header:
+                raise ConfigurationError(
+                    f"{self.path} was created with a different table geometry"
+                )
+            return
+        os.ftruncate(self._fd, 0)
+        os.ftruncate(self._fd, size)
+        os.pwrite(self._fd, header, 0)
+
+    @property
+    def base_exceptions(self) -> type[Exception] | tuple[type[Exception], ...]:
+        return OSError
+
+    # --- table primitives -------------------------------------------------
+
+    def _locate(self, key: str) -> tuple[bytes, int]:
+        fingerprint = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        bucket = int.from_bytes(fingerprint[:8], "little") % self.buckets
+        return fingerprint, bucket
+
+    @contextmanager
+    def _locked(self, bucket: int):
+        stripe = bucket % self.stripes
+        with self._thread_locks[stripe]:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, stripe)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, stripe)
+
+    def _find(self, fingerprint: bytes, bucket: int, now: float, create: bool):
+        """Return (offset, slot) for the key, claiming a slot if `create`."""
+        base = _HEADER_SIZE + bucket * self._bucket_bytes
+        victim = None
+        victim_expires = math.inf
+        for offset in range(base, base + self._bucket_bytes, _SLOT.size):
+            slot = _SLOT.unpack_from(self._mm, offset)
+            if slot[0] == fingerprint:
+                if slot[2] > now:
+                    return offset, slot
+                victim, victim_expires = offset, -math.inf
+                break
+            if slot[0] == _EMPTY or slot[2] <= now:
+                if victim_expires > -math.inf:
+                    victim, victim_expires = offset, -math.inf
+            elif slot[2] < victim_expires:
+                victim, victim_expires = offset, slot[2]
+
+        if not create:
+            return None, None
+        return victim, (fingerprint, 0, 0.0, 0, 0, 0, 0)
+
+    def _write(self, offset: int, slot: tuple) -> None:
+        _SLOT.pack_into(self._mm, offset, *slot)
+
+    def _clear_offset(self, offset: int) -> None:
+        self._mm[offset : offset + _SLOT.size] = bytes(_SLOT.size)
+
+    def _tick(self) -> None:
+        self._ops += 1
+        if self._ops >= self.sweep_every:
+            self._ops = 0
+            self.sweep(self.sweep_buckets)
+
+    def sweep(self, max_buckets: int | None = None) -> int:
+        """
+        Clear expired slots, continuing from where the last sweep stopped.
+
+        Args:
+            max_buckets (int, optional): Buckets to visit; defaults to all.
+
+        Returns:
+            int: Number of slots freed.
+        """
+        count = self.buckets if max_buckets is None else min(max_buckets, self.buckets)
+        now = time.time()
+        freed = 0
+        for _ in range(count):
+            bucket = self._sweep_cursor
+            self._sweep_cursor = (bucket + 1) % self.buckets
+            base = _HEADER_SIZE + bucket * self._bucket_bytes
+            with self._locked(bucket):
+                for offset in range(base, base + self._bucket_bytes, _SLOT.size):
+                    fingerprint, _, expires_at = _SLOT.unpack_from(self._mm, offset)[:3]
+                    if fingerprint != _EMPTY and expires_at <= now:
+                        self._clear_offset(offset)
+                        freed += 1
+        return freed
+
+    # --- fixed window -----------------------------------------------------
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+        fingerprint, bucket = self._locate(key)
+        with self._locked(bucket):
+            offset, slot = self._find(fingerprint, bucket, now, create=True)
+            if slot[2] > now:
+                count = slot[3] + amount
+                expires_at = slot[2]
+            else:
+                count = amount
+                expires_at = now + expiry
+            self._write(
+                offset, (fingerprint, _FIXED_WINDOW, expires_at, count, 0, expiry, 0)
+            )
+        self._tick()
+        return count
+
+    def get(self, key: str) -> int:
+        fingerprint, bucket = self._locate(key)
+        with self._locked(bucket):
+            _, slot = self._find(fingerprint, bucket, time.time(), create=False)
+        return slot[3] if slot else 0
+
+    def get_expiry(self, key: str) -> float:
+        now = time.time()
+        fingerprint, bucket = self._locate(key)
+        with self._locked(bucket):
+            _, slot = self._find(fingerprint, bucket, now, create=False)
+        return slot[2] if slot else now
+
+    def clear(self, key: str) -> None:
+        fingerprint, bucket = self._locate(key)
+        with self._locked(bucket):
+            offset, _ = self._find(fingerprint, bucket, time.time(), create=False)
+            if offset is not None:
+                self._clear_offset(offset)
+
+    def check(self) -> bool:
+        return not self._mm.closed
+
+    def reset(self) -> int | None:
+        cleared = 0
+        for bucket in range(self.buckets):
+            base = _HEADER_SIZE + bucket * self._bucket_bytes
+            with self._locked(bucket):
+                for offset in range(base, base + self._bucket_bytes, _SLOT.size):
+                    if self._mm[offset : offset + 16] != _EMPTY:
+                        self._clear_offset(offset)
+                        cleared += 1
+        return cleared
+
+    # --- sliding window counter -------------------------------------------
+
+    @staticmethod
+    def _roll(slot: tuple, window: int) -> tuple[int, int]:
+        """Current and previous counts of `slot` as seen from `window`."""
+        if slot[1] == window:
+            return slot[3], slot[4]
+        if slot[1] == window - 1:
+            return 0, slot[3]
+        return 0, 0
+
+    def acquire_sliding_window_entry(
+        self, key: str, limit: int, expiry: int, amount: int = 1
+    ) -> bool:
+        if amount > limit:
+            return False
+
+        now = time.time()
+        window, elapsed = divmod(now, expiry)
+        window = int(window)
+        fingerprint, bucket = self._locate(key)
+        with self._locked(bucket):
+            offset, slot = self._find(fingerprint, bucket, now, create=True)
+            current, previous = self._roll(slot, window)
+            weighted = previous * (1 - elapsed / expiry) + current
+            if math.floor(weighted) + amount > limit:
+                acquired = False
+            else:
+                self._write(
+                    offset,
+                    (
+                        fingerprint,
+                        window,
+                        (window + 2) * expiry,
+                        current + amount,
+                        previous,
+                        expiry,
+                        0,
+                    ),
+                )
+                acquired = True
+        self._tick()
+        return acquired
+
+    def get_sliding_window(
+        self, key: str, expiry: int
+    ) -> tuple[int, float, int, float]:
+        now = time.time()
+        window, elapsed = divmod(now, expiry)
+        fingerprint, bucket = self._locate(key)
+        with self._locked(bucket):
+            _, slot = self._find(fingerprint, bucket, now, create=False)
+
+        current, previous = self._roll(slot, int(window)) if slot else (0, 0)
+        previous_ttl = (expiry - elapsed) if previous else 0.0
+        current_ttl = expiry - elapsed + expiry
+        return previous, previous_ttl, current, current_ttl
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        self.clear(key)
@@ -0,0 +1,155 @@
+"""
+Pooled SMTP transport built on aiosmtplib.
+
+FastAPI-Mail opens a new SMTP connection (TCP connect, EHLO, STARTTLS, AUTH)
+for every message it sends. `SMTPPool` instead keeps a fixed number of
+long-lived connections and hands them out one message at a time:
+
+- Connections are opened lazily and reused for many consecutive messages.
+- A connection idle for longer than `health_check_after` is probed with NOOP
+  before use; a dead one is transparently reconnected.
+- A message that fails because the server dropped the connection is retried
+  once on a fresh connection.
+- Connections are recycled after `max_messages` sends to stay clear of
+  per-session limits enforced by many relays.
+
+Send times, from holding a connection to the server accepting the message,
+go into `nox_smtp_send_seconds` by result.
+"""
+
+import asyncio
+import time
+from email.message import EmailMessage
+
+import aiosmtplib
+from loguru import logger
+
+from app.core.metrics import SMTP_SEND_SECONDS
+
+
+class _PooledConnection:
+    """A single reusable SMTP client plus its bookkeeping."""
+
+    def __init__(self, client: aiosmtplib.SMTP):
+        self.client = client
+        self.last_used = 0.0
+        self.sent = 0
+
+    async def close(self) -> None:
+        if self.client.is_connected:
+            try:
+                await self.client.quit()
+            except (aiosmtplib.SMTPException, OSError):
+                self.client.close()
+        self.sent = 0
+
+
+class SMTPPool:
+    """
+    Fixed-size pool of persistent SMTP connections.
+
+    Attributes:
+        size (int): Number of connections (and concurrent sends).
+        health_check_after (float): Idle seconds before a NOOP probe.
+        max_messages (int): Messages sent per connection before recycling.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        *,
+        size: int = 2,
+        username: str | None = None,
+        password: str | None = None,
+        use_tls: bool = False,
+        start_tls: bool = False,
+        timeout: float = 30,
+        health_check_after: float = 30,
+        max_messages: int = 100,
+    ):
+        self.size = size
+        self.health_check_after = health_check_after
+        self.max_messages = max_messages
+        self.connections_opened = 0
+
+        self._idle: asyncio.Queue[_PooledConnection] = asyncio.Queue()
+        for _ in range(size):
+            self._idle.put_nowait(
+                _PooledConnection(
+                    aiosmtplib.SMTP(
+                        hostname=hostname,
+                        port=port,
+                        username=username,
+                        password=password,
+                        use_tls=use_tls,
+                        start_tls=start_tls,
+                        timeout=timeout,
+                    )
+                )
+            )
+
+    async def _connect(self, conn: _PooledConnection) -> None:
+        conn.client.close()
+        await conn.client.connect()
+        conn.sent = 0
+        self.connections_opened += 1
+
+    async def _ensure_healthy(self, conn: _PooledConnection) -> None:
+        if not conn.client.is_connected or conn.sent >= self.max_messages:
+            await conn.close()
+            await self._connect(conn)
+            return
+
+        if time.monotonic() - conn.last_used > self.health_check_after:
+            try:
+                await conn.client.noop()
+            except (aiosmtplib.SMTPException, OSError):
+                logger.info("Stale SMTP connection detected; reconnecting")
+                await self._connect(conn)
+
+    async def send(self, message: EmailMessage) -> None:
+        """
+        Send a message over a pooled connection.
+
+        Waits for a free connection if all are busy.
+
+        Args:
+            message (EmailMessage): A fully built message (From/To/Subject set).
+
+        Raises:
+            aiosmtplib.SMTPException: If the server rejects the message or
+                cannot be reached after one reconnect.
+        """
+        conn = await self._idle.get()
+        started = time.perf_counter()
+        result = "error"
+        try:
+            await self._ensure_healthy(conn)
+            try:
+                await conn.client.send_message(message)
+            except (aiosmtplib.SMTPServerDisconnected, ConnectionError):
+                # The server closed an idle session under us; retry once
+                await self._connect(conn)
+                await conn.client.send_message(message)
+            conn.sent += 1
+            result = "ok"
+        except BaseException:
+            # Never hand a connection in an unknown protocol state to the next caller
+            conn.client.close()
+            raise
+        finally:
+            SMTP_SEND_SECONDS.labels(result=result).observe(
+                time.perf_counter() - started
+            )
+            conn.last_used = time.monotonic()
+            self._idle.put_nowait(conn)
+
+    async def close(self) -> None:
+        """Politely QUIT every open connection."""
+        conns = []
+        while not self._idle.empty():
+            conns.append(self._idle.get_nowait())
+        for conn in conns:
+            await conn.close()
+            self._idle.put_nowait(conn)
@@ -0,0 +1,197 @@
+"""
+Prometheus metrics endpoint, request timing and multi-process aggregation.
+
+Several uvicorn workers serve the API, each with its own copy of every
+metric. prometheus_client's multiprocess mode makes one scrape see all of
+them:
+
+- Start the server with `PROMETHEUS_MULTIPROC_DIR` pointing at an empty
+  directory (wipe it before every start; it must be set in the environment,
+  not `.env`, because prometheus_client reads it at import time). Every
+  process then keeps its metric values in memory-mapped files there.
+- `/metrics` merges the files of all processes on each scrape, so any
+  worker can answer it. Counters and histograms are summed; gauges combine
+  according to their `multiprocess_mode` (see `app.core.metrics`).
+- On shutdown a worker marks itself dead, which drops its `live*` gauges
+  while keeping its counts.
+
+Without the variable, `/metrics` serves the process's default registry.
+
+Request latency is recorded by `RequestMetricsMiddleware`, labeled by route
+template (`/users/{user_id}`, not the raw path) so the number of series
+stays bounded. The per-request cost is one dict lookup for the cached
+histogram child plus one `observe`; run `benchmarks.bench_metrics` to
+measure it. Database statements are timed through engine events by
+`instrument_engine`.
+"""
+
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import DB_QUERY_SECONDS, HTTP_REQUEST_SECONDS
+
+# Global registry cache (lazy-loaded)
+_registry = None
+
+# Label for requests no route matched, instead of their raw paths
+UNMATCHED_ROUTE = "<unmatched>"
+
+_METHODS = frozenset(
+    ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "TRACE", "CONNECT")
+)
+
+_STATEMENTS = {
+    "SELECT": "select",
+    "INSERT": "insert",
+    "UPDATE": "update",
+    "DELETE": "delete",
+}
+_DB_QUERY_CHILDREN = {
+    label: DB_QUERY_SECONDS.labels(statement=label)
+    for label in (*_STATEMENTS.values(), "other")
+}
+
+
+def multiprocess_dir() -> str | None:
+    """
+    The directory worker processes share metric files through, if any.
+
+    Returns:
+        str | None: `PROMETHEUS_MULTIPROC_DIR`, or None in single-process mode.
+    """
+    return os.environ.get("PROMETHEUS_MULTIPROC_DIR") or None
+
+
+def get_metrics_registry() -> CollectorRegistry:
+    """
+    Lazily create and return the registry `/metrics` is rendered from.
+
+    Returns:
+        CollectorRegistry: A registry aggregating every process's metric
+            files in multiprocess mode, else the default registry.
+    """
+    global _registry
+    if _registry is None:
+        path = multiprocess_dir()
+        if path is None:
+            _registry = REGISTRY
+        else:
+            _registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(_registry, path=path)
+    return _registry
+
+
+def metrics_endpoint(request: Request) -> Response:
+    """
+    Serve all metrics in the Prometheus text format.
+
+    Synchronous on purpose: Starlette runs it in the thread pool, so reading
+    the metric files of every worker never blocks the event loop.
+
+    Args:
+        request (Request): The scrape request.
+
+    Returns:
+        Response: The exposition, with Prometheus' content type.
+    """
+    return Response(
+        generate_latest(get_metrics_registry()), media_type=CONTENT_TYPE_LATEST
+    )
+
+
+def route_template(scope: Scope) -> str:
+    """
+    The template of the route that handled a request.
+
+    Args:
+        scope (Scope): The request scope, after routing.
+
+    Returns:
+        str: The route's path template, or `UNMATCHED_ROUTE`.
+    """
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request by method, route and status.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._children = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            method = scope["method"]
+            if method not in _METHODS:
+                method = "OTHER"
+            key = (method, route_template(scope), status)
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = HTTP_REQUEST_SECONDS.labels(
+                    method=method, route=key[1], status=str(status)
+                )
+            child.observe(elapsed)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    Time every statement the engine executes into `nox_db_query_seconds`.
+
+    Args:
+        engine (AsyncEngine): The engine to instrument.
+    """
+    sync_engine = engine.sync_engine
+
+    # The start time lives on the execution context, so a failed statement
+    # (which never reaches after_cursor_execute) leaves nothing behind
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_query_started", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        verb = statement.lstrip()[:6].upper()
+        _DB_QUERY_CHILDREN[_STATEMENTS.get(verb, "other")].observe(elapsed)
+
+
+def shutdown_telemetry() -> None:
+    """Drop this process's live gauges from the shared metric files."""
+    if multiprocess_dir() is not None:
+        multiprocess.mark_process_dead(os.getpid())
@@ -3,25 +3,36 @@ JWT token utilities for authentication and verification.
 
 This module provides functions to create, decode, and validate purpose-bound
 JWTs. It includes database-backed protection against token reuse via the
-`UsedToken` model and enforces strict decoding + purpose checking.
+`UsedToken` model, enforces strict decoding + purpose checking, and provides
+a single-statement redeem operation for one-time tokens.
+
+One-time tokens may also be opaque (see `app.core.tokens.opaque`). Those
+are validated by hash lookup alone, against the owner and `expires_at`
+stored in their row; JWT one-time tokens are still decoded first.
 """
 
+import secrets
+import time
 from datetime import datetime, timedelta, timezone
 from uuid import UUID
 
 from fastapi import HTTPException
-from jose import JWTError, jwt
-from sqlalchemy import select
-from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import hash_str
-from app.core.tokens.purposes import TokenPurpose
+from app.core.metrics import JWT_SECONDS
+from app.core.security import hash_token
+from app.core.tokens.codec import JWTDecodeError, get_codec
+from app.core.tokens.opaque import is_opaque_token
 from app.core.tokens.status import TokenStatus
 from app.exceptions.handlers import TokenValidationError
 from app.models import User
 from app.models.used_token import UsedToken
 
+_ENCODE_SECONDS = JWT_SECONDS.labels(operation="encode")
+_DECODE_SECONDS = JWT_SECONDS.labels(operation="decode")
+
 
 def create_token(
     user_id: UUID,
@@ -44,17 +55,30 @@ def create_token(
         str: The encoded JWT.
     """
     exp = datetime.now(tz=timezone.utc) + expires_delta
-    payload = {"sub": str(user_id), "exp": exp, "purpose": purpose}
+    # `jti` keeps tokens minted for the same user in the same second distinct,
+    # so superseding one never revokes (or re-validates) another
+    payload = {
+        "sub": str(user_id),
+        "exp": exp,
+        "purpose": purpose,
+        "jti": secrets.token_urlsafe(12),
+    }
 
     if version is not None:
         payload["ver"] = str(version)
-    return jwt.encode(claims=payload, key=secret, algorithm="HS256")
+
+    started = time.perf_counter()
+    token = get_codec(secret).encode(payload)
+    _ENCODE_SECONDS.observe(time.perf_counter() - started)
+    return token
 
 
 def decode_token(token: str, expected_purpose: str, secret: str) -> dict:
     """
     Decodes a JWT and validates its intended purpose.
 
+    Signature, `exp` and `nbf` are checked by the HS256 codec.
+
     Args:
         token (str): JWT string to decode.
         expected_purpose (str): Purpose expected to be embedded in the token.
@@ -66,107 +90,186 @@ def decode_token(token: str, expected_purpose: str, secret: str) -> dict:
     Raises:
         TokenValidationError: If decoding fails or the purpose is incorrect.
     """
+    started = time.perf_counter()
     try:
-        dec = jwt.decode(token, secret, algorithms=["HS256"])
-    except JWTError:
+        dec = get_codec(secret).decode(token)
+    except JWTDecodeError:
         raise TokenValidationError("JWT decode failed")
+    finally:
+        _DECODE_SECONDS.observe(time.perf_counter() - started)
 
     if dec.get("purpose") != expected_purpose:
         raise TokenValidationError(f"Unexpected token purpose: {dec.get('purpose')}")
 
-    unix_time = datetime.fromtimestamp(dec.get("exp"), tz=timezone.utc)
+    return dec
 
-    if unix_time <= datetime.now(tz=timezone.utc):
-        raise TokenValidationError("Token has expired")
 
-    return dec
+def _decode_subject(token: str, purpose: str, secret: str) -> UUID:
+    """
+    Decodes a JWT and extracts its `sub` claim as a UUID.
+
+    Raises:
+        TokenValidationError: If decoding fails or the subject is not a UUID.
+    """
+    try:
+        payload = decode_token(token, purpose, secret)
+    except TokenValidationError:
+        raise TokenValidationError("Token could not be decoded")
+
+    try:
+        raw_sub = payload.get("sub")
+        return raw_sub if isinstance(raw_sub, UUID) else UUID(raw_sub)
+    except (TypeError, ValueError):
+        raise TokenValidationError("Token subject is invalid or missing")
 
 
 async def validate_token(
     token: str, purpose: str, secret: str, db: AsyncSession
 ) -> UUID:
     """
-    Validates a JWT and checks it hasn't been reused.
+    Validates a one-time token and checks it hasn't been reused.
 
     Args:
-        token (str): The JWT string.
+        token (str): The JWT or opaque token string.
         purpose (str): Expected token purpose (e.g., 'verify_email').
         secret (str): Secret for decoding the token.
         db (AsyncSession): Async SQLAlchemy session for DB checks.
 
     Returns:
-        UUID: The `sub` (user ID) field from the token.
+        UUID: ID of the user the token was issued to.
 
     Raises:
         TokenValidationError: If the token is invalid, expired, reused, or purpose mismatched.
     """
-    try:
-        payload = decode_token(token, purpose, secret)
-    except TokenValidationError:
-        raise TokenValidationError("Token could not be decoded")
+    opaque = is_opaque_token(token)
+    user_id = None if opaque else _decode_subject(token, purpose, secret)
 
-    try:
-        raw_sub = payload.get("sub")
-        user_id = raw_sub if isinstance(raw_sub, UUID) else UUID(raw_sub)
-    except (TypeError, ValueError):
-        raise TokenValidationError("Token subject is invalid or missing")
-
-    token_hash = hash_str(token, purpose)
+    token_hash = hash_token(token, purpose)
 
     result = await db.execute(select(UsedToken).filter_by(token_hash=token_hash))
     entry = result.scalar_one_or_none()
 
-    if not entry:
+    if not entry or (user_id is not None and entry.user_id != user_id):
         raise TokenValidationError("Token not found or already used")
     if (
         entry.status != TokenStatus.ISSUED
-        or entry.purpose != TokenPurpose.EMAIL_VERIFICATION
+        or entry.purpose != purpose
         or entry.redeemed_at is not None
+        or (entry.expires_at is None and opaque)
+        or (
+            entry.expires_at is not None
+            and entry.expires_at <= datetime.now(timezone.utc)
+        )
     ):
         raise TokenValidationError("Token expired or invalid")
 
-    return user_id
+    return entry.user_id
 
 
-async def modify_token_status(token: str, purpose: str, db: AsyncSession) -> None:
-    token_hash = hash_str(token, purpose)
+def _live_token_clauses(token: str, purpose: str, secret: str) -> list:
+    """
+    WHERE clauses matching the still-redeemable row of a one-time token.
 
-    try:
-        stmt = select(UsedToken).where(UsedToken.token_hash == token_hash)
-        result = await db.execute(stmt)
-        used_token = result.scalar_one_or_none()
+    Raises:
+        TokenValidationError: If a JWT token fails to decode.
+    """
+    clauses = [
+        UsedToken.token_hash == hash_token(token, purpose),
+        UsedToken.purpose == purpose,
+        UsedToken.status == TokenStatus.ISSUED,
+        UsedToken.redeemed_at.is_(None),
+    ]
+    if is_opaque_token(token):
+        # The row is the only record of the token's expiry
+        clauses.append(UsedToken.expires_at > func.now())
+    else:
+        # Rows staged before `expires_at` existed rely on the JWT's `exp`
+        clauses.append(UsedToken.user_id == _decode_subject(token, purpose, secret))
+        clauses.append(
+            or_(UsedToken.expires_at.is_(None), UsedToken.expires_at > func.now())
+        )
+    return clauses
+
+
+async def consume_token(
+    token: str, purpose: str, secret: str, db: AsyncSession
+) -> UUID | None:
+    """
+    Atomically marks a one-time token as redeemed, leaving its owner as is.
 
-        if not used_token:
-            raise TokenValidationError("Token not found")
+    Like `redeem_token`, a single conditional `UPDATE`: of several concurrent
+    attempts on one token exactly one gets the row. The session is not
+    committed, so whatever the caller issues in exchange commits with it.
 
-        used_token.status = TokenStatus.REDEEMED
-        used_token.redeemed_at = datetime.now(tz=timezone.utc)
+    Args:
+        token (str): The JWT or opaque token string.
+        purpose (str): Expected token purpose (e.g., 'auth_refresh').
+        secret (str): Secret for decoding the token (unused for opaque tokens).
+        db (AsyncSession): Async SQLAlchemy session for DB writes.
 
-        await db.commit()
-    except IntegrityError:
-        await db.rollback()
-        raise HTTPException(status_code=400, detail="Database integrity error")
-    except SQLAlchemyError:
-        await db.rollback()
-        raise HTTPException(status_code=500, detail="Unexpected database error")
+    Returns:
+        UUID | None: ID of the token's owner, or None if it was not live.
 
+    Raises:
+        TokenValidationError: If a JWT token fails to decode.
+    """
+    return await db.scalar(
+        update(UsedToken)
+        .where(*_live_token_clauses(token, purpose, secret))
+        .values(status=TokenStatus.REDEEMED, redeemed_at=func.now())
+        .returning(UsedToken.user_id)
+        .execution_options(synchronize_session=False)
+    )
 
-async def mark_user_verified(user_id: UUID, db: AsyncSession) -> None:
-    stmt = select(User).where(User.id == user_id)
-    result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
 
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+async def redeem_token(token: str, purpose: str, secret: str, db: AsyncSession) -> UUID:
+    """
+    Atomically redeems a one-time token and marks its owner as verified.
 
-    user.is_verified = True
-    user.verified_at = datetime.now(tz=timezone.utc)  # Optional
+    The token row and the user row are updated by a single statement: an
+    `UPDATE ... RETURNING` on `used_tokens` chained into the `users` update
+    via a CTE. Only a row still in the ISSUED state can match, so concurrent
+    redemptions of the same token serialize on the row lock and exactly one
+    of them succeeds.
+
+    Args:
+        token (str): The JWT or opaque token string.
+        purpose (str): Expected token purpose (e.g., 'verify_email').
+        secret (str): Secret for decoding the token (unused for opaque tokens).
+        db (AsyncSession): Async SQLAlchemy session for DB writes.
+
+    Returns:
+        UUID: ID of the user that was verified.
+
+    Raises:
+        TokenValidationError: If the token is invalid, expired, or already used.
+        HTTPException: If the database write fails.
+    """
+    redeemed = (
+        update(UsedToken)
+        .where(*_live_token_clauses(token, purpose, secret))
+        .values(status=TokenStatus.REDEEMED, redeemed_at=func.now())
+        .returning(UsedToken.user_id)
+        .cte("redeemed")
+    )
+    # Returning the entity refreshes any copy already loaded in this session
+    stmt = (
+        update(User)
+        .where(User.id == redeemed.c.user_id)
+        .values(is_verified=True)
+        .returning(User)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
 
     try:
+        result = await db.execute(stmt)
+        user = result.scalar_one_or_none()
         await db.commit()
-    except IntegrityError:
-        await db.rollback()
-        raise HTTPException(status_code=400, detail="Could not verify user")
     except SQLAlchemyError:
         await db.rollback()
-        raise HTTPException(status_code=500, detail="Database error")
+        raise HTTPException(status_code=500, detail="Unexpected database error")
+
+    if user is None:
+        raise TokenValidationError("Token not found or already used")
+
+    return user.id
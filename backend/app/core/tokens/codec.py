@@ -0,0 +1,205 @@
+"""
+Minimal HS256 JWT codec.
+
+Every token this service issues (session, refresh and email tokens) is an
+HS256 JWT with a fixed header. `python-jose` handles them through its
+generic JWS machinery: the key is re-parsed and wrapped on every call, the
+header and payload go through several decode layers, and claims are
+validated one option at a time. `HS256Codec` does only what HS256 needs:
+
+- One HMAC-SHA256 object is keyed per secret and copied for each token, so
+  the key schedule is computed once instead of per call.
+- The header segment is a precomputed constant. Tokens carrying exactly
+  that header skip header decoding; others are parsed and must say HS256.
+- The signature is checked before the payload is touched, and the payload
+  is parsed with a single `json.loads`.
+- `exp` is required and, like `nbf`, enforced here, so callers need no
+  second check.
+
+Tokens are byte-compatible with `python-jose` in both directions.
+"""
+
+import base64
+import binascii
+import calendar
+import hashlib
+import hmac
+import json
+import time
+from datetime import datetime
+
+
+class JWTDecodeError(Exception):
+    """Raised when a token is malformed, forged, or outside its validity window."""
+
+
+_HEADER = {"alg": "HS256", "typ": "JWT"}
+_HEADER_SEGMENT = (
+    base64.urlsafe_b64encode(
+        json.dumps(_HEADER, separators=(",", ":"), sort_keys=True).encode()
+    )
+    .rstrip(b"=")
+    .decode("ascii")
+)
+
+# Global codec cache, one per signing secret
+_codecs: dict[str, "HS256Codec"] = {}
+
+
+def b64url_encode(data: bytes) -> str:
+    """
+    Encode bytes as unpadded base64url text.
+
+    Args:
+        data (bytes): Raw bytes.
+
+    Returns:
+        str: Base64url without `=` padding.
+    """
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def b64url_decode(segment: str) -> bytes:
+    """
+    Decode unpadded base64url text.
+
+    Args:
+        segment (str): Base64url text, with or without padding.
+
+    Returns:
+        bytes: The decoded bytes.
+
+    Raises:
+        JWTDecodeError: If the segment is not valid base64url.
+    """
+    try:
+        raw = segment.encode("ascii")
+        return base64.urlsafe_b64decode(raw + b"=" * (-len(raw) % 4))
+    except (UnicodeEncodeError, binascii.Error, ValueError):
+        raise JWTDecodeError("Invalid base64url segment")
+
+
+def _timestamp(value) -> int:
+    # Same conversion python-jose applies to datetime claims
+    if isinstance(value, datetime):
+        return calendar.timegm(value.utctimetuple())
+    return value
+
+
+class HS256Codec:
+    """
+    Encoder and verifier for HS256 JWTs signed with one secret.
+
+    Attributes:
+        leeway (float): Seconds of clock skew tolerated for `exp` and `nbf`.
+        require_exp (bool): Reject tokens without an `exp` claim.
+    """
+
+    def __init__(
+        self, secret: str | bytes, leeway: float = 0, require_exp: bool = True
+    ):
+        key = secret.encode() if isinstance(secret, str) else secret
+        self._mac = hmac.new(key, digestmod=hashlib.sha256)
+        self.leeway = leeway
+        self.require_exp = require_exp
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        mac = self._mac.copy()
+        mac.update(signing_input)
+        return mac.digest()
+
+    def encode(self, claims: dict) -> str:
+        """
+        Sign a set of claims.
+
+        Args:
+            claims (dict): JSON-serializable claims; `exp`, `iat` and `nbf`
+                may be aware datetimes.
+
+        Returns:
+            str: The compact JWT.
+        """
+        for name in ("exp", "iat", "nbf"):
+            if name in claims:
+                claims = {**claims, name: _timestamp(claims[name])}
+
+        payload = b64url_encode(json.dumps(claims, separators=(",", ":")).encode())
+        signing_input = f"{_HEADER_SEGMENT}.{payload}"
+        signature = self._sign(signing_input.encode("ascii"))
+        return f"{signing_input}.{b64url_encode(signature)}"
+
+    def decode(self, token: str, now: float | None = None) -> dict:
+        """
+        Verify a token's signature and validity window and return its claims.
+
+        Args:
+            token (str): The compact JWT.
+            now (float, optional): Unix time to validate against.
+
+        Returns:
+            dict: The token's claims.
+
+        Raises:
+            JWTDecodeError: If the token is malformed, not HS256, carries a
+                bad signature, has no `exp` (when required), is expired or
+                not yet valid.
+        """
+        try:
+            signing_input, signature = token.rsplit(".", 1)
+            header, payload = signing_input.split(".")
+        except (AttributeError, ValueError):
+            raise JWTDecodeError("Token must have three segments")
+
+        if header != _HEADER_SEGMENT:
+            try:
+                parsed = json.loads(b64url_decode(header))
+            except ValueError:
+                raise JWTDecodeError("Invalid header")
+            if not isinstance(parsed, dict) or parsed.get("alg") != "HS256":
+                raise JWTDecodeError("Unsupported algorithm")
+
+        expected = self._sign(signing_input.encode("ascii", "replace"))
+        if not hmac.compare_digest(expected, b64url_decode(signature)):
+            raise JWTDecodeError("Signature verification failed")
+
+        try:
+            claims = json.loads(b64url_decode(payload))
+        except ValueError:
+            raise JWTDecodeError("Invalid payload")
+        if not isinstance(claims, dict):
+            raise JWTDecodeError("Payload must be a JSON object")
+
+        now = time.time() if now is None else now
+        exp = claims.get("exp")
+        if exp is None and self.require_exp:
+            raise JWTDecodeError("Token has no expiration")
+        if exp is not None:
+            if not isinstance(exp, (int, float)) or isinstance(exp, bool):
+                raise JWTDecodeError("Expiration claim must be a number")
+            if exp <= now - self.leeway:
+                raise JWTDecodeError("Token has expired")
+
+        nbf = claims.get("nbf")
+        if nbf is not None:
+            if not isinstance(nbf, (int, float)) or isinstance(nbf, bool):
+                raise JWTDecodeError("Not-before claim must be a number")
+            if nbf > now + self.leeway:
+                raise JWTDecodeError("Token is not yet valid")
+
+        return claims
+
+
+def get_codec(secret: str) -> HS256Codec:
+    """
+    Return the shared codec for a signing secret, creating it on first use.
+
+    Args:
+        secret (str): The HMAC secret.
+
+    Returns:
+        HS256Codec: A codec keyed with `secret`.
+    """
+    codec = _codecs.get(secret)
+    if codec is None:
+        codec = _codecs[secret] = HS256Codec(secret)
+    return codec
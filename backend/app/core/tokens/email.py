@@ -1,8 +1,11 @@
 """
-Email verification token generator.
+Email verification and password reset token generator.
 
-Creates purpose-bound, time-limited tokens tied to user identity,
-specifically for email verification workflows.
+Creates purpose-bound, time-limited tokens tied to user identity for
+workflows that deliver a one-time link by email. Depending on
+`ONE_TIME_TOKEN_FORMAT` these are signed JWTs or opaque random tokens; in
+both cases the token's hash and expiry are stored in `used_tokens`, which
+decides whether it can be redeemed.
 """
 
 from datetime import timedelta
@@ -11,23 +14,77 @@ from sqlalchemy.dialects.postgresql.base import UUID
 
 from app.core.config import settings
 from app.core.tokens.base import create_token
+from app.core.tokens.opaque import create_opaque_token
 from app.core.tokens.purposes import TokenPurpose
 
 
-def get_email_token(user_id: UUID) -> str:
+def token_lifetime(purpose: TokenPurpose) -> timedelta:
     """
-    Generate a short-lived token for verifying the user's email address.
+    How long a one-time token of the given purpose stays redeemable.
 
     Args:
-        user_id (UUID): Unique identifier for the target user.
+        purpose (TokenPurpose): EMAIL_VERIFICATION, PASSWORD_RESET or REFRESH.
+
+    Returns:
+        timedelta: The configured lifetime.
+    """
+    if purpose == TokenPurpose.PASSWORD_RESET:
+        return timedelta(minutes=settings.PASSWORD_RESET_TOKEN_EXPIRES_MINUTES)
+    if purpose == TokenPurpose.REFRESH:
+        return timedelta(minutes=settings.AUTH_REFRESH_DURATION)
+    return timedelta(minutes=settings.EMAIL_TOKEN_EXPIRES_MINUTES)
+
+
+def longest_token_lifetime() -> timedelta:
+    """
+    The longest time any row in `used_tokens` can stay redeemable.
 
     Returns:
-        str: Signed and encoded verification token.
+        timedelta: The largest of the configured one-time token lifetimes.
     """
+    return max(
+        token_lifetime(purpose)
+        for purpose in (
+            TokenPurpose.EMAIL_VERIFICATION,
+            TokenPurpose.PASSWORD_RESET,
+            TokenPurpose.REFRESH,
+        )
+    )
+
+
+def _one_time_token(user_id: UUID, purpose: TokenPurpose) -> str:
+    if settings.ONE_TIME_TOKEN_FORMAT == "opaque":
+        return create_opaque_token()
     return create_token(
         user_id,
-        TokenPurpose.EMAIL_VERIFICATION,
-        timedelta(minutes=settings.EMAIL_TOKEN_EXPIRES_MINUTES),
+        purpose,
+        token_lifetime(purpose),
         settings.EMAIL_TOKEN_SECRET,
         version=None,
     )
+
+
+def get_email_token(user_id: UUID) -> str:
+    """
+    Generate a short-lived token for verifying the user's email address.
+
+    Args:
+        user_id (UUID): Unique identifier for the target user.
+
+    Returns:
+        str: Verification token in the configured format.
+    """
+    return _one_time_token(user_id, TokenPurpose.EMAIL_VERIFICATION)
+
+
+def get_password_reset_token(user_id: UUID) -> str:
+    """
+    Generate a short-lived token authorizing a password reset.
+
+    Args:
+        user_id (UUID): Unique identifier for the target user.
+
+    Returns:
+        str: Reset token in the configured format.
+    """
+    return _one_time_token(user_id, TokenPurpose.PASSWORD_RESET)
@@ -32,3 +32,7 @@ class TokenStatus(str, Enum):
     FAILED = "failed"
     REPLACED = "replaced"
     # Add more above this comment, as needed.
+
+
+# Statuses of tokens that are queued for delivery or can still be redeemed
+LIVE_TOKEN_STATUSES = (TokenStatus.PENDING, TokenStatus.ISSUED)
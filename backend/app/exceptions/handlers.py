@@ -17,6 +17,9 @@ from fastapi.responses import JSONResponse
 from slowapi.errors import RateLimitExceeded
 from starlette.status import HTTP_400_BAD_REQUEST
 
+from app.core.metrics import LIMITER_REJECTIONS
+from app.core.telemetry import route_template
+
 
 async def validation_exception_handler(
     request: Request, exc: RequestValidationError
@@ -75,9 +78,14 @@ async def http_exception_handler(request: Request, exc: HTTPException) -> JSONRe
     Returns:
         JSONResponse: A structured response with optional custom codes.
     """
+    # Keep headers such as WWW-Authenticate set by the raiser
+    headers = getattr(exc, "headers", None)
+
     # If a dict was passed as the .detail, trust it and return directly
     if isinstance(exc.detail, dict):
-        return JSONResponse(status_code=exc.status_code, content=exc.detail)
+        return JSONResponse(
+            status_code=exc.status_code, content=exc.detail, headers=headers
+        )
 
     # Otherwise, fallback to generic safe message
     response_data = {
@@ -90,7 +98,9 @@ async def http_exception_handler(request: Request, exc: HTTPException) -> JSONRe
     if exc.status_code == 409:
         response_data["errorCode"] = "DUPLICATE_USER"
 
-    return JSONResponse(status_code=exc.status_code, content=response_data)
+    return JSONResponse(
+        status_code=exc.status_code, content=response_data, headers=headers
+    )
 
 
 def extract_error_info(exc: RequestValidationError) -> dict:
@@ -135,7 +145,67 @@ class TokenValidationError(Exception):
         return self.detail
 
 
+class HashingUnavailableError(Exception):
+    """
+    Raised when the password hashing pool cannot accept more work.
+
+    Surfaces as a 503 so clients back off instead of queueing behind
+    an already saturated pool.
+    """
+
+    def __init__(self, detail: str = "Password hashing capacity exhausted"):
+        self.detail = detail
+
+    def __str__(self):
+        return self.detail
+
+
+async def hashing_unavailable_handler(request: Request, exc: HashingUnavailableError):
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": "1"},
+        content={
+            "error": "SERVICE_UNAVAILABLE",
+            "errorCode": "SERVER_BUSY",
+            "errorMessage": "The server is busy. Please try again shortly.",
+        },
+    )
+
+
+class LoginThrottledError(Exception):
+    """
+    Raised when an identifier is backing off after repeated failed logins.
+
+    Carries the number of seconds until the next attempt is accepted, which
+    is returned to the client in the Retry-After header.
+    """
+
+    def __init__(self, retry_after: int):
+        self.retry_after = retry_after
+
+    def __str__(self):
+        return f"Login throttled for {self.retry_after}s"
+
+
+async def login_throttled_handler(request: Request, exc: LoginThrottledError):
+    LIMITER_REJECTIONS.labels(
+        limiter="login_guard", route=route_template(request.scope)
+    ).inc()
+    return JSONResponse(
+        status_code=429,
+        headers={"Retry-After": str(exc.retry_after)},
+        content={
+            "error": "LOGIN_FAILED",
+            "errorCode": "TOO_MANY_ATTEMPTS",
+            "errorMessage": "Too many failed login attempts. Please try again later.",
+        },
+    )
+
+
 async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
+    LIMITER_REJECTIONS.labels(
+        limiter="rate_limit", route=route_template(request.scope)
+    ).inc()
     return JSONResponse(
         status_code=429,
         content={
@@ -10,11 +10,17 @@ from fastapi.exceptions import HTTPException, RequestValidationError
 from slowapi.errors import RateLimitExceeded
 
 from app.api.v1 import base
+from app.core.concurrency import AdaptiveConcurrencyMiddleware
 from app.core.config import settings
 from app.core.lifespan import lifespan  # ✅ NEW: lifespan support
 from app.core.limiting import limiter
+from app.core.telemetry import RequestMetricsMiddleware, metrics_endpoint
 from app.exceptions.handlers import (
+    HashingUnavailableError,
+    LoginThrottledError,
+    hashing_unavailable_handler,
     http_exception_handler,
+    login_throttled_handler,
     rate_limit_handler,
     validation_exception_handler,
 )
@@ -30,6 +36,15 @@ app = FastAPI(
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, rate_limit_handler)
 
+# Time every request by route; shed requests are counted by the limiter below
+if settings.METRICS_ENABLED:
+    app.add_middleware(RequestMetricsMiddleware)
+    app.add_api_route("/metrics", metrics_endpoint, include_in_schema=False)
+
+# Shed excess login/registration load before it queues; /health is never limited
+if settings.ADAPTIVE_CONCURRENCY_ENABLED:
+    app.add_middleware(AdaptiveConcurrencyMiddleware)
+
 # Register custom exception handlers
 app.add_exception_handler(
     RequestValidationError, validation_exception_handler
@@ -39,5 +54,13 @@ app.add_exception_handler(
     HTTPException, http_exception_handler
 )  # type: ignore[arg-type]
 
+app.add_exception_handler(
+    HashingUnavailableError, hashing_unavailable_handler
+)  # type: ignore[arg-type]
+
+app.add_exception_handler(
+    LoginThrottledError, login_throttled_handler
+)  # type: ignore[arg-type]
+
 # Include API version 1 routes with a common prefix.
 app.include_router(base.api_router, prefix="/api/v1/routers")
@@ -1,9 +1,11 @@
 # app/models/__init__.py
 
+from .email_outbox import EmailOutbox
 from .used_token import UsedToken
 from .user import User
 
 __all__ = [
     "User",
     "UsedToken",
+    "EmailOutbox",
 ]
@@ -0,0 +1,78 @@
+"""
+SQLAlchemy model definition for `EmailOutbox`.
+
+Each row is one outbound email waiting for (or done with) delivery by the
+background outbox worker. Rows are inserted in the same transaction as the
+data that triggered them, so an email is never lost or sent for a rolled
+back registration.
+"""
+
+from sqlalchemy import Column, DateTime
+from sqlalchemy import Enum as PgEnum  # alias to avoid conflict with Python's Enum
+from sqlalchemy import ForeignKey, Index, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.sql.functions import func
+
+from app.core.base import Base
+from app.core.ids import uuid7
+from app.core.outbox import EmailKind, OutboxStatus
+
+
+class EmailOutbox(Base):
+    """
+    ORM model for a queued outbound email.
+
+    Fields:
+        id (UUID): Unique record identifier.
+        user_id (UUID): Recipient user.
+        kind (EmailKind): Which mailer renders and sends the message.
+        payload (dict | None): Mailer arguments; cleared once delivered.
+        status (OutboxStatus): Delivery state.
+        attempts (int): Number of delivery attempts made so far.
+        next_attempt_at (datetime): Earliest time the next attempt may run.
+        last_error (str | None): Error from the most recent failed attempt.
+        created_at (datetime): Timestamp when the entry was queued.
+        sent_at (datetime | None): Timestamp of successful delivery.
+    """
+
+    __tablename__ = "email_outbox"
+
+    # Fetch server defaults (created_at, ...) via INSERT ... RETURNING instead
+    # of leaving them expired for a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+
+    kind = Column(PgEnum(EmailKind, name="emailkind"), nullable=False)
+
+    # May contain one-time secrets (e.g. a verification token) until delivered
+    payload = Column(JSONB, nullable=True)
+
+    status = Column(
+        PgEnum(OutboxStatus, name="outboxstatus"),
+        nullable=False,
+        default=OutboxStatus.PENDING,
+    )
+
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+
+    next_attempt_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+    last_error = Column(String, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Keeps the worker's "what is due?" scan small as sent rows accumulate
+        Index(
+            "ix_email_outbox_due",
+            "next_attempt_at",
+            postgresql_where=(status == OutboxStatus.PENDING),
+        ),
+    )
@@ -5,17 +5,22 @@ Tracks the lifecycle and usage of hashed tokens, such as:
 - One-time email verification links
 - Password reset tokens
 - Any token with single-use or revocation semantics
-"""
 
-import uuid
+The table is range-partitioned by month on `created_at`, so old tokens are
+retired by detaching or dropping a whole partition instead of deleting rows.
+Partitions are named `used_tokens_pYYYY_MM`; rows outside every partition
+land in `used_tokens_default` until the next maintenance pass moves them.
+See `app.services.token_partitions`.
+"""
 
-from sqlalchemy import Column, DateTime
+from sqlalchemy import DDL, Column, DateTime
 from sqlalchemy import Enum as PgEnum  # alias to avoid conflict with Python's Enum
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, Index, LargeBinary, event
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql.functions import func
 
 from app.core.base import Base
+from app.core.ids import uuid7
 from app.core.tokens.purposes import TokenPurpose
 from app.core.tokens.status import TokenStatus
 
@@ -25,31 +30,89 @@ class UsedToken(Base):
     ORM model for storing metadata about previously used or issued tokens.
 
     Fields:
-        id (UUID): Unique record identifier.
-        token_hash (str): Hashed representation of the original token. Indexed for lookup.
+        id (UUID): Unique record identifier (primary key with `created_at`).
+        token_hash (bytes): 32-byte SHA256 of the original token.
         purpose (str): Human-readable description of the token's intent (e.g., "email_verification").
-        created_at (datetime): Timestamp when the token was issued/stored.
+        created_at (datetime): Timestamp when the token was issued/stored;
+            also the partition key.
         redeemed_at (datetime | None): Optional timestamp for when the token was used or consumed.
+        expires_at (datetime | None): When the token stops being redeemable; the
+            only expiry record for opaque tokens. NULL for rows staged before it
+            existed.
         status (str): Freeform status label (e.g., "used", "revoked", "expired").
     """
 
     __tablename__ = "used_tokens"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # Fetch server defaults (created_at, ...) via INSERT ... RETURNING instead
+    # of leaving them expired for a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
+
+    # A partitioned table's primary key must include the partition key
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
 
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
 
-    # Hashed form of the token; never store raw token data
-    token_hash = Column(String, nullable=False, index=True)
+    # Hashed form of the token; never store raw token data. Unique in
+    # practice but not enforced by the database: a unique index on a
+    # partitioned table must contain the partition key, and a unique
+    # (token_hash, created_at) would still admit the same hash twice. Tokens
+    # differ because every JWT carries a random `jti` and opaque tokens are
+    # random themselves
+    token_hash = Column(LargeBinary(32), nullable=False, index=True)
 
     # Optional purpose tag (e.g. "password_reset")
     purpose = Column(PgEnum(TokenPurpose, name="tokenpurpose"), nullable=False)
 
-    # Created automatically at insert
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Created automatically at insert; selects the monthly partition
+    created_at = Column(
+        DateTime(timezone=True),
+        primary_key=True,
+        nullable=False,
+        server_default=func.now(),
+    )
 
     # Set to non-null when the token is consumed
     redeemed_at = Column(DateTime(timezone=True), nullable=True)
 
+    # Checked on redeem; opaque tokens carry no `exp` claim of their own
+    expires_at = Column(DateTime(timezone=True), nullable=True)
+
     # Status field for audit/debugging (e.g. used/revoked/expired)
     status = Column(PgEnum(TokenStatus, name="tokenstatus"), nullable=False)
+
+    __table_args__ = (
+        # Covers the redeem predicate, so checking a live token never reads
+        # the heap; redeemed and expired rows stay out of it
+        Index(
+            "ix_used_tokens_issued",
+            "token_hash",
+            postgresql_where=(status == TokenStatus.ISSUED),
+            postgresql_include=["user_id", "purpose", "redeemed_at"],
+        ),
+        # Per-user lookups such as "this user's live verification tokens"
+        Index("ix_used_tokens_user_purpose_status", "user_id", "purpose", "status"),
+        # Sweeper scans: overdue live tokens, and old rows to archive
+        Index(
+            "ix_used_tokens_live_created_at",
+            "created_at",
+            postgresql_where=status.in_([TokenStatus.PENDING, TokenStatus.ISSUED]),
+        ),
+        Index("ix_used_tokens_created_at", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+
+# Catch-all partition, so inserts never fail when maintenance falls behind
+DEFAULT_PARTITION = "used_tokens_default"
+
+_default_partition = DDL(
+    f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF used_tokens DEFAULT"
+)
+
+# Mirrors the migration so `create_all` (tests) gets a usable table
+event.listen(
+    UsedToken.__table__,
+    "after_create",
+    _default_partition.execute_if(dialect="postgresql"),
+)
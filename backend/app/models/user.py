@@ -1,15 +1,15 @@
 """
 SQLAlchemy model definition for the `User` table.
 
-Defines a basic user entity with required identity and authentication fields.
+Defines a basic user entity with required identity and authentication fields,
+plus a trigger that announces new or changed identifiers on a NOTIFY channel.
 """
 
-import uuid
-
-from sqlalchemy import Boolean, Column, Integer, String
+from sqlalchemy import DDL, Boolean, Column, DateTime, Integer, String, event
 from sqlalchemy.dialects.postgresql import UUID
 
 from app.core.base import Base
+from app.core.ids import uuid7
 
 
 class User(Base):
@@ -17,17 +17,24 @@ class User(Base):
     SQLAlchemy ORM model for a registered user.
 
     Attributes:
-        id (UUID): Primary key, auto-generated using uuid4.
+        id (UUID): Primary key, auto-generated as a time-ordered UUIDv7.
         username (str): Unique username, indexed for fast lookup.
         email (str): Unique email address, also indexed.
         display_name (str): User-friendly name for display purposes.
         hashed_password (str): Hashed password, never stored in plain text.
         is_verified (bool): Verification Status, changed after user redeems verification token.
+        is_locked (bool): Disabled by an administrator until explicitly unlocked.
+        token_version (int): Bumped to revoke every session issued so far.
+        failed_login_count (int): Failed logins since the last success or
+            lockout, persisted in batches.
+        last_failed_login_at (datetime): Time of the most recent persisted
+            failed login.
+        locked_until (datetime): End of a lockout after repeated failed logins.
     """
 
     __tablename__ = "users"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)  # UUIDv4 PK
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)  # UUIDv7 PK
     username = Column(String, unique=True, index=True)  # Used for login/display
     email = Column(String, unique=True, index=True)  # Must be validated and unique
     display_name = Column(String)  # Non-unique, user-facing alias
@@ -35,4 +42,44 @@ class User(Base):
     is_verified = Column(Boolean, nullable=False, default=False)
     is_locked = Column(Boolean, nullable=False, default=False, server_default="false")
     token_version = Column(Integer, nullable=False, default=0, server_default="0")
+    failed_login_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_failed_login_at = Column(DateTime(timezone=True), nullable=True)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+
+
+# Channel on which every app worker learns about new or renamed identifiers
+IDENTIFIER_CHANNEL = "user_identifiers"
+
+_notify_identifiers_function = DDL(
+    """
+CREATE OR REPLACE FUNCTION notify_user_identifiers() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify(
+        'user_identifiers',
+        json_build_object('u', NEW.username, 'e', NEW.email)::text
+    );
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+)
+
+_notify_identifiers_trigger = DDL(
+    """
+CREATE TRIGGER users_notify_identifiers
+AFTER INSERT OR UPDATE OF username, email ON users
+FOR EACH ROW EXECUTE FUNCTION notify_user_identifiers()
+"""
+)
 
+# Mirrors the migration so `create_all` (tests) gets the same trigger
+event.listen(
+    User.__table__,
+    "after_create",
+    _notify_identifiers_function.execute_if(dialect="postgresql"),
+)
+event.listen(
+    User.__table__,
+    "after_create",
+    _notify_identifiers_trigger.execute_if(dialect="postgresql"),
+)
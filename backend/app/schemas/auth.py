@@ -19,14 +19,14 @@ class UsedToken(BaseModel):
     Attributes:
         id (UUID): Primary ID of the token record.
         user_id (UUID): ID of the user this token was issued to.
-        token_hash (str): Hashed version of the token string.
+        token_hash (bytes): SHA256 digest of the token string.
         issued_at (datetime): Timestamp when the token was issued.
         created_at (datetime): Timestamp when the token was stored as used.
     """
 
     id: UUID
     user_id: UUID
-    token_hash: str
+    token_hash: bytes
     issued_at: datetime
     created_at: datetime
 
@@ -52,3 +52,16 @@ class LoginRequest(BaseModel):
         "populate_by_name": True,  # allows backend to use snake_case while frontend sends camelCase
         "extra": "forbid",  # optional: reject unknown fields
     }
+
+
+class RefreshRequest(BaseModel):
+    """
+    Schema for refresh token rotation requests.
+
+    Attributes:
+        refresh_token (str): The refresh token issued at login or last refresh.
+    """
+
+    refresh_token: str = Field(alias="refreshToken")
+
+    model_config = {"populate_by_name": True, "extra": "forbid"}
@@ -0,0 +1,506 @@
+"""
+Authenticated-request dependency for protected routes.
+
+`get_current_user` resolves the `Authorization: Bearer <session token>`
+header issued by `login_user` into a `CurrentUser` without a database round
+trip:
+
+- Verified claims are cached per worker in a bounded LRU keyed by a BLAKE2b
+  digest of the token (the raw bearer token is never kept), until the
+  token's own `exp`. A repeat request with the same token costs one digest
+  and one dict lookup instead of an HMAC verification and a JSON parse.
+- With `AUTH_CHECK_TOKEN_VERSION` enabled, the token's `ver` claim is
+  compared with `User.token_version`, so bumping the version (global
+  logout) revokes every outstanding session and refresh token. Versions
+  come from `TokenVersionCache`: a per-worker cache with a short TTL in
+  which concurrent misses for one user share a single indexed lookup, so
+  a refresh storm after a deploy costs at most one query per user per
+  `AUTH_VERSION_CACHE_TTL_SECONDS`. Another worker's cached version can lag
+  a global logout by up to that TTL.
+
+Refresh tokens are single use. Each one is recorded in `used_tokens` when
+issued and redeemed when exchanged for a new pair; presenting an already
+redeemed one means it leaked, so every session of its user is revoked.
+Refresh tokens issued before they were recorded have no row; while
+`AUTH_REFRESH_ACCEPT_UNTRACKED` is on, such a token is accepted once and
+recorded as redeemed on first use, so upgrading does not log users out.
+
+Routes that need the full `User` row load it themselves from
+`CurrentUser.id`.
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from uuid import UUID
+
+from fastapi import HTTPException, Request
+from loguru import logger
+from sqlalchemy import func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.constants.messages import Auth
+from app.core.config import settings
+from app.core.db import async_session
+from app.core.security import hash_token
+from app.core.tokens.base import consume_token, create_token, decode_token
+from app.core.tokens.email import token_lifetime
+from app.core.tokens.purposes import TokenPurpose
+from app.core.tokens.status import TokenStatus
+from app.exceptions.handlers import TokenValidationError
+from app.models.used_token import UsedToken
+from app.models.user import User
+
+# Global authenticator and version cache (lazy-loaded)
+_authenticator = None
+_version_cache = None
+
+
+@dataclass(frozen=True, slots=True)
+class CurrentUser:
+    """
+    The authenticated principal of a request.
+
+    Attributes:
+        id (UUID): The user's ID (`sub` claim).
+        token_version (int | None): The `ver` claim, if the token has one.
+        expires_at (int): Unix time at which the session token expires.
+    """
+
+    id: UUID
+    token_version: int | None
+    expires_at: int
+
+
+@dataclass(frozen=True, slots=True)
+class _VersionEntry:
+    token_version: int
+    is_locked: bool
+    fetched_at: float
+
+
+class TokenVersionCache:
+    """
+    Per-worker cache of `User.token_version` and `User.is_locked`.
+
+    Attributes:
+        ttl (float): Seconds a loaded version is trusted.
+        max_entries (int): Users cached before the least recent is evicted.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = async_session,
+        ttl: float | None = None,
+        max_entries: int | None = None,
+        clock=time.monotonic,
+    ):
+        self.session_factory = session_factory
+        self.ttl = settings.AUTH_VERSION_CACHE_TTL_SECONDS if ttl is None else ttl
+        self.max_entries = max_entries or settings.AUTH_CLAIMS_CACHE_SIZE
+        self._clock = clock
+        self._entries: OrderedDict[UUID, _VersionEntry] = OrderedDict()
+        self._inflight: dict[UUID, asyncio.Future] = {}
+
+    async def get(self, user_id: UUID) -> _VersionEntry | None:
+        """
+        Return the user's current token version, loading it if stale.
+
+        Args:
+            user_id (UUID): The user to look up.
+
+        Returns:
+            _VersionEntry | None: Version and lock state, or None if the
+                user does not exist.
+        """
+        entry = self._entries.get(user_id)
+        if entry is not None and self._clock() - entry.fetched_at < self.ttl:
+            self._entries.move_to_end(user_id)
+            return entry
+
+        # Single flight: later misses for the same user await the first one
+        pending = self._inflight.get(user_id)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[user_id] = future
+        try:
+            entry = await self._load(user_id)
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when no other request was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(entry)
+        finally:
+            del self._inflight[user_id]
+
+        if entry is None:
+            self._entries.pop(user_id, None)
+        else:
+            self._store(user_id, entry)
+        return entry
+
+    async def _load(self, user_id: UUID) -> _VersionEntry | None:
+        async with self.session_factory() as session:
+            row = (
+                await session.execute(
+                    select(User.token_version, User.is_locked).where(User.id == user_id)
+                )
+            ).first()
+        if row is None:
+            return None
+        return _VersionEntry(row.token_version, row.is_locked, self._clock())
+
+    def _store(self, user_id: UUID, entry: _VersionEntry) -> None:
+        self._entries[user_id] = entry
+        self._entries.move_to_end(user_id)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def bump(self, user_id: UUID) -> int | None:
+        """
+        Increment the user's token version, revoking all issued tokens.
+
+        Args:
+            user_id (UUID): The user to log out everywhere.
+
+        Returns:
+            int | None: The new version, or None if the user does not exist.
+        """
+        async with self.session_factory() as session:
+            row = (
+                await session.execute(
+                    update(User)
+                    .where(User.id == user_id)
+                    .values(token_version=User.token_version + 1)
+                    .returning(User.token_version, User.is_locked)
+                )
+            ).first()
+            await session.commit()
+
+        if row is None:
+            self._entries.pop(user_id, None)
+            return None
+        self._store(
+            user_id, _VersionEntry(row.token_version, row.is_locked, self._clock())
+        )
+        return row.token_version
+
+    def clear(self) -> None:
+        """Forget all cached versions (used by tests)."""
+        self._entries.clear()
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=401, detail=detail, headers={"WWW-Authenticate": "Bearer"}
+    )
+
+
+class SessionAuthenticator:
+    """
+    Session token verifier with an LRU cache of verified claims.
+
+    Attributes:
+        max_entries (int): Tokens cached before the least recent is evicted.
+        check_version (bool): Compare `ver` with `User.token_version`.
+    """
+
+    def __init__(
+        self,
+        versions: TokenVersionCache | None = None,
+        max_entries: int | None = None,
+        check_version: bool | None = None,
+    ):
+        self._versions = versions
+        self.max_entries = max_entries or settings.AUTH_CLAIMS_CACHE_SIZE
+        self.check_version = (
+            settings.AUTH_CHECK_TOKEN_VERSION
+            if check_version is None
+            else check_version
+        )
+        self._cache: OrderedDict[bytes, CurrentUser] = OrderedDict()
+
+    @property
+    def versions(self) -> TokenVersionCache:
+        """The version cache used for `ver` checks (shared by default)."""
+        return self._versions or get_token_version_cache()
+
+    def verify(self, token: str) -> CurrentUser:
+        """
+        Verify a session token, answering from the cache when possible.
+
+        Args:
+            token (str): The bearer token.
+
+        Returns:
+            CurrentUser: The token's principal.
+
+        Raises:
+            HTTPException: 401 if the token is invalid or expired.
+        """
+        key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        cache = self._cache
+        user = cache.get(key)
+        if user is not None:
+            if user.expires_at > time.time():
+                cache.move_to_end(key)
+                return user
+            del cache[key]
+
+        try:
+            claims = decode_token(
+                token, TokenPurpose.SESSION, settings.AUTH_SESSION_TOKEN_SECRET
+            )
+            version = claims.get("ver")
+            user = CurrentUser(
+                id=UUID(claims["sub"]),
+                token_version=None if version is None else int(version),
+                expires_at=claims["exp"],
+            )
+        except (TokenValidationError, KeyError, TypeError, ValueError):
+            raise _unauthorized(Auth.INVALID_SESSION)
+
+        cache[key] = user
+        if len(cache) > self.max_entries:
+            cache.popitem(last=False)
+        return user
+
+    async def ensure_current(self, user: CurrentUser) -> None:
+        """
+        Reject the session if its version no longer matches the user's.
+
+        Args:
+            user (CurrentUser): A verified principal.
+
+        Raises:
+            HTTPException: 401 if the user is gone, locked, or the version
+                was bumped.
+        """
+        await ensure_token_version(user.id, user.token_version, self.versions)
+
+    def clear(self) -> None:
+        """Forget all cached claims (used by tests)."""
+        self._cache.clear()
+
+
+async def ensure_token_version(
+    user_id: UUID, token_version: int | None, versions: TokenVersionCache
+) -> None:
+    """
+    Check a token's `ver` claim against the user's current version.
+
+    Args:
+        user_id (UUID): The token's subject.
+        token_version (int | None): The token's `ver` claim.
+        versions (TokenVersionCache): Where to read the current version.
+
+    Raises:
+        HTTPException: 401 if the user is gone, locked, or the version was bumped.
+    """
+    entry = await versions.get(user_id)
+    if entry is None or entry.is_locked or entry.token_version != (token_version or 0):
+        raise _unauthorized(Auth.INVALID_SESSION)
+
+
+async def verify_refresh_token(token: str) -> CurrentUser:
+    """
+    Verify a refresh token and check its `ver` against the user's version.
+
+    Unlike session tokens, refresh tokens are always version-checked: this is
+    where a global logout takes effect for long-lived clients.
+
+    Args:
+        token (str): The refresh token.
+
+    Returns:
+        CurrentUser: The token's principal.
+
+    Raises:
+        HTTPException: 401 if the token is invalid, expired or revoked.
+    """
+    try:
+        claims = decode_token(
+            token, TokenPurpose.REFRESH, settings.AUTH_REFRESH_TOKEN_SECRET
+        )
+        user = CurrentUser(
+            id=UUID(claims["sub"]),
+            token_version=int(claims.get("ver", 0)),
+            expires_at=claims["exp"],
+        )
+    except (TokenValidationError, KeyError, TypeError, ValueError):
+        raise _unauthorized(Auth.INVALID_SESSION)
+
+    await ensure_token_version(user.id, user.token_version, get_token_version_cache())
+    return user
+
+
+def issue_refresh_token(user_id: UUID, version: int, db: AsyncSession) -> str:
+    """
+    Mint a refresh token and stage its `used_tokens` row in `db`.
+
+    Args:
+        user_id (UUID): The token's subject.
+        version (int): The user's current token version.
+        db (AsyncSession): The caller's session; not committed here.
+
+    Returns:
+        str: The refresh token.
+    """
+    lifetime = token_lifetime(TokenPurpose.REFRESH)
+    token = create_token(
+        user_id=user_id,
+        purpose=TokenPurpose.REFRESH,
+        expires_delta=lifetime,
+        secret=settings.AUTH_REFRESH_TOKEN_SECRET,
+        version=version,
+    )
+    db.add(
+        UsedToken(
+            user_id=user_id,
+            token_hash=hash_token(token, TokenPurpose.REFRESH),
+            purpose=TokenPurpose.REFRESH,
+            expires_at=datetime.now(timezone.utc) + lifetime,
+            status=TokenStatus.ISSUED,
+        )
+    )
+    return token
+
+
+async def redeem_refresh_token(token: str, db: AsyncSession) -> CurrentUser:
+    """
+    Verify a refresh token and redeem it, so it cannot be exchanged again.
+
+    A token that was already redeemed has been replayed: either it leaked
+    or its holder raced itself. Both end the same way, with every session
+    and refresh token of the user revoked. A token without a row predates
+    tracking and is redeemed by recording it, if `AUTH_REFRESH_ACCEPT_UNTRACKED`
+    allows.
+
+    Args:
+        token (str): The refresh token.
+        db (AsyncSession): The caller's session; not committed here, so the
+            redemption commits together with the replacement token.
+
+    Returns:
+        CurrentUser: The token's principal.
+
+    Raises:
+        HTTPException: 401 if the token is invalid, expired, revoked or
+            already redeemed.
+    """
+    user = await verify_refresh_token(token)
+
+    secret = settings.AUTH_REFRESH_TOKEN_SECRET
+    if await consume_token(token, TokenPurpose.REFRESH, secret, db) is not None:
+        return user
+
+    # Without a live row, concurrent uses of one token take turns until the
+    # caller commits, so only the first can record an untracked token
+    token_hash = hash_token(token, TokenPurpose.REFRESH)
+    await db.execute(
+        text("SELECT pg_advisory_xact_lock(:key)"),
+        {"key": int.from_bytes(token_hash[:8], "big", signed=True)},
+    )
+    status = await db.scalar(
+        select(UsedToken.status)
+        .where(
+            UsedToken.token_hash == token_hash,
+            UsedToken.purpose == TokenPurpose.REFRESH,
+        )
+        .limit(1)
+    )
+    if status is None and settings.AUTH_REFRESH_ACCEPT_UNTRACKED:
+        db.add(
+            UsedToken(
+                user_id=user.id,
+                token_hash=token_hash,
+                purpose=TokenPurpose.REFRESH,
+                redeemed_at=func.now(),
+                expires_at=datetime.fromtimestamp(user.expires_at, timezone.utc),
+                status=TokenStatus.REDEEMED,
+            )
+        )
+        return user
+
+    await db.rollback()
+    # A redeemed row means this exact token was exchanged before
+    if status == TokenStatus.REDEEMED:
+        logger.warning("Refresh token reused for user {}; revoking sessions", user.id)
+        await revoke_sessions(user.id)
+    raise _unauthorized(Auth.INVALID_SESSION)
+
+
+async def revoke_sessions(user_id: UUID) -> int:
+    """
+    Bump the user's token version, logging them out everywhere.
+
+    Args:
+        user_id (UUID): The user to log out.
+
+    Returns:
+        int: The new token version.
+
+    Raises:
+        HTTPException: 401 if the user no longer exists.
+    """
+    version = await get_token_version_cache().bump(user_id)
+    if version is None:
+        raise _unauthorized(Auth.INVALID_SESSION)
+    return version
+
+
+def get_token_version_cache() -> TokenVersionCache:
+    """
+    Lazily create and return the process-wide token version cache.
+
+    Returns:
+        TokenVersionCache: The shared cache.
+    """
+    global _version_cache
+    if _version_cache is None:
+        _version_cache = TokenVersionCache()
+    return _version_cache
+
+
+def get_authenticator() -> SessionAuthenticator:
+    """
+    Lazily create and return the process-wide session authenticator.
+
+    Returns:
+        SessionAuthenticator: The shared authenticator.
+    """
+    global _authenticator
+    if _authenticator is None:
+        _authenticator = SessionAuthenticator()
+    return _authenticator
+
+
+async def get_current_user(request: Request) -> CurrentUser:
+    """
+    FastAPI dependency returning the authenticated user of a request.
+
+    Args:
+        request (Request): The incoming request.
+
+    Returns:
+        CurrentUser: The principal from the bearer session token.
+
+    Raises:
+        HTTPException: 401 if the header is missing or the token is rejected.
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise _unauthorized(Auth.NOT_AUTHENTICATED)
+
+    authenticator = get_authenticator()
+    user = authenticator.verify(token)
+    if authenticator.check_version:
+        await authenticator.ensure_current(user)
+    return user
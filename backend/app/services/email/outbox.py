@@ -0,0 +1,279 @@
+"""
+Transactional email outbox and its background delivery worker.
+
+Request handlers never talk to the mail server. Instead they call
+`enqueue_email` inside their own transaction, and the `OutboxWorker`
+(started from the application lifespan) drains due entries in batches:
+
+- Entries are claimed with `FOR UPDATE SKIP LOCKED`, so several app workers
+  can drain the same table without sending anything twice.
+- Failed deliveries are retried with exponential backoff until
+  `EMAIL_OUTBOX_MAX_ATTEMPTS` is reached, then marked FAILED.
+- Delivered verification emails flip their token from PENDING to ISSUED.
+- On shutdown the worker keeps draining due entries for up to
+  `EMAIL_OUTBOX_DRAIN_SECONDS` before exiting.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from loguru import logger
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.db import async_session
+from app.core.outbox import EmailKind, OutboxStatus
+from app.core.security import hash_token
+from app.core.tokens.purposes import TokenPurpose
+from app.core.tokens.status import TokenStatus
+from app.models import EmailOutbox, UsedToken, User
+from app.services.email.verification import send_verification_email
+
+# Global worker cache (created by the lifespan)
+_outbox_worker = None
+
+
+def enqueue_email(
+    user_id: UUID, kind: EmailKind, payload: dict, db: AsyncSession
+) -> EmailOutbox:
+    """
+    Stage an outbound email in the caller's transaction.
+
+    Nothing is sent until the caller commits and the worker picks it up.
+
+    Args:
+        user_id (UUID): Recipient user.
+        kind (EmailKind): Which mailer delivers the entry.
+        payload (dict): JSON-serializable mailer arguments.
+        db (AsyncSession): The caller's session; not committed here.
+
+    Returns:
+        EmailOutbox: The pending (unflushed) outbox entry.
+    """
+    entry = EmailOutbox(
+        user_id=user_id,
+        kind=kind,
+        payload=payload,
+        status=OutboxStatus.PENDING,
+    )
+    db.add(entry)
+    return entry
+
+
+def compute_backoff(attempts: int) -> timedelta:
+    """
+    Delay before the next delivery attempt.
+
+    Args:
+        attempts (int): Attempts made so far (>= 1).
+
+    Returns:
+        timedelta: Exponential delay capped at EMAIL_OUTBOX_BACKOFF_MAX_SECONDS.
+    """
+    delay = settings.EMAIL_OUTBOX_BACKOFF_SECONDS * (2 ** (attempts - 1))
+    return timedelta(seconds=min(delay, settings.EMAIL_OUTBOX_BACKOFF_MAX_SECONDS))
+
+
+async def _deliver(entry: EmailOutbox, user: User) -> None:
+    if entry.kind == EmailKind.VERIFICATION:
+        await send_verification_email(user=user, token=entry.payload["token"])
+    else:
+        raise ValueError(f"Unsupported email kind: {entry.kind}")
+
+
+def _token_hash(entry: EmailOutbox) -> bytes | None:
+    if entry.kind == EmailKind.VERIFICATION:
+        return hash_token(entry.payload["token"], TokenPurpose.EMAIL_VERIFICATION)
+    return None
+
+
+class OutboxWorker:
+    """
+    Background task that delivers pending outbox entries.
+
+    Attributes:
+        batch_size (int): Maximum entries claimed per transaction.
+        poll_interval (float): Seconds to sleep when nothing is due.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = async_session,
+        batch_size: int | None = None,
+        poll_interval: float | None = None,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+        self.poll_interval = poll_interval or settings.EMAIL_OUTBOX_POLL_SECONDS
+        self._task: asyncio.Task | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._stopping = False
+
+    def start(self) -> None:
+        """Start the delivery loop on the running event loop."""
+        if self._task is None:
+            self._stopping = False
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="email-outbox")
+            logger.info("Email outbox worker started")
+
+    def notify(self) -> None:
+        """Wake the loop early, e.g. right after a new entry was committed."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def stop(self, drain_timeout: float | None = None) -> None:
+        """
+        Stop the delivery loop after draining due entries.
+
+        Args:
+            drain_timeout (float, optional): Seconds to keep draining before
+                the loop is cancelled. Defaults to EMAIL_OUTBOX_DRAIN_SECONDS.
+        """
+        if self._task is None:
+            return
+
+        if drain_timeout is None:
+            drain_timeout = settings.EMAIL_OUTBOX_DRAIN_SECONDS
+
+        self._stopping = True
+        self.notify()
+        try:
+            await asyncio.wait_for(self._task, timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Email outbox drain timed out; pending entries remain")
+        finally:
+            self._task = None
+            logger.info("Email outbox worker stopped")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                delivered = await self.run_once()
+            except Exception:
+                logger.exception("Email outbox batch failed")
+                delivered = 0
+
+            # Once asked to stop, keep going only while there is work left
+            if self._stopping and delivered == 0:
+                return
+
+            if delivered == 0:
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), timeout=self.poll_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def run_once(self) -> int:
+        """
+        Claim and process one batch of due entries.
+
+        Returns:
+            int: Number of entries processed (delivered or rescheduled).
+        """
+        async with self.session_factory() as db:
+            stmt = (
+                select(EmailOutbox, User)
+                .join(User, User.id == EmailOutbox.user_id)
+                .where(
+                    EmailOutbox.status == OutboxStatus.PENDING,
+                    EmailOutbox.next_attempt_at <= func.now(),
+                )
+                .order_by(EmailOutbox.next_attempt_at)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True, of=EmailOutbox)
+            )
+            rows = (await db.execute(stmt)).all()
+            if not rows:
+                return 0
+
+            outcomes = await asyncio.gather(
+                *(_deliver(entry, user) for entry, user in rows),
+                return_exceptions=True,
+            )
+
+            now = datetime.now(tz=timezone.utc)
+            issued, failed = [], []
+
+            for (entry, _), outcome in zip(rows, outcomes):
+                entry.attempts += 1
+
+                if not isinstance(outcome, Exception):
+                    issued.append(_token_hash(entry))
+                    entry.status = OutboxStatus.SENT
+                    entry.sent_at = now
+                    entry.last_error = None
+                    # Never keep one-time secrets around after delivery
+                    entry.payload = None
+                    continue
+
+                entry.last_error = repr(outcome)[:500]
+                if entry.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                    failed.append(_token_hash(entry))
+                    entry.status = OutboxStatus.FAILED
+                    entry.payload = None
+                    logger.error(
+                        "Giving up on outbox entry {} after {} attempts",
+                        entry.id,
+                        entry.attempts,
+                    )
+                else:
+                    entry.next_attempt_at = now + compute_backoff(entry.attempts)
+                    logger.warning(
+                        "Outbox entry {} failed (attempt {}): {}",
+                        entry.id,
+                        entry.attempts,
+                        outcome,
+                    )
+
+            await _flip_token_status(db, issued, TokenStatus.ISSUED)
+            await _flip_token_status(db, failed, TokenStatus.FAILED)
+            await db.commit()
+
+            return len(rows)
+
+
+async def _flip_token_status(
+    db: AsyncSession, token_hashes: list[bytes | None], status: TokenStatus
+) -> None:
+    token_hashes = [h for h in token_hashes if h is not None]
+    if not token_hashes:
+        return
+
+    await db.execute(
+        update(UsedToken)
+        .where(
+            UsedToken.token_hash.in_(token_hashes),
+            UsedToken.status == TokenStatus.PENDING,
+        )
+        .values(status=status)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def get_outbox_worker() -> OutboxWorker:
+    """
+    Lazily initialize and return the global outbox worker.
+
+    Returns:
+        OutboxWorker: The shared worker (not started until `start()`).
+    """
+    global _outbox_worker
+    if _outbox_worker is None:
+        _outbox_worker = OutboxWorker()
+    return _outbox_worker
+
+
+def wake_outbox_worker() -> None:
+    """
+    Nudge the local worker to deliver newly committed entries right away.
+
+    Safe to call when the worker is not running.
+    """
+    if _outbox_worker is not None:
+        _outbox_worker.notify()
@@ -5,28 +5,135 @@ This module supports dual-format (HTML + plain text) template resolution
 based on a shared base name. Templates are expected to live in the
 `templates/` directory adjacent to this file.
 
+Templates are compiled once per process by a `TemplateRegistry` (optionally
+backed by an on-disk bytecode cache) and reused for every send. Rendered
+variants can be assembled into a multipart/alternative message.
+
 If neither HTML nor text template is found for a given name, a ValueError is raised.
 """
 
+from email.message import EmailMessage
 from pathlib import Path
 
-from jinja2 import Environment, FileSystemLoader, TemplateNotFound
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    Template,
+    select_autoescape,
+)
+
+from app.core.config import settings
 
 # Default directory for email templates
 DEFAULT_TEMPLATE_DIR = Path(__file__).parent / "templates"
 
+# Variant file extensions, in order of preference for single-part messages
+VARIANTS = ("html", "txt")
+
+# Global registry cache, keyed by template directory (lazy-loaded)
+_registries: dict[Path, "TemplateRegistry"] = {}
 
-def get_env(base_dir: Path = DEFAULT_TEMPLATE_DIR) -> Environment:
+
+class TemplateRegistry:
     """
-    Create a Jinja2 Environment for the given base directory.
+    Process-wide cache of compiled email templates.
+
+    Attributes:
+        env (Environment): Jinja2 environment used to compile templates.
+    """
+
+    def __init__(
+        self, base_dir: Path = DEFAULT_TEMPLATE_DIR, cache_dir: Path | None = None
+    ):
+        self.env = Environment(
+            loader=FileSystemLoader(str(base_dir)),
+            # Only HTML output is escaped; plain text must stay verbatim
+            autoescape=select_autoescape(enabled_extensions=("html",)),
+            # Templates ship with the code; never stat them again after compiling
+            auto_reload=False,
+            bytecode_cache=(
+                FileSystemBytecodeCache(str(cache_dir)) if cache_dir else None
+            ),
+        )
+        self._templates: dict[str, Template] = {}
+
+    def compile_all(self) -> int:
+        """
+        Compile every template variant in the directory.
+
+        Returns:
+            int: Number of templates compiled.
+        """
+        for name in self.env.list_templates(extensions=VARIANTS):
+            self._templates[name] = self.env.get_template(name)
+        return len(self._templates)
+
+    def variants(self, template_name: str) -> list[str]:
+        """
+        List the variant extensions available for a template.
+
+        Args:
+            template_name (str): Base name of the template (without extension).
+
+        Returns:
+            list[str]: Available extensions, e.g. ["html", "txt"].
+        """
+        if not self._templates:
+            self.compile_all()
+        return [ext for ext in VARIANTS if f"{template_name}.{ext}" in self._templates]
+
+    def render(
+        self,
+        template_name: str,
+        context: dict,
+        variants: tuple[str, ...] = VARIANTS,
+    ) -> dict[str, str]:
+        """
+        Render the requested variants of a template.
+
+        Args:
+            template_name (str): Base name of the template (without extension).
+            context (dict): Variables passed into the template for rendering.
+            variants (tuple[str, ...]): Extensions to render; missing ones are
+                skipped without being looked up on disk.
+
+        Returns:
+            dict[str, str]: Rendered bodies keyed by extension.
+
+        Raises:
+            ValueError: If none of the requested variants exist.
+        """
+        available = self.variants(template_name)
+        rendered = {
+            ext: self._templates[f"{template_name}.{ext}"].render(**context)
+            for ext in variants
+            if ext in available
+        }
+        if not rendered:
+            raise ValueError(f"No templates found for {template_name}")
+        return rendered
+
+
+def get_template_registry(base_dir: Path = DEFAULT_TEMPLATE_DIR) -> TemplateRegistry:
+    """
+    Lazily initialize and return the registry for a template directory.
 
     Args:
         base_dir (Path): Directory containing the templates.
 
     Returns:
-        Jinja2 Environment instance configured with autoescaping enabled.
+        TemplateRegistry: The shared registry for that directory.
     """
-    return Environment(loader=FileSystemLoader(str(base_dir)), autoescape=True)
+    base_dir = Path(base_dir)
+    if base_dir not in _registries:
+        cache_dir = settings.EMAIL_TEMPLATE_CACHE_DIR
+        if cache_dir:
+            Path(cache_dir).mkdir(parents=True, exist_ok=True)
+        _registries[base_dir] = TemplateRegistry(
+            base_dir, Path(cache_dir) if cache_dir else None
+        )
+    return _registries[base_dir]
 
 
 def render_dual_template(
@@ -46,24 +153,43 @@ def render_dual_template(
     Raises:
         ValueError: If neither template variant is found.
     """
-    env = get_env(base_dir)
-
-    # Attempt to render HTML version: template_name.html
-    try:
-        html_template = env.get_template(f"{template_name}.html")
-        html_body = html_template.render(**context)
-    except TemplateNotFound:
-        html_body = None
-
-    # Attempt to render plain text version: template_name.txt
-    try:
-        text_template = env.get_template(f"{template_name}.txt")
-        text_body = text_template.render(**context)
-    except TemplateNotFound:
-        text_body = None
-
-    # Fail if neither version exists
-    if (not html_body) and (not text_body):
-        raise ValueError(f"No templates found for {template_name}")
-
-    return html_body, text_body
+    rendered = get_template_registry(base_dir).render(template_name, context)
+    return rendered.get("html"), rendered.get("txt")
+
+
+def build_email_message(
+    subject: str,
+    sender: str,
+    recipient: str,
+    html_body: str | None,
+    text_body: str | None,
+) -> EmailMessage:
+    """
+    Assemble rendered bodies into a ready-to-send message.
+
+    With both bodies present the result is multipart/alternative, with the
+    plain-text part first so clients that can display HTML pick the last one.
+
+    Args:
+        subject (str): Subject line.
+        sender (str): Formatted From address.
+        recipient (str): To address.
+        html_body (str | None): Rendered HTML body.
+        text_body (str | None): Rendered plain-text body.
+
+    Returns:
+        EmailMessage: The assembled message.
+    """
+    message = EmailMessage()
+    message["Subject"] = subject
+    message["From"] = sender
+    message["To"] = recipient
+
+    if text_body:
+        message.set_content(text_body)
+        if html_body:
+            message.add_alternative(html_body, subtype="html")
+    else:
+        message.set_content(html_body, subtype="html")
+
+    return message
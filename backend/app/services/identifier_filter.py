@@ -0,0 +1,274 @@
+"""
+In-memory membership filter for registered usernames and emails.
+
+Most login attempts against identifiers that do not exist (credential
+stuffing, typos) used to cost a database round trip each. `IdentifierFilter`
+keeps a Bloom filter of every normalized username and email so those lookups
+can be answered as "definitely absent" without touching Postgres:
+
+- The filter is loaded at startup by streaming the `users` table.
+- Every worker LISTENs on the `user_identifiers` channel, which a trigger on
+  `users` notifies on insert and on username/email changes, so signups
+  handled by other workers are picked up within milliseconds.
+- It is rebuilt periodically to shed stale entries (Bloom filters cannot
+  delete) and to resize as the table grows.
+- Until the first load completes, or whenever the notification connection
+  is lost, the filter reports every identifier as "possibly present", so
+  callers fall back to the database and never reject a real user.
+"""
+
+import asyncio
+import json
+import time
+
+import asyncpg
+from loguru import logger
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.bloom import BloomFilter
+from app.core.config import settings
+from app.core.db import async_session
+from app.core.metrics import (
+    IDENTIFIER_FILTER_BYTES,
+    IDENTIFIER_FILTER_FALSE_POSITIVE_RATE,
+    IDENTIFIER_FILTER_KEYS,
+    IDENTIFIER_FILTER_REBUILD_SECONDS,
+    IDENTIFIER_FILTER_SHORT_CIRCUITS,
+)
+from app.models.user import IDENTIFIER_CHANNEL, User
+
+# Liveness probe interval for the LISTEN connection
+_HEARTBEAT_SECONDS = 15.0
+
+# Delay before reconnecting after the LISTEN connection fails
+_RETRY_SECONDS = 5.0
+
+# Global filter cache (created by the lifespan)
+_identifier_filter = None
+
+
+def _listen_dsn() -> str:
+    url = make_url(settings.DATABASE_URL).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+class IdentifierFilter:
+    """
+    Bloom filter of registered identifiers, kept in sync across workers.
+
+    Attributes:
+        capacity (int): Minimum number of users the filter is sized for.
+        error_rate (float): Target false-positive rate.
+        rebuild_interval (float): Seconds between full rebuilds.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = async_session,
+        dsn: str | None = None,
+        capacity: int | None = None,
+        error_rate: float | None = None,
+        rebuild_interval: float | None = None,
+    ):
+        self.session_factory = session_factory
+        self.dsn = dsn or _listen_dsn()
+        self.capacity = capacity or settings.IDENTIFIER_FILTER_CAPACITY
+        self.error_rate = error_rate or settings.IDENTIFIER_FILTER_ERROR_RATE
+        self.rebuild_interval = (
+            rebuild_interval or settings.IDENTIFIER_FILTER_REBUILD_SECONDS
+        )
+        self._bloom: BloomFilter | None = None
+        self._pending: list[str] | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether lookups are currently answered by the filter."""
+        return self._bloom is not None
+
+    def might_contain_username(self, username: str) -> bool:
+        """
+        Check whether a normalized username may be registered.
+
+        Args:
+            username (str): Normalized (stripped, lowercased) username.
+
+        Returns:
+            bool: False only if the username is definitely not registered.
+        """
+        return self._might_contain("username", f"u:{username}")
+
+    def might_contain_email(self, email: str) -> bool:
+        """
+        Check whether a normalized email may be registered.
+
+        Args:
+            email (str): Normalized (stripped, lowercased) email address.
+
+        Returns:
+            bool: False only if the email is definitely not registered.
+        """
+        return self._might_contain("email", f"e:{email}")
+
+    def _might_contain(self, kind: str, key: str) -> bool:
+        bloom = self._bloom
+        if bloom is None or key in bloom:
+            return True
+        IDENTIFIER_FILTER_SHORT_CIRCUITS.labels(kind=kind).inc()
+        return False
+
+    def add(self, username: str | None, email: str | None) -> None:
+        """
+        Record a user's identifiers.
+
+        Args:
+            username (str | None): Normalized username.
+            email (str | None): Normalized email address.
+        """
+        keys = []
+        if username:
+            keys.append(f"u:{username}")
+        if email:
+            keys.append(f"e:{email}")
+
+        # A rebuild in progress replays these once its snapshot is loaded
+        if self._pending is not None:
+            self._pending.extend(keys)
+
+        if self._bloom is not None:
+            for key in keys:
+                self._bloom.add(key)
+            self._publish_stats()
+
+    def invalidate(self) -> None:
+        """Drop the filter so every lookup falls back to the database."""
+        self._bloom = None
+
+    async def rebuild(self) -> int:
+        """
+        Load a fresh filter from the `users` table and swap it in.
+
+        Returns:
+            int: Number of users loaded.
+        """
+        started = time.perf_counter()
+        self._pending = []
+        try:
+            async with self.session_factory() as session:
+                total = await session.scalar(select(func.count()).select_from(User))
+
+                # Two keys per user, with room to double before the next rebuild
+                bloom = BloomFilter(
+                    capacity=2 * max(self.capacity, total * 2),
+                    error_rate=self.error_rate,
+                )
+
+                result = await session.stream(
+                    select(User.username, User.email).execution_options(yield_per=5000)
+                )
+                async for username, email in result:
+                    if username:
+                        bloom.add(f"u:{username}")
+                    if email:
+                        bloom.add(f"e:{email}")
+
+            for key in self._pending:
+                bloom.add(key)
+            self._bloom = bloom
+        finally:
+            self._pending = None
+
+        elapsed = time.perf_counter() - started
+        IDENTIFIER_FILTER_REBUILD_SECONDS.set(elapsed)
+        self._publish_stats()
+        logger.info(
+            "Identifier filter rebuilt with {} users in {:.3f}s", total, elapsed
+        )
+        return total
+
+    def _publish_stats(self) -> None:
+        bloom = self._bloom
+        IDENTIFIER_FILTER_KEYS.set(bloom.count)
+        IDENTIFIER_FILTER_BYTES.set(bloom.size_bytes)
+        IDENTIFIER_FILTER_FALSE_POSITIVE_RATE.set(bloom.false_positive_rate)
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed identifier notification")
+            return
+        self.add(data.get("u"), data.get("e"))
+
+    def start(self) -> None:
+        """Start the load / listen / rebuild loop on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="identifier-filter")
+            logger.info("Identifier filter started")
+
+    async def stop(self) -> None:
+        """Stop listening and drop the filter."""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._task = None
+            self.invalidate()
+            logger.info("Identifier filter stopped")
+
+    async def _run(self) -> None:
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+
+                # Subscribe before loading so no signup falls between the two
+                await connection.add_listener(IDENTIFIER_CHANNEL, self._on_notify)
+                await self.rebuild()
+                await self._watch(connection, lost)
+                logger.warning("Identifier filter lost its notification connection")
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError):
+                logger.exception("Identifier filter refresh failed")
+            except Exception:
+                logger.exception("Unexpected identifier filter failure")
+            finally:
+                # Without notifications the filter could miss new users
+                self.invalidate()
+                if connection is not None and not connection.is_closed():
+                    connection.terminate()
+
+            await asyncio.sleep(_RETRY_SECONDS)
+
+    async def _watch(self, connection: asyncpg.Connection, lost: asyncio.Event):
+        next_rebuild = time.monotonic() + self.rebuild_interval
+        while not lost.is_set():
+            try:
+                await asyncio.wait_for(lost.wait(), timeout=_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                # Surfaces half-open connections that never report termination
+                await connection.fetchval("SELECT 1")
+                if time.monotonic() >= next_rebuild:
+                    await self.rebuild()
+                    next_rebuild = time.monotonic() + self.rebuild_interval
+
+
+def get_identifier_filter() -> IdentifierFilter:
+    """
+    Lazily create and return the process-wide identifier filter.
+
+    Returns:
+        IdentifierFilter: The shared filter (not ready until started).
+    """
+    global _identifier_filter
+    if _identifier_filter is None:
+        _identifier_filter = IdentifierFilter()
+    return _identifier_filter
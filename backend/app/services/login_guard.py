@@ -0,0 +1,357 @@
+"""
+Per-identifier brute-force shield for the login endpoint.
+
+IP-based rate limits do nothing against a distributed attack on a single
+account, and every attempt that reaches `check_password` costs a full Argon2
+verification. `LoginGuard` tracks failed logins per normalized identifier and
+rejects further attempts before any lookup or hashing happens:
+
+- Failures are kept in a sliding window of `LOGIN_FAILURE_WINDOW_SECONDS`.
+- After `LOGIN_FREE_ATTEMPTS` failures inside the window, each further
+  failure blocks the identifier for an exponentially growing delay, capped
+  at `LOGIN_BACKOFF_MAX_SECONDS`. Hash work per account is therefore bounded
+  by roughly log2(window / base delay) verifications per window.
+- `check` also reserves the attempt until `release`, so a burst of
+  concurrent requests cannot slip past the backoff before its failures are
+  recorded: attempts in flight plus recent failures may not exceed
+  `LOGIN_FREE_ATTEMPTS`, and an identifier that used them up gets one
+  attempt at a time.
+- Failure counts for existing users are persisted write-behind: a background
+  task flushes accumulated increments in one UPDATE every
+  `LOGIN_FAILURE_FLUSH_SECONDS`. Once the stored count reaches
+  `LOGIN_LOCK_THRESHOLD`, the account is locked until `User.locked_until`,
+  `LOGIN_LOCK_SECONDS` later, and the count starts over. The lock is shared
+  by every worker, while the in-memory windows are per process.
+
+Lockouts always expire: anyone who knows a username can fail its logins,
+so a permanent lock would let them disable the account. `unlock` lifts a
+lock early (see `app.cli.unlock_user`). `User.is_locked` is an
+administrator's switch and is neither set nor cleared here.
+"""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from loguru import logger
+from sqlalchemy import Integer, case, column, func, update, values
+from sqlalchemy.dialects.postgresql import UUID as PgUUID
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.core.db import async_session
+from app.exceptions.handlers import LoginThrottledError
+from app.models.user import User
+
+# Global guard cache (lazy-loaded)
+_login_guard = None
+
+
+class _Attempts:
+    """Recent failures, attempts in flight and the block for one identifier."""
+
+    __slots__ = ("failures", "blocked_until", "in_flight")
+
+    def __init__(self):
+        self.failures: deque[float] = deque()
+        self.blocked_until = 0.0
+        self.in_flight = 0
+
+
+class LoginGuard:
+    """
+    Sliding-window failure tracker with exponential backoff per identifier.
+
+    Attributes:
+        window (float): Seconds a failure counts against an identifier.
+        free_attempts (int): Failures allowed in the window before backoff.
+        base_delay (float): First backoff delay, doubled per extra failure.
+        max_delay (float): Upper bound for a single backoff delay.
+        lock_threshold (int): Persisted failures that lock an account; 0 disables.
+        lock_duration (float): Seconds such a lock lasts.
+        max_entries (int): Identifiers tracked before the least recent is evicted.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = async_session,
+        window: float | None = None,
+        free_attempts: int | None = None,
+        base_delay: float | None = None,
+        max_delay: float | None = None,
+        lock_threshold: int | None = None,
+        lock_duration: float | None = None,
+        max_entries: int | None = None,
+        flush_interval: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.session_factory = session_factory
+        self.window = window or settings.LOGIN_FAILURE_WINDOW_SECONDS
+        self.free_attempts = (
+            settings.LOGIN_FREE_ATTEMPTS if free_attempts is None else free_attempts
+        )
+        self.base_delay = base_delay or settings.LOGIN_BACKOFF_BASE_SECONDS
+        self.max_delay = max_delay or settings.LOGIN_BACKOFF_MAX_SECONDS
+        self.lock_threshold = (
+            settings.LOGIN_LOCK_THRESHOLD if lock_threshold is None else lock_threshold
+        )
+        self.lock_duration = lock_duration or settings.LOGIN_LOCK_SECONDS
+        self.max_entries = max_entries or settings.LOGIN_GUARD_MAX_ENTRIES
+        self.flush_interval = flush_interval or settings.LOGIN_FAILURE_FLUSH_SECONDS
+        self._clock = clock
+
+        self._attempts: OrderedDict[str, _Attempts] = OrderedDict()
+        self._pending_failures: dict[UUID, int] = {}
+        self._pending_resets: set[UUID] = set()
+        self._task: asyncio.Task | None = None
+
+    def check(self, identifier: str) -> None:
+        """
+        Reserve an attempt, unless the identifier is backing off or busy.
+
+        Every successful call must be paired with `release`.
+
+        Args:
+            identifier (str): Normalized login identifier.
+
+        Raises:
+            LoginThrottledError: With the seconds left until the next attempt.
+        """
+        now = self._clock()
+        attempts = self._track(identifier)
+
+        remaining = attempts.blocked_until - now
+        if remaining > 0:
+            raise LoginThrottledError(retry_after=math.ceil(remaining))
+
+        self._expire(attempts, now)
+        allowance = max(1, self.free_attempts - len(attempts.failures))
+        if attempts.in_flight >= allowance:
+            raise LoginThrottledError(retry_after=1)
+        attempts.in_flight += 1
+
+    def release(self, identifier: str) -> None:
+        """
+        End an attempt reserved by `check`, after its outcome is recorded.
+
+        Args:
+            identifier (str): Normalized login identifier.
+        """
+        attempts = self._attempts.get(identifier)
+        if attempts is None:
+            return
+
+        attempts.in_flight = max(0, attempts.in_flight - 1)
+        if not attempts.in_flight and not attempts.failures:
+            del self._attempts[identifier]
+
+    def check_account(self, user: User) -> None:
+        """
+        Reject the attempt if the account is locked out after failed logins.
+
+        Args:
+            user (User): The user matching the identifier.
+
+        Raises:
+            LoginThrottledError: With the seconds left until the lock expires.
+        """
+        if user.locked_until is None:
+            return
+        remaining = (user.locked_until - datetime.now(timezone.utc)).total_seconds()
+        if remaining > 0:
+            raise LoginThrottledError(retry_after=math.ceil(remaining))
+
+    def record_failure(self, identifier: str, user_id: UUID | None = None) -> None:
+        """
+        Count a failed attempt and start or extend the backoff.
+
+        Unknown identifiers are tracked too, so responses do not reveal
+        whether an account exists.
+
+        Args:
+            identifier (str): Normalized login identifier.
+            user_id (UUID, optional): The matched user, if any, whose stored
+                failure count is incremented on the next flush.
+        """
+        now = self._clock()
+        attempts = self._track(identifier)
+        self._expire(attempts, now)
+        attempts.failures.append(now)
+
+        excess = len(attempts.failures) - self.free_attempts
+        if excess > 0:
+            delay = min(self.base_delay * 2 ** (excess - 1), self.max_delay)
+            attempts.blocked_until = now + delay
+
+        if user_id is not None:
+            self._pending_failures[user_id] = self._pending_failures.get(user_id, 0) + 1
+
+    def record_success(self, identifier: str, user: User) -> None:
+        """
+        Clear the identifier's window after a correct password.
+
+        Args:
+            identifier (str): Normalized login identifier.
+            user (User): The authenticated user.
+        """
+        self._attempts.pop(identifier, None)
+        self._pending_failures.pop(user.id, None)
+        if user.failed_login_count:
+            self._pending_resets.add(user.id)
+
+    def _track(self, identifier: str) -> _Attempts:
+        attempts = self._attempts.get(identifier)
+        if attempts is None:
+            attempts = self._attempts[identifier] = _Attempts()
+            if len(self._attempts) > self.max_entries:
+                self._attempts.popitem(last=False)
+        else:
+            self._attempts.move_to_end(identifier)
+        return attempts
+
+    def _expire(self, attempts: _Attempts, now: float) -> None:
+        failures = attempts.failures
+        while failures and failures[0] <= now - self.window:
+            failures.popleft()
+
+    def reset(self) -> None:
+        """Forget all in-memory state (used by tests)."""
+        self._attempts.clear()
+        self._pending_failures.clear()
+        self._pending_resets.clear()
+
+    async def flush(self) -> int:
+        """
+        Persist accumulated failure counts and resets in bulk.
+
+        Returns:
+            int: Number of users whose stored counters were updated.
+        """
+        failures, self._pending_failures = self._pending_failures, {}
+        resets, self._pending_resets = self._pending_resets, set()
+        if not failures and not resets:
+            return 0
+
+        try:
+            async with self.session_factory() as session:
+                if resets:
+                    await session.execute(
+                        update(User)
+                        .where(User.id.in_(resets))
+                        .values(failed_login_count=0)
+                        .execution_options(synchronize_session=False)
+                    )
+
+                if failures:
+                    increments = values(
+                        column("user_id", PgUUID(as_uuid=True)),
+                        column("failures", Integer),
+                        name="increments",
+                    ).data(list(failures.items()))
+                    new_count = User.failed_login_count + increments.c.failures
+
+                    stmt = (
+                        update(User)
+                        .where(User.id == increments.c.user_id)
+                        .values(
+                            failed_login_count=new_count,
+                            last_failed_login_at=func.now(),
+                        )
+                        .execution_options(synchronize_session=False)
+                    )
+                    if self.lock_threshold:
+                        # Lock for a while and start counting again, so the
+                        # next lock takes another full threshold of failures
+                        locking = new_count >= self.lock_threshold
+                        stmt = stmt.values(
+                            failed_login_count=case((locking, 0), else_=new_count),
+                            locked_until=case(
+                                (
+                                    locking,
+                                    func.now() + timedelta(seconds=self.lock_duration),
+                                ),
+                                else_=User.locked_until,
+                            ),
+                        )
+                    await session.execute(stmt)
+
+                await session.commit()
+        except Exception:
+            # Put the counts back so the next flush retries them
+            for user_id, count in failures.items():
+                self._pending_failures[user_id] = (
+                    self._pending_failures.get(user_id, 0) + count
+                )
+            self._pending_resets |= resets
+            raise
+
+        return len(failures.keys() | resets)
+
+    async def unlock(self, user_id: UUID) -> bool:
+        """
+        Lift a user's lockout and clear their failure count.
+
+        Args:
+            user_id (UUID): The user to unlock.
+
+        Returns:
+            bool: False if no such user exists.
+        """
+        self._pending_failures.pop(user_id, None)
+        async with self.session_factory() as session:
+            result = await session.execute(
+                update(User)
+                .where(User.id == user_id)
+                .values(failed_login_count=0, locked_until=None)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+        return result.rowcount == 1
+
+    def start(self) -> None:
+        """Start the periodic flush loop on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="login-guard-flush")
+
+    async def stop(self) -> None:
+        """Stop the flush loop and persist whatever is still pending."""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._task = None
+
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Final login failure flush failed")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Login failure flush failed")
+
+
+def get_login_guard() -> LoginGuard:
+    """
+    Lazily create and return the process-wide login guard.
+
+    Returns:
+        LoginGuard: The shared guard.
+    """
+    global _login_guard
+    if _login_guard is None:
+        _login_guard = LoginGuard()
+    return _login_guard
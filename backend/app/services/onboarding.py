@@ -1,51 +1,138 @@
-from fastapi import HTTPException
+from datetime import timedelta
+from uuid import UUID
+
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.constants.messages import Errors, Registration
+from app.constants.messages import Errors, Registration, Resend, Verification
+from app.core.config import settings
+from app.core.outbox import EmailKind, OutboxStatus
 from app.core.tokens.email import get_email_token
 from app.core.tokens.purposes import TokenPurpose
-from app.core.tokens.status import TokenStatus
-from app.models import User
+from app.core.tokens.status import LIVE_TOKEN_STATUSES, TokenStatus
+from app.models import EmailOutbox, UsedToken, User
 from app.schemas.user import UserCreate
-from app.services.email.verification import (
-    insert_token,
-    mark_token_as_issued,
-    send_verification_email,
-)
+from app.services.email.outbox import enqueue_email, wake_outbox_worker
+from app.services.email.verification import stage_token
+from app.services.identifier_filter import get_identifier_filter
 from app.services.user import create_user
 
 
 async def onboard_user(user_in: UserCreate, db: AsyncSession) -> dict[str, str] | None:
+    user = await create_user(user_in, db)
+    stage_verification_email(user.id, db)
+
+    # User, token and outbox rows commit together: three INSERTs (server
+    # defaults come back via RETURNING), one commit and no refreshes.
     try:
-        user = await create_user(user_in, db)
-    except HTTPException as e:
-        raise e
+        await db.commit()
+    except SQLAlchemyError as e:
+        await db.rollback()
+        return {"success": False, "message": Errors.GENERIC, "detail": str(e)}
 
-    return await onboard_after_user_created(user, db)
+    # Let this worker's filter know right away; others hear via NOTIFY
+    get_identifier_filter().add(user.username, user.email)
+    wake_outbox_worker()
 
+    return {"success": True, "message": Registration.SUCCESS, "user_id": str(user.id)}
 
-async def onboard_after_user_created(user: User, db: AsyncSession) -> dict[str, str]:
-    email_token = get_email_token(user_id=user.id)
 
-    try:
-        result = await insert_token(
-            user_id=user.id,
-            purpose=TokenPurpose.EMAIL_VERIFICATION,
-            token=email_token,
-            status=TokenStatus.PENDING,
-            db=db,
-        )
-    except HTTPException as r:
-        return {"success": False, "message": Errors.GENERIC, "detail": str(r)}
+async def resend_verification(user: User, db: AsyncSession) -> dict[str, str]:
+    """
+    Replace the user's verification token with a new one and email it.
 
-    try:
-        await send_verification_email(user=user, token=email_token)
-    except Exception as f:
-        return {"success": False, "message": Errors.GENERIC, "detail": str(f)}
+    Every earlier live verification token is marked REPLACED and its
+    undelivered outbox entry CANCELLED, so only the newest link works and
+    stale emails are never sent. A resend within
+    `EMAIL_RESEND_COOLDOWN_SECONDS` of the last token is skipped: that
+    token's email has just been sent or is still queued.
+
+    Args:
+        user (User): The user asking for a new link.
+        db (AsyncSession): Request session; committed here.
+
+    Returns:
+        dict[str, str]: Outcome with `success` and a user-facing `message`.
+    """
+    if user.is_verified:
+        return {"success": False, "message": Verification.ALREADY_VERIFIED}
+
+    # Serialize resends for this user so a burst cannot pass the cool-down
+    # check together and leave several live tokens behind
+    await db.execute(select(User.id).where(User.id == user.id).with_for_update())
+
+    cooldown = timedelta(seconds=settings.EMAIL_RESEND_COOLDOWN_SECONDS)
+    live = (
+        UsedToken.user_id == user.id,
+        UsedToken.purpose == TokenPurpose.EMAIL_VERIFICATION,
+        UsedToken.status.in_(LIVE_TOKEN_STATUSES),
+    )
+    recent = await db.scalar(
+        select(UsedToken.id)
+        .where(*live, UsedToken.created_at > func.now() - cooldown)
+        .limit(1)
+    )
+    if recent is not None:
+        await db.rollback()
+        return {"success": False, "message": Resend.RATE_LIMITED}
+
+    await db.execute(
+        update(UsedToken)
+        .where(*live)
+        .values(status=TokenStatus.REPLACED)
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        update(EmailOutbox)
+        .where(
+            EmailOutbox.user_id == user.id,
+            EmailOutbox.kind == EmailKind.VERIFICATION,
+            EmailOutbox.status == OutboxStatus.PENDING,
+        )
+        .values(status=OutboxStatus.CANCELLED, payload=None)
+        .execution_options(synchronize_session=False)
+    )
+    stage_verification_email(user.id, db)
 
     try:
-        await mark_token_as_issued(user_id=user.id, token=email_token, db=db)
-    except HTTPException as e:
+        await db.commit()
+    except SQLAlchemyError as e:
+        await db.rollback()
         return {"success": False, "message": Errors.GENERIC, "detail": str(e)}
 
-    return {"success": True, "message": Registration.SUCCESS, "user_id": str(user.id)}
+    wake_outbox_worker()
+
+    return {"success": True, "message": Resend.SUCCESS, "user_id": str(user.id)}
+
+
+def stage_verification_email(user_id: UUID, db: AsyncSession) -> str:
+    """
+    Stage a PENDING verification token and its outbox entry in `db`.
+
+    The token row and its outbox entry commit (or roll back) together; the
+    outbox worker sends the email and marks the token ISSUED afterwards.
+
+    Args:
+        user_id (UUID): The user to verify.
+        db (AsyncSession): The caller's session; not committed here.
+
+    Returns:
+        str: The raw verification token.
+    """
+    email_token = get_email_token(user_id=user_id)
+
+    stage_token(
+        user_id=user_id,
+        purpose=TokenPurpose.EMAIL_VERIFICATION,
+        token=email_token,
+        status=TokenStatus.PENDING,
+        db=db,
+    )
+    enqueue_email(
+        user_id=user_id,
+        kind=EmailKind.VERIFICATION,
+        payload={"token": email_token},
+        db=db,
+    )
+    return email_token
@@ -0,0 +1,255 @@
+"""
+Background migration of password hashes to the current Argon2 parameters.
+
+Raising the `PasswordHasher` costs only affects new hashes; every stored
+hash keeps the parameters it was created with until the user's password is
+hashed again, which needs the plaintext. The only time the server has it is
+a successful login, so `login_user` hands it to `RehashQueue` whenever
+`needs_rehash` reports the stored hash as outdated:
+
+- Scheduling is a dict insert. The login response never waits for the new
+  hash; the queue is bounded by `REHASH_MAX_PENDING` and drops new work when
+  full (the user is simply rehashed on a later login).
+- A background task takes up to `REHASH_BATCH_SIZE` entries every
+  `REHASH_FLUSH_SECONDS`, hashes them one at a time in the hash pool's
+  `background` lane (so at most one pool slot is ever taken from logins),
+  and writes the batch back in a single UPDATE. The update is a
+  compare-and-set on the old hash, so a password changed in the meantime is
+  never overwritten.
+- If the lane is saturated the remaining entries wait for the next batch.
+
+Plaintext passwords stay in process memory only until their batch is
+hashed, and pending entries are dropped on shutdown rather than delaying it.
+
+`nox_password_hashes_outdated` is recounted every `REHASH_COUNT_SECONDS`
+with a single query comparing each hash's parameter prefix to the current
+one, and lowered as batches are written. The count scans the whole users
+table, so only one worker runs it: whichever holds a session-level advisory
+lock, kept on one pooled connection for as long as that worker is up. The
+others retry the lock every interval and take over if the holder goes away.
+"""
+
+import asyncio
+from uuid import UUID
+
+from loguru import logger
+from sqlalchemy import String, column, func, select, text, update, values
+from sqlalchemy.dialects.postgresql import UUID as PgUUID
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.db import async_session
+from app.core.metrics import PASSWORD_HASHES_OUTDATED, PASSWORD_REHASHES
+from app.core.security import current_hash_prefix, hash_password_async
+from app.exceptions.handlers import HashingUnavailableError
+from app.models.user import User
+
+# Global queue cache (lazy-loaded)
+_rehash_queue = None
+
+# Arbitrary key ("rehash") for the lock electing the worker that recounts
+_COUNT_LOCK_KEY = 0x7265_6861_7368
+
+
+class RehashQueue:
+    """
+    Write-behind queue that rehashes passwords after successful logins.
+
+    Attributes:
+        batch_size (int): Hashes rewritten per UPDATE.
+        flush_interval (float): Seconds between batches.
+        max_pending (int): Queued rehashes before new ones are dropped.
+        count_interval (float): Seconds between recounts of outdated hashes.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = async_session,
+        batch_size: int | None = None,
+        flush_interval: float | None = None,
+        max_pending: int | None = None,
+        count_interval: float | None = None,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.REHASH_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.REHASH_FLUSH_SECONDS
+        self.max_pending = max_pending or settings.REHASH_MAX_PENDING
+        self.count_interval = count_interval or settings.REHASH_COUNT_SECONDS
+
+        # user_id -> (plaintext password, hash it was verified against)
+        self._pending: dict[UUID, tuple[str, str]] = {}
+        self._task: asyncio.Task | None = None
+        self._count_task: asyncio.Task | None = None
+
+    @property
+    def pending(self) -> int:
+        """Number of rehashes waiting for a batch."""
+        return len(self._pending)
+
+    def schedule(self, user_id: UUID, password: str, hashed_password: str) -> bool:
+        """
+        Queue a user's password for rehashing.
+
+        Args:
+            user_id (UUID): The authenticated user.
+            password (str): The password that was just verified.
+            hashed_password (str): The stored hash it was verified against.
+
+        Returns:
+            bool: False if the queue was full and the rehash was dropped.
+        """
+        if user_id not in self._pending and len(self._pending) >= self.max_pending:
+            PASSWORD_REHASHES.labels(result="dropped").inc()
+            return False
+        self._pending[user_id] = (password, hashed_password)
+        return True
+
+    def reset(self) -> None:
+        """Forget all pending rehashes (used by tests)."""
+        self._pending.clear()
+
+    async def run_once(self) -> int:
+        """
+        Rehash one batch of pending passwords and store the new hashes.
+
+        Returns:
+            int: Number of users whose stored hash was replaced.
+        """
+        batch: list[tuple[UUID, str, str]] = []
+        for user_id in list(self._pending)[: self.batch_size]:
+            password, old_hash = self._pending.pop(user_id)
+            try:
+                new_hash = await hash_password_async(password, lane="background")
+            except HashingUnavailableError:
+                # Logins need the pool more; retry this and the rest later
+                self._pending.setdefault(user_id, (password, old_hash))
+                break
+            except Exception:
+                PASSWORD_REHASHES.labels(result="failed").inc()
+                logger.exception("Password rehash failed")
+                continue
+            batch.append((user_id, old_hash, new_hash))
+
+        if not batch:
+            return 0
+
+        rows = values(
+            column("user_id", PgUUID(as_uuid=True)),
+            column("old_hash", String),
+            column("new_hash", String),
+            name="rehashed",
+        ).data(batch)
+
+        async with self.session_factory() as session:
+            result = await session.execute(
+                update(User)
+                .where(
+                    User.id == rows.c.user_id,
+                    User.hashed_password == rows.c.old_hash,
+                )
+                .values(hashed_password=rows.c.new_hash)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+
+        written = result.rowcount
+        PASSWORD_REHASHES.labels(result="rehashed").inc(written)
+        PASSWORD_REHASHES.labels(result="stale").inc(len(batch) - written)
+        PASSWORD_HASHES_OUTDATED.dec(written)
+        return written
+
+    async def count_outdated(self, session: AsyncSession | None = None) -> int:
+        """
+        Count stored hashes not using the current parameters.
+
+        Also sets the `nox_password_hashes_outdated` gauge.
+
+        Args:
+            session (AsyncSession | None): Session to count on; a new one is
+                opened if omitted.
+
+        Returns:
+            int: Number of outdated hashes.
+        """
+        if session is None:
+            async with self.session_factory() as session:
+                return await self.count_outdated(session)
+
+        outdated = await session.scalar(
+            select(func.count()).where(
+                ~User.hashed_password.startswith(current_hash_prefix(), autoescape=True)
+            )
+        )
+        PASSWORD_HASHES_OUTDATED.set(outdated)
+        return outdated
+
+    def start(self) -> None:
+        """Start the rehash and recount loops on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="password-rehash")
+            self._count_task = asyncio.create_task(
+                self._run_count(), name="password-rehash-count"
+            )
+
+    async def stop(self) -> None:
+        """Stop both loops and drop whatever is still pending."""
+        for task in (self._task, self._count_task):
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._task = self._count_task = None
+
+        if self._pending:
+            logger.info("Dropping {} pending password rehashes", len(self._pending))
+            self._pending.clear()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                while await self.run_once() and self._pending:
+                    pass
+            except Exception:
+                logger.exception("Password rehash batch failed")
+
+    async def _run_count(self) -> None:
+        key = {"key": _COUNT_LOCK_KEY}
+        while True:
+            try:
+                async with self.session_factory() as session:
+                    # Session-level lock: it must outlive every count, so the
+                    # connection stays out of transactions between them
+                    conn = await session.connection(
+                        execution_options={"isolation_level": "AUTOCOMMIT"}
+                    )
+                    if await conn.scalar(
+                        text("SELECT pg_try_advisory_lock(:key)"), key
+                    ):
+                        try:
+                            while True:
+                                await self.count_outdated(session)
+                                await asyncio.sleep(self.count_interval)
+                        finally:
+                            await conn.execute(
+                                text("SELECT pg_advisory_unlock(:key)"), key
+                            )
+            except Exception:
+                logger.exception("Counting outdated password hashes failed")
+            await asyncio.sleep(self.count_interval)
+
+
+def get_rehash_queue() -> RehashQueue:
+    """
+    Lazily create and return the process-wide rehash queue.
+
+    Returns:
+        RehashQueue: The shared queue.
+    """
+    global _rehash_queue
+    if _rehash_queue is None:
+        _rehash_queue = RehashQueue()
+    return _rehash_queue
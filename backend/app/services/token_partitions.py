@@ -0,0 +1,326 @@
+"""
+Monthly partition maintenance for `used_tokens`.
+
+`used_tokens` is range-partitioned on `created_at`, one partition per
+calendar month (UTC). This module keeps that layout healthy:
+
+- `create_partitions` pre-creates the current month and the next
+  `TOKEN_PARTITION_MONTHS_AHEAD` months, so inserts never fall through to
+  the default partition. Rows already sitting in the default partition for
+  a new month are moved into it in the same transaction.
+- `retire_partitions` detaches, and by default drops, every partition whose
+  whole range is older than a cutoff. Both are catalog operations, so the
+  cost does not depend on the number of rows and no dead tuples are left
+  for VACUUM.
+
+Every DDL statement runs under a transaction-scoped advisory lock, so
+several workers can run maintenance at once, and with a short
+`lock_timeout`, so a long-running transaction makes maintenance fail fast
+and retry on the next pass instead of queueing inserts behind it.
+
+Archiving a partition before retiring it spans several transactions, which
+the transaction-scoped lock cannot cover; `retirement_lock` serializes those
+passes with a session-level lock, and a worker that finds it taken skips
+its turn instead of archiving the same rows again.
+"""
+
+import re
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.tokens.email import longest_token_lifetime
+from app.models.used_token import DEFAULT_PARTITION, UsedToken
+
+PARENT = UsedToken.__tablename__
+
+# Arbitrary key shared by every process maintaining `used_tokens` partitions
+_ADVISORY_LOCK_KEY = 0x7573_6564_746F_6B
+
+# Held across a whole archive-and-retire pass, so it needs its own key
+_RETIREMENT_LOCK_KEY = _ADVISORY_LOCK_KEY + 1
+
+_LOCK_TIMEOUT = "5s"
+
+_BOUND = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+@dataclass(frozen=True)
+class Partition:
+    """
+    One attached partition of `used_tokens`.
+
+    Attributes:
+        name (str): Table name of the partition.
+        lower (datetime | None): Inclusive lower bound; None for MINVALUE.
+        upper (datetime | None): Exclusive upper bound; None for MAXVALUE.
+    """
+
+    name: str
+    lower: datetime | None
+    upper: datetime | None
+
+
+def month_start(moment: datetime) -> datetime:
+    """
+    Truncate a timestamp to the first instant of its UTC month.
+
+    Args:
+        moment (datetime): Any aware timestamp.
+
+    Returns:
+        datetime: Midnight UTC on the first day of that month.
+    """
+    moment = moment.astimezone(timezone.utc)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(moment: datetime, months: int) -> datetime:
+    """
+    Shift a month start by a number of months.
+
+    Args:
+        moment (datetime): A value returned by `month_start`.
+        months (int): Months to add; may be negative.
+
+    Returns:
+        datetime: The first instant of the resulting month.
+    """
+    index = moment.year * 12 + moment.month - 1 + months
+    return moment.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(lower: datetime) -> str:
+    """
+    Name of the partition that starts at `lower`.
+
+    Args:
+        lower (datetime): First instant of the partition's month.
+
+    Returns:
+        str: For example `used_tokens_p2026_10`.
+    """
+    return f"{PARENT}_p{lower:%Y_%m}"
+
+
+def _parse_bound(value: str) -> datetime | None:
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+    bound = datetime.fromisoformat(value.strip("'"))
+    # Bounds of a `timestamp without time zone` key are rendered without an
+    # offset; they are UTC like everything else here
+    return bound if bound.tzinfo else bound.replace(tzinfo=timezone.utc)
+
+
+async def is_partitioned(session: AsyncSession) -> bool:
+    """
+    Check whether `used_tokens` is a partitioned table in this database.
+
+    Args:
+        session (AsyncSession): Active database session.
+
+    Returns:
+        bool: False for databases not yet migrated to the partitioned layout.
+    """
+    return bool(
+        await session.scalar(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = to_regclass(:parent))"
+            ),
+            {"parent": PARENT},
+        )
+    )
+
+
+async def list_partitions(session: AsyncSession) -> list[Partition]:
+    """
+    List the range partitions of `used_tokens`, oldest first.
+
+    The default partition is not included.
+
+    Args:
+        session (AsyncSession): Active database session.
+
+    Returns:
+        list[Partition]: Attached range partitions with their bounds.
+    """
+    # Render bounds in UTC so they parse the same regardless of the server zone
+    await session.execute(text("SET LOCAL TIME ZONE 'UTC'"))
+    result = await session.execute(
+        text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = CAST(:parent AS regclass)"
+        ),
+        {"parent": PARENT},
+    )
+
+    partitions = []
+    for name, bound in result.all():
+        match = _BOUND.search(bound)
+        if match is None:
+            continue
+        lower, upper = (_parse_bound(v) for v in match.groups())
+        partitions.append(Partition(name, lower, upper))
+
+    epoch = datetime.min.replace(tzinfo=timezone.utc)
+    return sorted(partitions, key=lambda p: p.lower or epoch)
+
+
+async def _lock(session: AsyncSession) -> None:
+    await session.execute(
+        text("SELECT pg_advisory_xact_lock(:key)"), {"key": _ADVISORY_LOCK_KEY}
+    )
+    await session.execute(text(f"SET LOCAL lock_timeout = '{_LOCK_TIMEOUT}'"))
+
+
+@asynccontextmanager
+async def retirement_lock(session: AsyncSession) -> AsyncIterator[bool]:
+    """
+    Try to take the lock that serializes partition retirement across workers.
+
+    The lock belongs to the database session, not a transaction, so it is
+    held on an autocommit connection that `session` keeps until it closes;
+    use a session of its own. A dropped connection releases it.
+
+    Args:
+        session (AsyncSession): A session used only for the lock.
+
+    Yields:
+        bool: Whether the lock was acquired; if not, another worker is
+            retiring partitions and the caller should skip.
+    """
+    conn = await session.connection(execution_options={"isolation_level": "AUTOCOMMIT"})
+    key = {"key": _RETIREMENT_LOCK_KEY}
+    acquired = await conn.scalar(text("SELECT pg_try_advisory_lock(:key)"), key)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), key)
+
+
+def _covered(partitions: list[Partition], lower: datetime, upper: datetime) -> bool:
+    return any(
+        (p.lower is None or p.lower <= lower) and (p.upper is None or p.upper >= upper)
+        for p in partitions
+    )
+
+
+async def create_partitions(
+    session: AsyncSession, months_ahead: int, now: datetime | None = None
+) -> list[str]:
+    """
+    Create missing monthly partitions from the current month onwards.
+
+    Commits the session.
+
+    Args:
+        session (AsyncSession): Active database session.
+        months_ahead (int): Future months to create beyond the current one.
+        now (datetime, optional): Reference time; defaults to the current time.
+
+    Returns:
+        list[str]: Names of the partitions created.
+    """
+    await _lock(session)
+    partitions = await list_partitions(session)
+    first = month_start(now or datetime.now(timezone.utc))
+
+    created = []
+    for offset in range(months_ahead + 1):
+        lower = add_months(first, offset)
+        upper = add_months(lower, 1)
+        if _covered(partitions, lower, upper):
+            continue
+
+        name = partition_name(lower)
+        bounds = {"lower": lower, "upper": upper}
+        where = (
+            "created_at >= CAST(:lower AS timestamptz) "
+            "AND created_at < CAST(:upper AS timestamptz)"
+        )
+        stranded = await session.scalar(
+            text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {where})"),
+            bounds,
+        )
+
+        # DDL cannot take bind parameters; the bounds are our own datetimes
+        range_sql = f"FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+        if not stranded:
+            await session.execute(
+                text(
+                    f"CREATE TABLE {name} PARTITION OF {PARENT} FOR VALUES {range_sql}"
+                )
+            )
+        else:
+            # Attaching would fail while the default partition still holds
+            # rows for this range, so move them into the new table first
+            await session.execute(
+                text(
+                    f"CREATE TABLE {name} "
+                    f"(LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+                )
+            )
+            await session.execute(
+                text(
+                    f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+                    f"WHERE {where} RETURNING *) "
+                    f"INSERT INTO {name} SELECT * FROM moved"
+                ),
+                bounds,
+            )
+            await session.execute(
+                text(
+                    f"ALTER TABLE {PARENT} ATTACH PARTITION {name} "
+                    f"FOR VALUES {range_sql}"
+                )
+            )
+        created.append(name)
+
+    await session.commit()
+    return created
+
+
+async def retire_partitions(
+    session: AsyncSession, before: datetime, drop: bool = True
+) -> list[str]:
+    """
+    Detach, and optionally drop, partitions that end on or before `before`.
+
+    Detached partitions stay in the database as ordinary tables (e.g. for
+    `pg_dump` based archival) and no longer take part in token lookups.
+    `before` is moved back by the longest token lifetime if needed, so a
+    partition that may still hold a redeemable token is never retired.
+    Commits the session.
+
+    Args:
+        session (AsyncSession): Active database session.
+        before (datetime): Partitions whose upper bound is not later than
+            this are retired.
+        drop (bool): Drop the tables after detaching them.
+
+    Returns:
+        list[str]: Names of the partitions retired.
+    """
+    before = min(before, datetime.now(timezone.utc) - longest_token_lifetime())
+
+    await _lock(session)
+    retired = [
+        p.name
+        for p in await list_partitions(session)
+        if p.upper is not None and p.upper <= before
+    ]
+
+    for name in retired:
+        await session.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+        if drop:
+            await session.execute(text(f"DROP TABLE {name}"))
+
+    await session.commit()
+    return retired
@@ -0,0 +1,394 @@
+"""
+Background expiry, archival and deletion of `used_tokens` rows.
+
+Without this, every issued or resent token stays in `used_tokens` forever.
+`TokenSweeper` keeps the table (and its hash index) bounded in two phases:
+
+1. Expire: live (PENDING / ISSUED) tokens past their `expires_at` are
+   moved to EXPIRED. Email verification rows staged before `expires_at`
+   existed expire `EMAIL_TOKEN_EXPIRES_MINUTES` after creation.
+2. Archive: terminal rows older than `TOKEN_RETENTION_DAYS` are appended to
+   a gzip-compressed NDJSON segment file under `TOKEN_ARCHIVE_DIR`, fsynced,
+   and only then deleted.
+
+Both phases work in batches of `TOKEN_SWEEP_BATCH_SIZE` rows, one short
+transaction per batch, claimed with `FOR UPDATE SKIP LOCKED` so a sweep
+never waits on (or blocks) a concurrent redeem, and pause for
+`TOKEN_SWEEP_PAUSE_SECONDS` between batches so replicas can keep up. At most
+`TOKEN_SWEEP_MAX_BATCHES` batches run per phase and pass; a larger backlog
+is spread over several passes.
+
+Once `used_tokens` is partitioned by month, phase 2 works a partition at a
+time instead: every partition whose range ends before the retention cutoff
+(or the longest token lifetime, if that is longer) is streamed into the
+segment and then detached and dropped (or only detached, with
+`TOKEN_PARTITION_DROP` off), so no rows are deleted and no dead tuples are
+left behind. Row-by-row archival then only applies to the default
+partition. Each pass also pre-creates the next
+`TOKEN_PARTITION_MONTHS_AHEAD` monthly partitions; see
+`app.services.token_partitions`.
+
+Archival is at-least-once: if the delete fails after a segment was written,
+the rows are archived again by the next pass.
+"""
+
+import asyncio
+import gzip
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from loguru import logger
+from sqlalchemy import and_, delete, func, or_, select, text, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.core.db import async_session
+from app.core.tokens.email import longest_token_lifetime, token_lifetime
+from app.core.tokens.purposes import TokenPurpose
+from app.core.tokens.status import LIVE_TOKEN_STATUSES, TokenStatus
+from app.models import UsedToken
+from app.models.used_token import DEFAULT_PARTITION
+from app.services import token_partitions
+from app.services.token_partitions import Partition
+
+# Global sweeper cache (created by the lifespan)
+_token_sweeper = None
+
+
+def _archive_record(token: UsedToken) -> dict:
+    return {
+        "id": str(token.id),
+        "user_id": str(token.user_id),
+        "token_hash": token.token_hash.hex(),
+        "purpose": token.purpose.name,
+        "status": token.status.name,
+        "created_at": token.created_at.isoformat() if token.created_at else None,
+        "redeemed_at": token.redeemed_at.isoformat() if token.redeemed_at else None,
+        "expires_at": token.expires_at.isoformat() if token.expires_at else None,
+    }
+
+
+def _append_segment(path: Path, records: list[dict]) -> None:
+    # Each batch is its own gzip member; gzip readers stream them as one file
+    payload = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records)
+    with open(path, "ab") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as gz:
+            gz.write(payload.encode("utf-8"))
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+class TokenSweeper:
+    """
+    Batched expiry and archival of used token rows.
+
+    Attributes:
+        batch_size (int): Rows per transaction.
+        max_batches (int): Batches per phase in one pass.
+        pause (float): Seconds to sleep between batches.
+        retention (timedelta): Age after which terminal rows are archived.
+        archive_dir (Path): Directory receiving NDJSON segment files.
+        interval (float): Seconds between passes of the background loop.
+        months_ahead (int): Future monthly partitions kept pre-created.
+        drop_partitions (bool): Drop retired partitions instead of only
+            detaching them.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = async_session,
+        batch_size: int | None = None,
+        max_batches: int | None = None,
+        pause: float | None = None,
+        retention: timedelta | None = None,
+        archive_dir: str | Path | None = None,
+        interval: float | None = None,
+        months_ahead: int | None = None,
+        drop_partitions: bool | None = None,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.TOKEN_SWEEP_BATCH_SIZE
+        self.max_batches = max_batches or settings.TOKEN_SWEEP_MAX_BATCHES
+        self.pause = settings.TOKEN_SWEEP_PAUSE_SECONDS if pause is None else pause
+        self.retention = retention or timedelta(days=settings.TOKEN_RETENTION_DAYS)
+        self.archive_dir = Path(archive_dir or settings.TOKEN_ARCHIVE_DIR)
+        self.interval = interval or settings.TOKEN_SWEEP_INTERVAL_SECONDS
+        self.months_ahead = (
+            settings.TOKEN_PARTITION_MONTHS_AHEAD
+            if months_ahead is None
+            else months_ahead
+        )
+        self.drop_partitions = (
+            settings.TOKEN_PARTITION_DROP
+            if drop_partitions is None
+            else drop_partitions
+        )
+        self._task: asyncio.Task | None = None
+
+    async def expire_batch(self) -> int:
+        """
+        Mark one batch of overdue live tokens as EXPIRED.
+
+        Returns:
+            int: Number of rows expired.
+        """
+        cutoff = func.now() - timedelta(minutes=settings.EMAIL_TOKEN_EXPIRES_MINUTES)
+        # No token outlives its purpose's lifetime, so bounding `created_at`
+        # by the shortest one keeps the scan on the live created_at index
+        youngest = func.now() - min(
+            token_lifetime(purpose)
+            for purpose in (
+                TokenPurpose.EMAIL_VERIFICATION,
+                TokenPurpose.PASSWORD_RESET,
+            )
+        )
+        overdue = (
+            select(UsedToken.id)
+            .where(
+                UsedToken.status.in_(LIVE_TOKEN_STATUSES),
+                UsedToken.created_at < youngest,
+                or_(
+                    UsedToken.expires_at < func.now(),
+                    and_(
+                        UsedToken.expires_at.is_(None),
+                        UsedToken.purpose == TokenPurpose.EMAIL_VERIFICATION,
+                        UsedToken.created_at < cutoff,
+                    ),
+                ),
+            )
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+
+        async with self.session_factory() as session:
+            result = await session.execute(
+                update(UsedToken)
+                .where(UsedToken.id.in_(overdue))
+                .values(status=TokenStatus.EXPIRED)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+        return result.rowcount
+
+    async def archive_batch(self, segment: Path, default_only: bool = False) -> int:
+        """
+        Archive and delete one batch of terminal rows past retention.
+
+        Args:
+            segment (Path): Segment file the batch is appended to.
+            default_only (bool): Only consider rows in the default partition;
+                the monthly partitions are retired as a whole instead.
+
+        Returns:
+            int: Number of rows archived and deleted.
+        """
+        cutoff = datetime.now(timezone.utc) - self.retention
+
+        stmt = select(UsedToken).where(
+            UsedToken.status.not_in(LIVE_TOKEN_STATUSES),
+            UsedToken.created_at < cutoff,
+        )
+        if default_only:
+            stmt = stmt.where(
+                text("used_tokens.tableoid = CAST(:partition AS regclass)").bindparams(
+                    partition=DEFAULT_PARTITION
+                )
+            )
+
+        async with self.session_factory() as session:
+            result = await session.execute(
+                stmt.order_by(UsedToken.created_at)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            tokens = result.scalars().all()
+            if not tokens:
+                return 0
+
+            records = [_archive_record(token) for token in tokens]
+            await asyncio.to_thread(_append_segment, segment, records)
+
+            await session.execute(
+                delete(UsedToken)
+                .where(UsedToken.id.in_([token.id for token in tokens]))
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+        return len(tokens)
+
+    async def create_partitions(self) -> list[str]:
+        """
+        Pre-create the current and the next `months_ahead` monthly partitions.
+
+        Returns:
+            list[str]: Names of the partitions created.
+        """
+        async with self.session_factory() as session:
+            created = await token_partitions.create_partitions(
+                session, self.months_ahead
+            )
+        if created:
+            logger.info("Created used_tokens partitions: {}", ", ".join(created))
+        return created
+
+    async def retire_partitions(self, segment: Path) -> int:
+        """
+        Archive and retire every partition that ends before the retention cutoff.
+
+        Rows are streamed into `segment` first unless partitions are only
+        detached, in which case the detached tables are the archive. Skipped
+        while another worker is doing the same.
+
+        Args:
+            segment (Path): Segment file the rows are appended to.
+
+        Returns:
+            int: Number of rows archived.
+        """
+        # Another worker archiving the same partitions would write their
+        # rows twice, so only one retires at a time and the others skip
+        async with self.session_factory() as lock_session:
+            async with token_partitions.retirement_lock(lock_session) as acquired:
+                if not acquired:
+                    logger.debug("used_tokens partitions are being retired elsewhere")
+                    return 0
+                return await self._retire_due_partitions(segment)
+
+    async def _retire_due_partitions(self, segment: Path) -> int:
+        # Whole partitions go regardless of status, so none may still hold a
+        # token that can be redeemed (refresh tokens can outlive retention)
+        cutoff = datetime.now(timezone.utc) - max(
+            self.retention, longest_token_lifetime()
+        )
+        async with self.session_factory() as session:
+            due = [
+                p
+                for p in await token_partitions.list_partitions(session)
+                if p.upper is not None and p.upper <= cutoff
+            ]
+        if not due:
+            return 0
+
+        archived = 0
+        if self.drop_partitions:
+            for partition in due:
+                archived += await self._archive_partition(partition, segment)
+
+        async with self.session_factory() as session:
+            retired = await token_partitions.retire_partitions(
+                session, before=cutoff, drop=self.drop_partitions
+            )
+        logger.info(
+            "{} used_tokens partitions: {}",
+            "Dropped" if self.drop_partitions else "Detached",
+            ", ".join(retired),
+        )
+        return archived
+
+    async def _archive_partition(self, partition: Partition, segment: Path) -> int:
+        # Bounds on the partition key let Postgres prune to this partition
+        stmt = select(UsedToken).where(UsedToken.created_at < partition.upper)
+        if partition.lower is not None:
+            stmt = stmt.where(UsedToken.created_at >= partition.lower)
+
+        total = 0
+        async with self.session_factory() as session:
+            result = await session.stream_scalars(
+                stmt.order_by(UsedToken.created_at).execution_options(
+                    yield_per=self.batch_size
+                )
+            )
+            async for tokens in result.partitions():
+                records = [_archive_record(token) for token in tokens]
+                await asyncio.to_thread(_append_segment, segment, records)
+                total += len(records)
+        return total
+
+    async def run_once(self) -> dict[str, int]:
+        """
+        Run one expire pass followed by one archive pass.
+
+        On a partitioned table, upcoming partitions are created first and
+        the archive pass retires whole partitions before handling the rows
+        left in the default partition.
+
+        Returns:
+            dict[str, int]: Rows `expired` and `archived` in this pass.
+        """
+        async with self.session_factory() as session:
+            partitioned = await token_partitions.is_partitioned(session)
+        if partitioned:
+            await self.create_partitions()
+
+        expired = await self._drain(self.expire_batch)
+
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        segment = self.archive_dir / f"used_tokens-{stamp}.ndjson.gz"
+        archived = await self.retire_partitions(segment) if partitioned else 0
+        archived += await self._drain(
+            lambda: self.archive_batch(segment, default_only=partitioned)
+        )
+
+        if expired or archived:
+            logger.info(
+                "Token sweep: expired={}, archived={} ({})",
+                expired,
+                archived,
+                segment.name if archived else "no segment",
+            )
+        return {"expired": expired, "archived": archived}
+
+    async def _drain(self, batch) -> int:
+        total = 0
+        for _ in range(self.max_batches):
+            count = await batch()
+            total += count
+            if count < self.batch_size:
+                break
+            await asyncio.sleep(self.pause)
+        return total
+
+    def start(self) -> None:
+        """Start the periodic sweep loop on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="token-sweeper")
+            logger.info("Token sweeper started")
+
+    async def stop(self) -> None:
+        """Cancel the sweep loop; an interrupted batch simply rolls back."""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._task = None
+            logger.info("Token sweeper stopped")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Token sweep failed")
+            await asyncio.sleep(self.interval)
+
+
+def get_token_sweeper() -> TokenSweeper:
+    """
+    Lazily create and return the process-wide token sweeper.
+
+    Returns:
+        TokenSweeper: The shared sweeper.
+    """
+    global _token_sweeper
+    if _token_sweeper is None:
+        _token_sweeper = TokenSweeper()
+    return _token_sweeper
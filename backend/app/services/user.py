@@ -2,76 +2,121 @@
 User service layer.
 
 This module contains business logic related to user creation, including
-password hashing and database interactions with proper error handling.
+duplicate pre-checks, password hashing and database interactions. Lookups
+consult the in-memory identifier filter first so unknown usernames and
+emails never reach the database.
 """
 
 from fastapi import HTTPException
-from sqlalchemy import select
-from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.constants.messages import Errors, Registration
-from app.core.security import hash_password
+from app.core.security import hash_password_async
 from app.models.user import User
 from app.schemas.user import UserCreate
+from app.services.identifier_filter import get_identifier_filter
 from app.validators.auth_validators import validate_email
 
 
 async def create_user(user_in: UserCreate, db: AsyncSession) -> User:
     """
-    Creates a new user in the database with hashed credentials.
+    Inserts a new user with hashed credentials without committing.
+
+    The row is flushed (one INSERT) so duplicates surface here and rows that
+    reference the user can follow in the same transaction; the caller
+    commits once for all of them.
 
     Args:
         user_in (UserCreate): The data needed to create a new user.
-        db (AsyncSession): Async database session for committing user data.
+        db (AsyncSession): The caller's session; not committed here.
 
     Returns:
-        User: The created user object from the database.
+        User: The flushed user, with its id and defaults populated.
 
     Raises:
         HTTPException: If the user already exists (409 Conflict).
-        SQLAlchemyError: For general database failures.
+        HashingUnavailableError: If the password hashing pool is saturated.
     """
+    username = user_in.user_name.strip().lower()
+    email = user_in.email.strip().lower()
+
+    # Reject known duplicates with one indexed lookup before paying for Argon2.
+    # The IntegrityError handling below still covers concurrent signups.
+    if await identifier_taken(username, email, db):
+        raise HTTPException(status_code=409, detail=Registration.DUPE_USER)
+
     # Construct the user ORM model instance with hashed password.
     user = User(
-        username=user_in.user_name.strip().lower(),
-        email=user_in.email.strip().lower(),
+        username=username,
+        email=email,
         display_name=user_in.display_name,
-        hashed_password=hash_password(user_in.password),
+        hashed_password=await hash_password_async(user_in.password, lane="register"),
     )
 
     db.add(user)
     try:
-        # Attempt to commit the new user to the database.
-        await db.commit()
+        await db.flush()
     except IntegrityError:
         # Likely caused by a duplicate username or email.
         await db.rollback()
         raise HTTPException(status_code=409, detail=Registration.DUPE_USER)
-    except SQLAlchemyError as e:
-        # Roll back on any unexpected DB error.
-        await db.rollback()
-        raise
 
-    # Refresh to ensure the returned object has any DB-assigned fields populated (e.g., id).
-    await db.refresh(user)
     return user
 
 
+async def identifier_taken(username: str, email: str, db: AsyncSession) -> bool:
+    """
+    Checks whether a normalized username or email is already registered.
+
+    Identifiers the membership filter has never seen are reported as free
+    without a database query.
+
+    Args:
+        username (str): Normalized (stripped, lowercased) username.
+        email (str): Normalized (stripped, lowercased) email address.
+        db (AsyncSession): Async database session.
+
+    Returns:
+        bool: True if either identifier belongs to an existing user.
+    """
+    identifiers = get_identifier_filter()
+    username_seen = identifiers.might_contain_username(username)
+    if not username_seen and not identifiers.might_contain_email(email):
+        return False
+
+    stmt = (
+        select(User.id)
+        .where(or_(User.username == username, User.email == email))
+        .limit(1)
+    )
+    result = await db.execute(stmt)
+    return result.first() is not None
+
+
 async def get_user_by_email(email: str, db: AsyncSession) -> User:
     try:
         validate_email(email)
     except ValueError:
         raise HTTPException(status_code=400, detail=Errors.GENERIC)
 
-    stmt = select(User).where(User.email == email.strip().lower())
+    email = email.strip().lower()
+    if not get_identifier_filter().might_contain_email(email):
+        return None
+
+    stmt = select(User).where(User.email == email)
     result = await db.execute(stmt)
     user = result.scalar_one_or_none()
     return user
 
 
 async def get_user_by_username(username: str, db: AsyncSession) -> User:
-    stmt = select(User).where(User.username == username.strip().lower())
+    username = username.strip().lower()
+    if not get_identifier_filter().might_contain_username(username):
+        return None
+
+    stmt = select(User).where(User.username == username)
     result = await db.execute(stmt)
     user = result.scalar_one_or_none()
     return user
@@ -18,10 +18,16 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_asyn
 from sqlalchemy.pool import NullPool
 
 from app.core.base import Base
+from app.core.concurrency import AdaptiveConcurrency, AdaptiveConcurrencyMiddleware
 from app.core.config import settings
 from app.core.db import get_db
 from app.core.limiting import limiter
 from app.main import app
+from app.services import auth
+from app.services.auth import TokenVersionCache
+from app.services.email.outbox import OutboxWorker
+from app.services.login_guard import get_login_guard
+from app.services.rehash import get_rehash_queue
 
 # Use a separate test database by replacing "_dev" with "_test"
 TEST_DB_URL = str(settings.DATABASE_URL).replace("_dev", "_test")
@@ -45,6 +51,15 @@ def unique_username():
     return f"user_{uuid.uuid4().hex[:8]}"
 
 
+async def deliver_outbox() -> int:
+    """
+    Runs one outbox worker batch against the test database.
+
+    Returns the number of entries processed.
+    """
+    return await OutboxWorker(session_factory=AsyncSessionLocal).run_once()
+
+
 @pytest.fixture(scope="session")
 def anyio_backend():
     """
@@ -98,10 +113,35 @@ async def client(db_session: AsyncSession):
 @pytest.fixture(autouse=True)
 def reset_rate_limit():
     limiter.reset()
+    get_login_guard().reset()
+    get_rehash_queue().reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_adaptive_concurrency():
+    """
+    Gives every test fresh adaptive limits, so latencies learned by earlier
+    tests cannot shed its requests.
+    """
+    layer = app.middleware_stack
+    while layer is not None:
+        if isinstance(layer, AdaptiveConcurrencyMiddleware):
+            layer.limits = {path: AdaptiveConcurrency(path) for path in layer.limits}
+        layer = getattr(layer, "app", None)
 
 
 @pytest.fixture(autouse=True)
 def disable_real_emails(monkeypatch):
     mock = AsyncMock()
-    monkeypatch.setattr("app.services.onboarding.send_verification_email", mock)
+    monkeypatch.setattr("app.services.email.outbox.send_verification_email", mock)
     return mock  # optional: if you want to assert on it later
+
+
+@pytest.fixture(autouse=True)
+def token_version_cache(monkeypatch):
+    """
+    Points the shared token version cache at the test database.
+    """
+    cache = TokenVersionCache(session_factory=AsyncSessionLocal)
+    monkeypatch.setattr(auth, "_version_cache", cache)
+    return cache
@@ -0,0 +1,100 @@
+"""
+Integration tests for the email outbox worker.
+
+These tests verify:
+- That registration succeeds even when the mail server is down
+- That failed deliveries are rescheduled with backoff
+- That entries are marked FAILED (with their token) after the last attempt
+- That stopping the worker drains entries that are already due
+"""
+
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+
+import pytest
+from conftest import AsyncSessionLocal, deliver_outbox, unique_email, unique_username
+from sqlalchemy import select, update
+
+from app.core.outbox import OutboxStatus
+from app.core.tokens.status import TokenStatus
+from app.models import EmailOutbox, UsedToken
+from app.services.email.outbox import OutboxWorker
+
+
+async def _register(client) -> None:
+    payload = {
+        "email": unique_email(),
+        "password": "ValidPassword1!",
+        "user_name": unique_username(),
+        "display_name": "Test User",
+    }
+    response = await client.post("/api/v1/routers/auth/register", json=payload)
+    assert response.status_code == 200
+
+
+async def _load(db_session, model):
+    stmt = select(model).execution_options(populate_existing=True)
+    return (await db_session.execute(stmt)).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_smtp_failure_is_retried_later(
+    client, db_session, disable_real_emails: AsyncMock
+):
+    disable_real_emails.side_effect = ConnectionError("SMTP down")
+
+    await _register(client)
+    assert await deliver_outbox() == 1
+
+    entry = await _load(db_session, EmailOutbox)
+    assert entry.status == OutboxStatus.PENDING
+    assert entry.attempts == 1
+    assert entry.next_attempt_at > datetime.now(tz=timezone.utc)
+    assert "SMTP down" in entry.last_error
+
+    # Not due yet, so nothing is retried immediately
+    assert await deliver_outbox() == 0
+
+    token = await _load(db_session, UsedToken)
+    assert token.status == TokenStatus.PENDING
+
+
+@pytest.mark.asyncio
+async def test_entry_fails_after_max_attempts(
+    client, db_session, disable_real_emails: AsyncMock, monkeypatch
+):
+    monkeypatch.setattr("app.core.config.settings.EMAIL_OUTBOX_MAX_ATTEMPTS", 2)
+    disable_real_emails.side_effect = ConnectionError("SMTP down")
+
+    await _register(client)
+    for _ in range(2):
+        # Make the entry due again without waiting out the backoff
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(EmailOutbox).values(next_attempt_at=datetime.now(timezone.utc))
+            )
+            await session.commit()
+        assert await deliver_outbox() == 1
+
+    entry = await _load(db_session, EmailOutbox)
+    assert entry.status == OutboxStatus.FAILED
+    assert entry.payload is None
+
+    token = await _load(db_session, UsedToken)
+    assert token.status == TokenStatus.FAILED
+
+
+@pytest.mark.asyncio
+async def test_stop_drains_due_entries(
+    client, db_session, disable_real_emails: AsyncMock
+):
+    worker = OutboxWorker(session_factory=AsyncSessionLocal, poll_interval=60)
+    worker.start()
+
+    await _register(client)
+    await worker.stop(drain_timeout=5)
+
+    disable_real_emails.assert_awaited_once()
+    entry = await _load(db_session, EmailOutbox)
+    assert entry.status == OutboxStatus.SENT
+    assert entry.payload is None
@@ -0,0 +1,112 @@
+"""
+Integration tests for the pooled SMTP transport.
+
+Runs against a local aiosmtpd sink, so no real mail server is involved.
+
+These tests verify:
+- That many messages are delivered over a fixed number of connections
+- That a connection dropped by the server is transparently re-established
+- That idle connections are health-checked before reuse
+"""
+
+import asyncio
+import socket
+from email.message import EmailMessage
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from app.core.smtp_pool import SMTPPool
+
+
+class SinkHandler:
+    """Collects every delivered message and counts SMTP sessions."""
+
+    def __init__(self):
+        self.messages = []
+        self.sessions = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return "250 OK"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_sink():
+    handler = SinkHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+
+def _message(i: int) -> EmailMessage:
+    message = EmailMessage()
+    message["Subject"] = f"Message {i}"
+    message["From"] = "noreply@example.com"
+    message["To"] = f"user{i}@example.com"
+    message.set_content("hello")
+    return message
+
+
+@pytest.mark.asyncio
+async def test_messages_share_pooled_connections(smtp_sink):
+    controller, handler = smtp_sink
+    pool = SMTPPool(controller.hostname, controller.port, size=2)
+
+    await asyncio.gather(*(pool.send(_message(i)) for i in range(20)))
+    await pool.close()
+
+    assert len(handler.messages) == 20
+    assert pool.connections_opened == 2
+    assert handler.sessions == 2
+
+
+@pytest.mark.asyncio
+async def test_dropped_connection_is_reopened(smtp_sink):
+    controller, handler = smtp_sink
+    pool = SMTPPool(controller.hostname, controller.port, size=1)
+
+    await pool.send(_message(0))
+
+    # Simulate the server hanging up on an idle session
+    conn = pool._idle.get_nowait()
+    conn.client.transport.close()
+    pool._idle.put_nowait(conn)
+    await asyncio.sleep(0.05)
+
+    await pool.send(_message(1))
+    await pool.close()
+
+    assert len(handler.messages) == 2
+    assert pool.connections_opened == 2
+
+
+@pytest.mark.asyncio
+async def test_connections_are_recycled(smtp_sink):
+    controller, handler = smtp_sink
+    pool = SMTPPool(
+        controller.hostname,
+        controller.port,
+        size=1,
+        max_messages=3,
+        health_check_after=0,
+    )
+
+    for i in range(7):
+        await pool.send(_message(i))
+    await pool.close()
+
+    assert len(handler.messages) == 7
+    assert pool.connections_opened == 3
@@ -3,18 +3,20 @@ from unittest.mock import AsyncMock
 from uuid import UUID
 
 import pytest
-from conftest import unique_email, unique_username
+from conftest import deliver_outbox, unique_email, unique_username
 from httpx import AsyncClient
 from jose import jwt
-from sqlalchemy import select
+from sqlalchemy import select, update
 
 from app.constants.messages import Verification
 from app.core.config import settings
-from app.core.security import hash_str
+from app.core.outbox import OutboxStatus
+from app.core.security import hash_token
 from app.core.tokens.base import decode_token
+from app.core.tokens.opaque import create_opaque_token, is_opaque_token
 from app.core.tokens.purposes import TokenPurpose
 from app.core.tokens.status import TokenStatus
-from app.models import UsedToken, User
+from app.models import EmailOutbox, UsedToken, User
 
 
 @pytest.mark.asyncio
@@ -72,6 +74,72 @@ async def test_email_validation_altered_token(
     ]
 
 
+@pytest.mark.asyncio
+async def test_opaque_token_validation(
+    client, db_session, disable_real_emails: AsyncMock, monkeypatch
+):
+    monkeypatch.setattr(settings, "ONE_TIME_TOKEN_FORMAT", "opaque")
+    token, user_id = await register_test_user(
+        client,
+        email=unique_email(),
+        username=unique_username(),
+        disable_real_emails=disable_real_emails,
+    )
+    assert is_opaque_token(token) and len(token) == 43
+
+    response = await client.get(f"/api/v1/routers/auth/verify?token={token}")
+    assert response.status_code == 200
+
+    await assert_token_redeemed(token, db_session)
+    await assert_user_verified(user_id, db_session)
+
+    response = await client.get(f"/api/v1/routers/auth/verify?token={token}")
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_jwt_token_redeems_after_switch_to_opaque(
+    client, db_session, disable_real_emails: AsyncMock, monkeypatch
+):
+    token, user_id = await register_test_user(
+        client,
+        email=unique_email(),
+        username=unique_username(),
+        disable_real_emails=disable_real_emails,
+    )
+    monkeypatch.setattr(settings, "ONE_TIME_TOKEN_FORMAT", "opaque")
+
+    response = await client.get(f"/api/v1/routers/auth/verify?token={token}")
+    assert response.status_code == 200
+    await assert_user_verified(user_id, db_session)
+
+
+@pytest.mark.asyncio
+async def test_opaque_token_rejected_after_stored_expiry(
+    client, db_session, disable_real_emails: AsyncMock, monkeypatch
+):
+    monkeypatch.setattr(settings, "ONE_TIME_TOKEN_FORMAT", "opaque")
+    token, _ = await register_test_user(
+        client,
+        email=unique_email(),
+        username=unique_username(),
+        disable_real_emails=disable_real_emails,
+    )
+    await db_session.execute(
+        update(UsedToken)
+        .where(
+            UsedToken.token_hash == hash_token(token, TokenPurpose.EMAIL_VERIFICATION)
+        )
+        .values(expires_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+    )
+    await db_session.commit()
+
+    for candidate in (token, create_opaque_token()):
+        response = await client.get(f"/api/v1/routers/auth/verify?token={candidate}")
+        assert response.status_code == 400
+        assert response.json()["message"] == "Token not found or already used"
+
+
 async def register_test_user(
     client: AsyncClient,
     email: str,
@@ -89,6 +157,7 @@ async def register_test_user(
     assert response.status_code == 200
     user_id = UUID(response.json()["userId"])
 
+    assert await deliver_outbox() == 1
     assert disable_real_emails.await_args is not None
     _, kwargs = disable_real_emails.await_args
     token = kwargs["token"]
@@ -145,6 +214,88 @@ async def test_resend_verification_unknown_user(client: AsyncClient):
     assert "verification email was sent" in response.json()["message"]
 
 
+@pytest.mark.asyncio
+async def test_resend_replaces_earlier_tokens(
+    client: AsyncClient, db_session, disable_real_emails: AsyncMock, monkeypatch
+):
+    """
+    Resend twice after the cool-down, before the first resend is delivered.
+
+    Asserts:
+        - Earlier tokens are REPLACED and only one token stays live
+        - The superseded outbox entry is cancelled, so one email goes out
+        - The original link no longer verifies the user
+    """
+    monkeypatch.setattr(settings, "EMAIL_RESEND_COOLDOWN_SECONDS", 0)
+    email = unique_email()
+    token, user_id = await register_test_user(
+        client,
+        email=email,
+        username=unique_username(),
+        disable_real_emails=disable_real_emails,
+    )
+
+    for _ in range(2):
+        response = await client.post(
+            "/api/v1/routers/auth/verify/resend", params={"email": email}
+        )
+        assert response.status_code == 200
+
+    disable_real_emails.reset_mock()
+    assert await deliver_outbox() == 1
+    assert disable_real_emails.await_count == 1
+
+    result = await db_session.execute(
+        select(UsedToken.status).where(UsedToken.user_id == user_id)
+    )
+    statuses = sorted(result.scalars().all())
+    assert statuses == sorted(
+        [TokenStatus.REPLACED, TokenStatus.REPLACED, TokenStatus.ISSUED]
+    )
+
+    result = await db_session.execute(
+        select(EmailOutbox.status).where(EmailOutbox.user_id == user_id)
+    )
+    assert sorted(result.scalars().all()) == sorted(
+        [OutboxStatus.SENT, OutboxStatus.CANCELLED, OutboxStatus.SENT]
+    )
+
+    response = await client.get(f"/api/v1/routers/auth/verify?token={token}")
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_resend_within_cooldown_is_skipped(
+    client: AsyncClient, db_session, disable_real_emails: AsyncMock
+):
+    """
+    Resend right after registering.
+
+    Asserts:
+        - The response is unchanged
+        - No token or outbox entry is added, and the first token stays live
+    """
+    email = unique_email()
+    token, user_id = await register_test_user(
+        client,
+        email=email,
+        username=unique_username(),
+        disable_real_emails=disable_real_emails,
+    )
+
+    response = await client.post(
+        "/api/v1/routers/auth/verify/resend", params={"email": email}
+    )
+    assert response.status_code == 200
+    assert "verification email was sent" in response.json()["message"]
+    assert await deliver_outbox() == 0
+
+    result = await db_session.execute(
+        select(UsedToken.status).where(UsedToken.user_id == user_id)
+    )
+    assert result.scalars().all() == [TokenStatus.ISSUED]
+
+
 def decode_and_modify_token_attribute(token: str, attribute: str):
     decoded_token = decode_token(
         token=token,
@@ -206,7 +357,7 @@ def decode_and_modify_token_attribute(token: str, attribute: str):
 
 
 async def assert_token_redeemed(token: str, db_session):
-    token_hash = hash_str(token, TokenPurpose.EMAIL_VERIFICATION)
+    token_hash = hash_token(token, TokenPurpose.EMAIL_VERIFICATION)
     stmt = select(UsedToken).where(UsedToken.token_hash == token_hash)
     result = await db_session.execute(stmt)
     token_record = result.scalar_one()
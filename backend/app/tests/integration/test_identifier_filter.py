@@ -0,0 +1,112 @@
+"""
+Integration tests for the in-memory identifier membership filter.
+
+These tests verify:
+- That a rebuild loads every existing username and email
+- That unknown identifiers are answered without a database lookup
+- That users inserted elsewhere are picked up through LISTEN/NOTIFY
+- That an unloaded filter never hides a real user
+"""
+
+import asyncio
+
+import pytest
+from conftest import TEST_DB_URL, AsyncSessionLocal, unique_email, unique_username
+from sqlalchemy.engine import make_url
+
+from app.models.user import User
+from app.services import identifier_filter
+from app.services.identifier_filter import IdentifierFilter
+from app.services.user import get_user_by_email, get_user_by_username
+
+LISTEN_DSN = (
+    make_url(TEST_DB_URL)
+    .set(drivername="postgresql")
+    .render_as_string(hide_password=False)
+)
+
+
+def _user() -> User:
+    return User(
+        username=unique_username(),
+        email=unique_email(),
+        display_name="Filter User",
+        hashed_password="not-a-real-hash",
+    )
+
+
+@pytest.fixture
+def ident_filter(monkeypatch):
+    filt = IdentifierFilter(
+        session_factory=AsyncSessionLocal, dsn=LISTEN_DSN, capacity=1000
+    )
+    monkeypatch.setattr(identifier_filter, "_identifier_filter", filt)
+    return filt
+
+
+@pytest.mark.asyncio
+async def test_rebuild_loads_existing_users(db_session, ident_filter):
+    user = _user()
+    db_session.add(user)
+    await db_session.commit()
+
+    assert await ident_filter.rebuild() == 1
+    assert ident_filter.ready
+    assert ident_filter.might_contain_username(user.username)
+    assert ident_filter.might_contain_email(user.email)
+    assert not ident_filter.might_contain_email(unique_email())
+
+
+@pytest.mark.asyncio
+async def test_unknown_identifier_skips_database(db_session, ident_filter):
+    user = _user()
+    db_session.add(user)
+    await db_session.commit()
+    await ident_filter.rebuild()
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("database should not be queried")
+
+    assert (await get_user_by_email(user.email, db_session)).id == user.id
+
+    db_session.execute = fail
+    assert await get_user_by_email(unique_email(), db_session) is None
+    assert await get_user_by_username(unique_username(), db_session) is None
+
+
+@pytest.mark.asyncio
+async def test_unloaded_filter_passes_through(db_session, ident_filter):
+    user = _user()
+    db_session.add(user)
+    await db_session.commit()
+
+    assert not ident_filter.ready
+    found = await get_user_by_username(user.username, db_session)
+    assert found.id == user.id
+
+
+@pytest.mark.asyncio
+async def test_new_users_arrive_via_notify(db_session, ident_filter):
+    ident_filter.start()
+    try:
+        for _ in range(50):
+            if ident_filter.ready:
+                break
+            await asyncio.sleep(0.05)
+        assert ident_filter.ready
+
+        user = _user()
+        db_session.add(user)
+        await db_session.commit()
+
+        for _ in range(50):
+            if ident_filter.might_contain_email(user.email):
+                break
+            await asyncio.sleep(0.05)
+
+        assert ident_filter.might_contain_email(user.email)
+        assert ident_filter.might_contain_username(user.username)
+    finally:
+        await ident_filter.stop()
+
+    assert not ident_filter.ready
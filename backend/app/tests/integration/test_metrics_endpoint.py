@@ -0,0 +1,91 @@
+"""
+Integration tests for the `/metrics` endpoint.
+
+These tests verify:
+- That the endpoint serves the Prometheus text format
+- That a login shows up as request, password verification and JWT timings
+- That statements on an instrumented engine are timed by kind
+"""
+
+import pytest
+from conftest import TEST_DB_URL, AsyncSessionLocal, unique_email, unique_username
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.security import hash_password
+from app.core.telemetry import instrument_engine
+from app.models import User
+
+PASSWORD = "ValidPassword1!"
+LOGIN_ROUTE = "/api/v1/routers/auth/login"
+
+
+def _sample(body: str, prefix: str) -> float:
+    for line in body.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_serves_prometheus_format(client):
+    response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == CONTENT_TYPE_LATEST
+    assert "# TYPE nox_http_request_duration_seconds histogram" in response.text
+
+
+@pytest.mark.asyncio
+async def test_login_is_reflected_in_metrics(client):
+    user = User(
+        username=unique_username(),
+        email=unique_email(),
+        display_name="Metrics User",
+        hashed_password=hash_password(PASSWORD),
+    )
+    async with AsyncSessionLocal() as session:
+        session.add(user)
+        await session.commit()
+
+    request_count = (
+        "nox_http_request_duration_seconds_count"
+        f'{{method="POST",route="{LOGIN_ROUTE}",status="200"}}'
+    )
+    verify_count = 'nox_password_hash_seconds_count{operation="verify"}'
+    encode_count = 'nox_jwt_seconds_count{operation="encode"}'
+    before = (await client.get("/metrics")).text
+
+    response = await client.post(
+        LOGIN_ROUTE, json={"identifier": user.email, "password": PASSWORD}
+    )
+    assert response.status_code == 200
+
+    after = (await client.get("/metrics")).text
+    assert _sample(after, request_count) == _sample(before, request_count) + 1
+    assert _sample(after, verify_count) == _sample(before, verify_count) + 1
+    assert _sample(after, encode_count) >= _sample(before, encode_count) + 1
+
+
+def _query_count(statement: str) -> float:
+    value = REGISTRY.get_sample_value(
+        "nox_db_query_seconds_count", {"statement": statement}
+    )
+    return value or 0.0
+
+
+@pytest.mark.asyncio
+async def test_instrumented_engine_times_statements(setup_test_db):
+    engine = create_async_engine(TEST_DB_URL, poolclass=NullPool)
+    instrument_engine(engine)
+    before_select, before_other = _query_count("select"), _query_count("other")
+
+    async with engine.connect() as conn:
+        await conn.execute(select(User.id).limit(1))
+        await conn.execute(text("SHOW server_version"))
+    await engine.dispose()
+
+    assert _query_count("select") >= before_select + 1
+    assert _query_count("other") >= before_other + 1
@@ -0,0 +1,141 @@
+"""
+Integration tests for the background password rehash queue.
+
+These tests verify:
+- That logging in with an outdated hash schedules a rehash without writing it
+- That a batch rewrites outdated hashes and the password still verifies
+- That a hash changed after scheduling is never overwritten
+- That outdated hashes are counted and a full queue drops new work
+- That only one worker recounts, and another takes over when it stops
+"""
+
+import asyncio
+
+import pytest
+from argon2 import PasswordHasher
+from conftest import AsyncSessionLocal, unique_email, unique_username
+from sqlalchemy import select, update
+
+from app.core.security import check_password, hash_password, needs_rehash
+from app.models import User
+from app.services import rehash
+from app.services.rehash import RehashQueue
+
+PASSWORD = "ValidPassword1!"
+
+# Cheap parameters standing in for an older hasher configuration
+old_hasher = PasswordHasher(time_cost=1, memory_cost=8192, parallelism=1)
+
+
+async def _user_with_hash(db_session, hashed_password: str) -> User:
+    user = User(
+        username=unique_username(),
+        email=unique_email(),
+        display_name="Rehash User",
+        hashed_password=hashed_password,
+    )
+    # Committed outside `db_session`, so routes never see a cached copy
+    async with AsyncSessionLocal() as session:
+        session.add(user)
+        await session.commit()
+    return user
+
+
+async def _stored_hash(user_id) -> str:
+    async with AsyncSessionLocal() as session:
+        return await session.scalar(
+            select(User.hashed_password).where(User.id == user_id)
+        )
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    queue = RehashQueue(session_factory=AsyncSessionLocal)
+    monkeypatch.setattr(rehash, "_rehash_queue", queue)
+    return queue
+
+
+@pytest.mark.asyncio
+async def test_login_schedules_and_batch_rewrites_hash(client, db_session, queue):
+    user = await _user_with_hash(db_session, old_hasher.hash(PASSWORD))
+    credentials = {"identifier": user.email, "password": PASSWORD}
+
+    response = await client.post("/api/v1/routers/auth/login", json=credentials)
+    assert response.status_code == 200
+    assert queue.pending == 1
+    assert needs_rehash(await _stored_hash(user.id))
+
+    assert await queue.run_once() == 1
+    new_hash = await _stored_hash(user.id)
+    assert not needs_rehash(new_hash)
+    assert check_password(PASSWORD, new_hash)
+
+    response = await client.post("/api/v1/routers/auth/login", json=credentials)
+    assert response.status_code == 200
+    assert queue.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_changed_hash_is_not_overwritten(db_session, queue):
+    old_hash = old_hasher.hash(PASSWORD)
+    user = await _user_with_hash(db_session, old_hash)
+    queue.schedule(user.id, PASSWORD, old_hash)
+
+    changed = hash_password("AnotherPassword2!")
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(User).where(User.id == user.id).values(hashed_password=changed)
+        )
+        await session.commit()
+
+    assert await queue.run_once() == 0
+    assert await _stored_hash(user.id) == changed
+
+
+@pytest.mark.asyncio
+async def test_count_outdated(db_session, queue):
+    await _user_with_hash(db_session, old_hasher.hash(PASSWORD))
+    await _user_with_hash(db_session, hash_password(PASSWORD))
+
+    assert await queue.count_outdated() == 1
+
+
+@pytest.mark.asyncio
+async def test_only_one_worker_recounts(db_session, monkeypatch):
+    workers = [
+        RehashQueue(session_factory=AsyncSessionLocal, count_interval=0.05)
+        for _ in range(2)
+    ]
+    counts = {id(worker): 0 for worker in workers}
+
+    for worker in workers:
+
+        async def count_outdated(session=None, worker=worker):
+            counts[id(worker)] += 1
+            return await RehashQueue.count_outdated(worker, session)
+
+        monkeypatch.setattr(worker, "count_outdated", count_outdated)
+        worker.start()
+
+    try:
+        await asyncio.sleep(0.3)
+        leaders = [worker for worker in workers if counts[id(worker)]]
+        assert len(leaders) == 1
+
+        (follower,) = (worker for worker in workers if worker is not leaders[0])
+        await leaders[0].stop()
+        await asyncio.sleep(0.3)
+        assert counts[id(follower)] > 0
+    finally:
+        for worker in workers:
+            await worker.stop()
+
+
+def test_full_queue_drops_new_users(queue):
+    queue.max_pending = 1
+    first, second = (object() for _ in range(2))
+
+    assert queue.schedule(first, PASSWORD, "old")
+    assert queue.schedule(first, PASSWORD, "newer")
+    assert not queue.schedule(second, PASSWORD, "old")
+    assert queue.pending == 1
@@ -0,0 +1,246 @@
+"""
+Integration tests for the monthly partitioning of `used_tokens`.
+
+These tests verify:
+- That upcoming partitions are created once and receive new rows
+- That rows stranded in the default partition move into a new partition
+- That the sweeper archives and drops partitions past retention
+- That partitions can be detached instead of dropped
+- That only one worker at a time archives and retires partitions
+- That partitions which may hold a live refresh token outlast retention
+"""
+
+import gzip
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from conftest import AsyncSessionLocal, unique_email, unique_username
+from sqlalchemy import select, text, update
+
+from app.core.config import settings
+from app.core.tokens.purposes import TokenPurpose
+from app.core.tokens.status import TokenStatus
+from app.models import UsedToken, User
+from app.services import token_partitions
+from app.services.token_partitions import add_months, month_start, partition_name
+from app.services.token_sweeper import TokenSweeper
+
+
+async def _insert_tokens(db_session, *created: datetime) -> list:
+    user = User(
+        username=unique_username(),
+        email=unique_email(),
+        display_name="Partition User",
+        hashed_password="not-a-real-hash",
+    )
+    db_session.add(user)
+    await db_session.flush()
+
+    rows = [
+        UsedToken(
+            user_id=user.id,
+            token_hash=os.urandom(32),
+            purpose=TokenPurpose.EMAIL_VERIFICATION,
+            status=TokenStatus.REDEEMED,
+            created_at=created_at,
+        )
+        for created_at in created
+    ]
+    db_session.add_all(rows)
+    await db_session.commit()
+    return [row.id for row in rows]
+
+
+async def _partition_of(token_id) -> str | None:
+    async with AsyncSessionLocal() as session:
+        return await session.scalar(
+            select(text("tableoid::regclass::text"))
+            .select_from(UsedToken)
+            .where(UsedToken.id == token_id)
+        )
+
+
+async def _partition_names() -> list[str]:
+    async with AsyncSessionLocal() as session:
+        return [p.name for p in await token_partitions.list_partitions(session)]
+
+
+@pytest.mark.asyncio
+async def test_create_partitions_routes_new_rows(db_session):
+    """
+    Create the current and next two months, then insert a token.
+
+    Asserts:
+        - Three partitions are created, and none on a second run
+        - A new token lands in the current month's partition
+    """
+    current = month_start(datetime.now(timezone.utc))
+    expected = [partition_name(add_months(current, i)) for i in range(3)]
+
+    async with AsyncSessionLocal() as session:
+        assert await token_partitions.is_partitioned(session)
+        assert await token_partitions.create_partitions(session, 2) == expected
+    async with AsyncSessionLocal() as session:
+        assert await token_partitions.create_partitions(session, 2) == []
+
+    (token_id,) = await _insert_tokens(db_session, datetime.now(timezone.utc))
+    assert await _partition_of(token_id) == expected[0]
+
+
+@pytest.mark.asyncio
+async def test_stranded_rows_move_out_of_default(db_session):
+    """
+    Insert a token for a month without a partition, then create that month.
+
+    Asserts:
+        - The token first lands in the default partition
+        - Creating its month's partition moves the token there
+    """
+    future = add_months(month_start(datetime.now(timezone.utc)), 4)
+    (token_id,) = await _insert_tokens(db_session, future + timedelta(days=3))
+    assert await _partition_of(token_id) == "used_tokens_default"
+
+    async with AsyncSessionLocal() as session:
+        created = await token_partitions.create_partitions(session, 4)
+    assert partition_name(future) in created
+    assert await _partition_of(token_id) == partition_name(future)
+
+
+@pytest.mark.asyncio
+async def test_sweeper_retires_old_partitions(db_session, tmp_path):
+    """
+    Run a sweep over partitions spanning the last four months.
+
+    Asserts:
+        - Partitions ending before the retention cutoff are dropped
+        - Their rows are written to the archive segment
+        - The current month's partition and its rows are kept
+    """
+    now = datetime.now(timezone.utc)
+    old = add_months(month_start(now), -3)
+    async with AsyncSessionLocal() as session:
+        await token_partitions.create_partitions(session, 4, now=old)
+
+    old_ids = await _insert_tokens(db_session, old + timedelta(days=1), old)
+    (recent_id,) = await _insert_tokens(db_session, now)
+
+    sweeper = TokenSweeper(
+        session_factory=AsyncSessionLocal,
+        retention=timedelta(days=40),
+        archive_dir=tmp_path,
+        pause=0,
+    )
+    assert (await sweeper.run_once())["archived"] == 2
+
+    names = await _partition_names()
+    assert partition_name(old) not in names
+    assert partition_name(month_start(now)) in names
+    assert await _partition_of(recent_id) == partition_name(month_start(now))
+
+    (segment,) = tmp_path.glob("used_tokens-*.ndjson.gz")
+    with gzip.open(segment, "rt") as f:
+        archived = f.read()
+    assert all(str(token_id) in archived for token_id in old_ids)
+
+
+@pytest.mark.asyncio
+async def test_sweeper_skips_retirement_held_by_another_worker(db_session, tmp_path):
+    """
+    Retire partitions while another worker holds the retirement lock.
+
+    Asserts:
+        - The sweeper skips: nothing is archived and the partition stays
+        - Once the lock is released the partition is archived and dropped
+    """
+    old = add_months(month_start(datetime.now(timezone.utc)), -3)
+    async with AsyncSessionLocal() as session:
+        await token_partitions.create_partitions(session, 0, now=old)
+    await _insert_tokens(db_session, old)
+
+    sweeper = TokenSweeper(
+        session_factory=AsyncSessionLocal,
+        retention=timedelta(days=40),
+        archive_dir=tmp_path,
+        pause=0,
+    )
+    segment = tmp_path / "segment.ndjson.gz"
+
+    async with AsyncSessionLocal() as other_worker:
+        async with token_partitions.retirement_lock(other_worker) as acquired:
+            assert acquired
+            assert await sweeper.retire_partitions(segment) == 0
+            assert partition_name(old) in await _partition_names()
+            assert not segment.exists()
+
+    assert await sweeper.retire_partitions(segment) == 1
+    assert partition_name(old) not in await _partition_names()
+
+
+@pytest.mark.asyncio
+async def test_live_refresh_tokens_outlast_retention(db_session, tmp_path, monkeypatch):
+    """
+    Retire partitions past retention while refresh tokens live for 120 days.
+
+    Asserts:
+        - A partition whose live refresh token is still valid is kept
+        - So is the token row, even when retirement is asked for directly
+    """
+    monkeypatch.setattr(settings, "AUTH_REFRESH_DURATION", 120 * 24 * 60)
+    now = datetime.now(timezone.utc)
+    old = add_months(month_start(now), -3)
+    async with AsyncSessionLocal() as session:
+        await token_partitions.create_partitions(session, 0, now=old)
+
+    (token_id,) = await _insert_tokens(db_session, old)
+    await db_session.execute(
+        update(UsedToken)
+        .where(UsedToken.id == token_id)
+        .values(
+            purpose=TokenPurpose.REFRESH,
+            status=TokenStatus.ISSUED,
+            expires_at=old + timedelta(days=120),
+        )
+    )
+    await db_session.commit()
+
+    sweeper = TokenSweeper(
+        session_factory=AsyncSessionLocal,
+        retention=timedelta(days=40),
+        archive_dir=tmp_path,
+        pause=0,
+    )
+    assert await sweeper.retire_partitions(tmp_path / "segment.ndjson.gz") == 0
+    async with AsyncSessionLocal() as session:
+        assert await token_partitions.retire_partitions(session, before=now) == []
+
+    assert partition_name(old) in await _partition_names()
+    assert await _partition_of(token_id) == partition_name(old)
+
+
+@pytest.mark.asyncio
+async def test_retire_can_detach_only(db_session):
+    """
+    Retire an old partition without dropping it.
+
+    Asserts:
+        - The partition is no longer attached to `used_tokens`
+        - Its table and rows still exist
+    """
+    old = add_months(month_start(datetime.now(timezone.utc)), -2)
+    async with AsyncSessionLocal() as session:
+        await token_partitions.create_partitions(session, 0, now=old)
+    await _insert_tokens(db_session, old)
+
+    name = partition_name(old)
+    async with AsyncSessionLocal() as session:
+        retired = await token_partitions.retire_partitions(
+            session, before=add_months(old, 1), drop=False
+        )
+    assert retired == [name]
+    assert name not in await _partition_names()
+
+    async with AsyncSessionLocal() as session:
+        assert await session.scalar(text(f"SELECT count(*) FROM {name}")) == 1
+        await session.execute(text(f"DROP TABLE {name}"))
+        await session.commit()
@@ -0,0 +1,151 @@
+"""
+Integration tests for atomic one-time token redemption.
+
+These tests verify:
+- That a token is redeemed and its user verified in a single statement
+- That many concurrent redemptions of one token yield exactly one success
+- That JWT tokens staged for one user and purpose in the same second differ
+"""
+
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+
+import pytest
+from conftest import AsyncSessionLocal, unique_email, unique_username
+from sqlalchemy import func, select
+from test_email_validation_flow import register_test_user
+
+from app.core.config import settings
+from app.core.security import hash_token
+from app.core.tokens import base
+from app.core.tokens.base import redeem_token
+from app.core.tokens.email import get_email_token
+from app.core.tokens.purposes import TokenPurpose
+from app.core.tokens.status import TokenStatus
+from app.exceptions.handlers import TokenValidationError
+from app.models import UsedToken, User
+from app.services.email.verification import stage_token
+
+
+async def _redeem_in_own_session(token: str):
+    async with AsyncSessionLocal() as session:
+        try:
+            return await redeem_token(
+                token=token,
+                purpose=TokenPurpose.EMAIL_VERIFICATION,
+                secret=settings.EMAIL_TOKEN_SECRET,
+                db=session,
+            )
+        except TokenValidationError as e:
+            return e
+
+
+@pytest.mark.asyncio
+async def test_concurrent_redeems_succeed_once(
+    client, db_session, disable_real_emails: AsyncMock
+):
+    """
+    Fire many parallel redemptions of the same token.
+
+    Asserts:
+        - Exactly one redemption returns the user ID
+        - Every other redemption is rejected as already used
+        - The user ends up verified
+    """
+    token, user_id = await register_test_user(
+        client,
+        email=unique_email(),
+        username=unique_username(),
+        disable_real_emails=disable_real_emails,
+    )
+
+    results = await asyncio.gather(*(_redeem_in_own_session(token) for _ in range(25)))
+
+    successes = [r for r in results if not isinstance(r, TokenValidationError)]
+    failures = [r for r in results if isinstance(r, TokenValidationError)]
+
+    assert successes == [user_id]
+    assert len(failures) == 24
+    assert all(str(f) == "Token not found or already used" for f in failures)
+
+    stmt = (
+        select(User).where(User.id == user_id).execution_options(populate_existing=True)
+    )
+    result = await db_session.execute(stmt)
+    assert result.scalar_one().is_verified is True
+
+
+@pytest.mark.asyncio
+async def test_redeemed_token_cannot_be_reused(client, disable_real_emails: AsyncMock):
+    """
+    Redeem a token through the API twice.
+
+    Asserts:
+        - The first request succeeds
+        - The second request is rejected with a 400
+    """
+    token, _ = await register_test_user(
+        client,
+        email=unique_email(),
+        username=unique_username(),
+        disable_real_emails=disable_real_emails,
+    )
+
+    first = await client.get(f"/api/v1/routers/auth/verify?token={token}")
+    second = await client.get(f"/api/v1/routers/auth/verify?token={token}")
+
+    assert first.status_code == 200
+    assert second.status_code == 400
+    assert second.json()["message"] == "Token not found or already used"
+
+
+class _FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return datetime(2030, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.mark.asyncio
+async def test_tokens_staged_in_the_same_second_are_distinct(
+    client, db_session, disable_real_emails: AsyncMock, monkeypatch
+):
+    """
+    Stage two JWT verification tokens for one user with the clock frozen.
+
+    Asserts:
+        - The tokens differ, though their claims besides `jti` are identical
+        - Both rows commit
+    """
+    monkeypatch.setattr(settings, "ONE_TIME_TOKEN_FORMAT", "jwt")
+    monkeypatch.setattr(base, "datetime", _FrozenDatetime)
+    _, user_id = await register_test_user(
+        client,
+        email=unique_email(),
+        username=unique_username(),
+        disable_real_emails=disable_real_emails,
+    )
+
+    tokens = [get_email_token(user_id=user_id) for _ in range(2)]
+    for token in tokens:
+        stage_token(
+            user_id=user_id,
+            purpose=TokenPurpose.EMAIL_VERIFICATION,
+            token=token,
+            status=TokenStatus.ISSUED,
+            db=db_session,
+        )
+    await db_session.commit()
+
+    assert tokens[0] != tokens[1]
+    staged = await db_session.scalar(
+        select(func.count())
+        .select_from(UsedToken)
+        .where(
+            UsedToken.user_id == user_id,
+            UsedToken.token_hash.in_(
+                [hash_token(token, TokenPurpose.EMAIL_VERIFICATION) for token in tokens]
+            ),
+        )
+    )
+    assert staged == 2
@@ -0,0 +1,172 @@
+"""
+Integration tests for the batched token sweeper.
+
+These tests verify:
+- That overdue live verification tokens are expired and recent ones kept
+- That tokens with a stored expiry are expired by it, whatever their purpose
+- That terminal rows past retention are archived to NDJSON and deleted
+- That a pass is split into batches of the configured size
+"""
+
+import gzip
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from conftest import AsyncSessionLocal, unique_email, unique_username
+from sqlalchemy import select, update
+
+from app.core.tokens.purposes import TokenPurpose
+from app.core.tokens.status import TokenStatus
+from app.models import UsedToken, User
+from app.services.token_sweeper import TokenSweeper
+
+
+async def _user_with_tokens(db_session, *tokens: tuple[TokenStatus, timedelta]):
+    user = User(
+        username=unique_username(),
+        email=unique_email(),
+        display_name="Sweep User",
+        hashed_password="not-a-real-hash",
+    )
+    db_session.add(user)
+    await db_session.flush()
+
+    now = datetime.now(timezone.utc)
+    rows = [
+        UsedToken(
+            user_id=user.id,
+            token_hash=os.urandom(32),
+            purpose=TokenPurpose.EMAIL_VERIFICATION,
+            status=status,
+            created_at=now - age,
+        )
+        for status, age in tokens
+    ]
+    db_session.add_all(rows)
+    await db_session.commit()
+    return [row.id for row in rows]
+
+
+async def _statuses(ids) -> dict:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(UsedToken.id, UsedToken.status).where(UsedToken.id.in_(ids))
+        )
+        return dict(result.all())
+
+
+@pytest.mark.asyncio
+async def test_sweep_expires_and_archives(db_session, tmp_path):
+    """
+    Run a single pass over a mix of fresh, overdue and old rows.
+
+    Asserts:
+        - Overdue live tokens become EXPIRED, fresh ones stay ISSUED
+        - Old terminal rows are written to a gzip NDJSON segment and deleted
+        - Recent terminal rows are untouched
+    """
+    fresh, overdue, old_redeemed, recent_redeemed = await _user_with_tokens(
+        db_session,
+        (TokenStatus.ISSUED, timedelta(minutes=1)),
+        (TokenStatus.ISSUED, timedelta(days=2)),
+        (TokenStatus.REDEEMED, timedelta(days=60)),
+        (TokenStatus.REDEEMED, timedelta(days=1)),
+    )
+
+    sweeper = TokenSweeper(
+        session_factory=AsyncSessionLocal,
+        retention=timedelta(days=30),
+        archive_dir=tmp_path,
+        pause=0,
+    )
+    assert await sweeper.run_once() == {"expired": 1, "archived": 1}
+
+    assert await _statuses([fresh, overdue, old_redeemed, recent_redeemed]) == {
+        fresh: TokenStatus.ISSUED,
+        overdue: TokenStatus.EXPIRED,
+        recent_redeemed: TokenStatus.REDEEMED,
+    }
+
+    (segment,) = tmp_path.glob("used_tokens-*.ndjson.gz")
+    with gzip.open(segment, "rt") as f:
+        records = [json.loads(line) for line in f]
+    assert [r["id"] for r in records] == [str(old_redeemed)]
+    assert records[0]["status"] == "REDEEMED"
+
+
+@pytest.mark.asyncio
+async def test_sweep_expires_by_stored_expiry(db_session, tmp_path):
+    """
+    Expire password reset tokens by their `expires_at`.
+
+    Asserts:
+        - A live token past its `expires_at` becomes EXPIRED
+        - A live token of the same age still inside its lifetime is kept
+    """
+    past_due, still_valid = await _user_with_tokens(
+        db_session,
+        (TokenStatus.ISSUED, timedelta(minutes=40)),
+        (TokenStatus.ISSUED, timedelta(minutes=40)),
+    )
+    now = datetime.now(timezone.utc)
+    async with AsyncSessionLocal() as session:
+        for token_id, expires_at in (
+            (past_due, now - timedelta(minutes=1)),
+            (still_valid, now + timedelta(minutes=10)),
+        ):
+            await session.execute(
+                update(UsedToken)
+                .where(UsedToken.id == token_id)
+                .values(purpose=TokenPurpose.PASSWORD_RESET, expires_at=expires_at)
+            )
+        await session.commit()
+
+    sweeper = TokenSweeper(
+        session_factory=AsyncSessionLocal, archive_dir=tmp_path, pause=0
+    )
+    assert await sweeper.expire_batch() == 1
+    assert await _statuses([past_due, still_valid]) == {
+        past_due: TokenStatus.EXPIRED,
+        still_valid: TokenStatus.ISSUED,
+    }
+
+
+@pytest.mark.asyncio
+async def test_sweep_runs_in_batches(db_session, tmp_path):
+    """
+    Archive more rows than fit in one batch.
+
+    Asserts:
+        - Every eligible row is archived across several batches
+        - Each batch is appended to the same segment file
+        - `max_batches` bounds the work done in one pass
+    """
+    ids = await _user_with_tokens(
+        db_session, *[(TokenStatus.EXPIRED, timedelta(days=90))] * 7
+    )
+
+    limited = TokenSweeper(
+        session_factory=AsyncSessionLocal,
+        batch_size=3,
+        max_batches=2,
+        retention=timedelta(days=30),
+        archive_dir=tmp_path / "first",
+        pause=0,
+    )
+    assert (await limited.run_once())["archived"] == 6
+
+    sweeper = TokenSweeper(
+        session_factory=AsyncSessionLocal,
+        batch_size=3,
+        retention=timedelta(days=30),
+        archive_dir=tmp_path / "second",
+        pause=0,
+    )
+    assert (await sweeper.run_once())["archived"] == 1
+    assert await _statuses(ids) == {}
+
+    (segment,) = (tmp_path / "first").glob("*.ndjson.gz")
+    with gzip.open(segment, "rt") as f:
+        assert len(f.readlines()) == 6
@@ -1,8 +1,25 @@
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
 import pytest
 from pydantic_core.core_schema import JsonSchema
+from sqlalchemy import func, select, update
 
+from app.core.config import settings
+from app.core.tokens.base import create_token, decode_token
+from app.core.tokens.purposes import TokenPurpose
 from app.models import User
-from app.tests.integration.conftest import unique_email, unique_username
+from app.services import auth, login_guard
+from app.services.auth import SessionAuthenticator
+from app.services.login_guard import LoginGuard
+from app.tests.integration.conftest import (
+    AsyncSessionLocal,
+    unique_email,
+    unique_username,
+)
 
 
 @pytest.mark.asyncio
@@ -51,6 +68,390 @@ async def test_user_invalid_credentials(client, credentials):
     assert login_response.status_code in [401, 403]
 
 
+@pytest.mark.asyncio
+async def test_repeated_failures_skip_password_check(client, monkeypatch):
+    user = await create_test_user(client)
+    credentials = {"identifier": user["email"], "password": "wrong"}
+
+    for _ in range(5):
+        response = await client.post("/api/v1/routers/auth/login", json=credentials)
+        assert response.status_code == 401
+
+    # The sixth failure starts the backoff
+    response = await client.post("/api/v1/routers/auth/login", json=credentials)
+    assert response.status_code == 401
+
+    check_mock = AsyncMock(return_value=True)
+    monkeypatch.setattr("app.api.v1.routers.login.check_password_async", check_mock)
+
+    credentials["password"] = user["password"]
+    response = await client.post("/api/v1/routers/auth/login", json=credentials)
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert response.json()["errorCode"] == "TOO_MANY_ATTEMPTS"
+    check_mock.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_failures_are_persisted_and_lock_account(client, monkeypatch):
+    guard = LoginGuard(
+        session_factory=AsyncSessionLocal, free_attempts=100, lock_threshold=3
+    )
+    monkeypatch.setattr(login_guard, "_login_guard", guard)
+
+    user = await create_test_user(client)
+    credentials = {"identifier": user["user_name"], "password": "wrong"}
+
+    for _ in range(2):
+        response = await client.post("/api/v1/routers/auth/login", json=credentials)
+        assert response.status_code == 401
+    assert await guard.flush() == 1
+
+    async with AsyncSessionLocal() as session:
+        stored = await session.scalar(
+            select(User).where(User.username == user["user_name"])
+        )
+    assert stored.failed_login_count == 2
+    assert stored.last_failed_login_at is not None
+    assert not stored.is_locked
+
+    response = await client.post("/api/v1/routers/auth/login", json=credentials)
+    assert response.status_code == 401
+    await guard.flush()
+
+    credentials["password"] = user["password"]
+    response = await client.post("/api/v1/routers/auth/login", json=credentials)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+
+    async with AsyncSessionLocal() as session:
+        stored = await session.scalar(
+            select(User).where(User.username == user["user_name"])
+        )
+    assert stored.locked_until is not None
+    assert stored.failed_login_count == 0
+    assert not stored.is_locked
+
+
+@pytest.mark.asyncio
+async def test_lockout_expires(client, monkeypatch):
+    guard = LoginGuard(
+        session_factory=AsyncSessionLocal, free_attempts=100, lock_threshold=2
+    )
+    monkeypatch.setattr(login_guard, "_login_guard", guard)
+
+    user = await create_test_user(client)
+    credentials = {"identifier": user["email"], "password": "wrong"}
+    for _ in range(2):
+        await client.post("/api/v1/routers/auth/login", json=credentials)
+    await guard.flush()
+
+    credentials["password"] = user["password"]
+    response = await client.post("/api/v1/routers/auth/login", json=credentials)
+    assert response.status_code == 429
+
+    # Let the lock run out
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(User)
+            .where(User.email == user["email"])
+            .values(locked_until=func.now() - timedelta(seconds=1))
+        )
+        await session.commit()
+
+    response = await client.post("/api/v1/routers/auth/login", json=credentials)
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_unlock_lifts_lockout(client, monkeypatch):
+    guard = LoginGuard(
+        session_factory=AsyncSessionLocal, free_attempts=100, lock_threshold=1
+    )
+    monkeypatch.setattr(login_guard, "_login_guard", guard)
+
+    user = await create_test_user(client)
+    credentials = {"identifier": user["email"], "password": "wrong"}
+    await client.post("/api/v1/routers/auth/login", json=credentials)
+    await guard.flush()
+
+    async with AsyncSessionLocal() as session:
+        user_id = await session.scalar(
+            select(User.id).where(User.email == user["email"])
+        )
+    assert await guard.unlock(user_id)
+
+    credentials["password"] = user["password"]
+    response = await client.post("/api/v1/routers/auth/login", json=credentials)
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_concurrent_burst_is_capped_at_free_attempts(client, monkeypatch):
+    guard = LoginGuard(session_factory=AsyncSessionLocal)
+    monkeypatch.setattr(login_guard, "_login_guard", guard)
+
+    user = SimpleNamespace(
+        id=uuid4(),
+        hashed_password="unused",
+        is_locked=False,
+        locked_until=None,
+        failed_login_count=0,
+    )
+    monkeypatch.setattr(
+        "app.api.v1.routers.login.get_user_by_email", AsyncMock(return_value=user)
+    )
+
+    async def slow_wrong_password(**kwargs):
+        await asyncio.sleep(0.05)
+        return False
+
+    check_password = AsyncMock(side_effect=slow_wrong_password)
+    monkeypatch.setattr("app.api.v1.routers.login.check_password_async", check_password)
+
+    credentials = {"identifier": "victim@example.com", "password": "wrong"}
+    responses = await asyncio.gather(
+        *(
+            client.post("/api/v1/routers/auth/login", json=credentials)
+            for _ in range(20)
+        )
+    )
+
+    assert 0 < check_password.await_count <= settings.LOGIN_FREE_ATTEMPTS
+    assert any(response.status_code == 429 for response in responses)
+    assert guard._attempts["victim@example.com"].in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_successful_login_resets_failure_count(client, monkeypatch):
+    guard = LoginGuard(session_factory=AsyncSessionLocal)
+    monkeypatch.setattr(login_guard, "_login_guard", guard)
+
+    user = await create_test_user(client)
+    credentials = {"identifier": user["email"], "password": "wrong"}
+
+    response = await client.post("/api/v1/routers/auth/login", json=credentials)
+    assert response.status_code == 401
+    await guard.flush()
+
+    credentials["password"] = user["password"]
+    response = await client.post("/api/v1/routers/auth/login", json=credentials)
+    assert response.status_code == 200
+    assert await guard.flush() == 1
+
+    async with AsyncSessionLocal() as session:
+        stored = await session.scalar(select(User).where(User.email == user["email"]))
+    assert stored.failed_login_count == 0
+
+
+@pytest.mark.asyncio
+async def test_session_token_authenticates_requests(client):
+    user = await create_test_user(client)
+    credentials = {"identifier": user["email"], "password": user["password"]}
+    login_response = await client.post("/api/v1/routers/auth/login", json=credentials)
+    token = login_response.json()["sessionToken"]
+
+    response = await client.get(
+        "/api/v1/routers/auth/me", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+    assert response.json()["expiresAt"] > 0
+
+    async with AsyncSessionLocal() as session:
+        stored = await session.scalar(select(User).where(User.email == user["email"]))
+    assert response.json()["userId"] == str(stored.id)
+
+
+@pytest.mark.parametrize(
+    "header", [None, "Bearer", "Basic dXNlcjpwYXNz", "Bearer not.a.token"]
+)
+@pytest.mark.asyncio
+async def test_protected_route_rejects_missing_or_bad_tokens(client, header):
+    headers = {"Authorization": header} if header else {}
+    response = await client.get("/api/v1/routers/auth/me", headers=headers)
+
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Bearer"
+
+
+@pytest.mark.asyncio
+async def test_bumped_token_version_revokes_sessions(
+    client, monkeypatch, token_version_cache
+):
+    authenticator = SessionAuthenticator(check_version=True)
+    monkeypatch.setattr(auth, "_authenticator", authenticator)
+
+    user = await create_test_user(client)
+    credentials = {"identifier": user["email"], "password": user["password"]}
+    login_response = await client.post("/api/v1/routers/auth/login", json=credentials)
+    headers = {"Authorization": f"Bearer {login_response.json()['sessionToken']}"}
+
+    response = await client.get("/api/v1/routers/auth/me", headers=headers)
+    assert response.status_code == 200
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(User)
+            .where(User.email == user["email"])
+            .values(token_version=User.token_version + 1)
+        )
+        await session.commit()
+
+    # A bump made elsewhere is only seen once the cached version goes stale
+    response = await client.get("/api/v1/routers/auth/me", headers=headers)
+    assert response.status_code == 200
+
+    token_version_cache.clear()
+    response = await client.get("/api/v1/routers/auth/me", headers=headers)
+    assert response.status_code == 401
+
+
+async def login_with_refresh(client) -> dict:
+    user = await create_test_user(client)
+    credentials = {
+        "identifier": user["email"],
+        "password": user["password"],
+        "rememberMe": True,
+    }
+    response = await client.post("/api/v1/routers/auth/login", json=credentials)
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_refresh_rotates_tokens(client):
+    tokens = await login_with_refresh(client)
+
+    response = await client.post(
+        "/api/v1/routers/auth/refresh",
+        json={"refreshToken": tokens["refreshToken"]},
+    )
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refreshToken"] != tokens["refreshToken"]
+    assert rotated["sessionToken"] != tokens["sessionToken"]
+
+    headers = {"Authorization": f"Bearer {rotated['sessionToken']}"}
+    response = await client.get("/api/v1/routers/auth/me", headers=headers)
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_replayed_refresh_token_revokes_sessions(client):
+    tokens = await login_with_refresh(client)
+    refresh = "/api/v1/routers/auth/refresh"
+
+    response = await client.post(refresh, json={"refreshToken": tokens["refreshToken"]})
+    assert response.status_code == 200
+    rotated = response.json()
+
+    response = await client.post(refresh, json={"refreshToken": tokens["refreshToken"]})
+    assert response.status_code == 401
+
+    # The replay revoked the legitimate client's rotated token as well
+    response = await client.post(
+        refresh, json={"refreshToken": rotated["refreshToken"]}
+    )
+    assert response.status_code == 401
+
+
+async def untracked_refresh_token(client) -> str:
+    # Minted like refresh tokens were before they got a `used_tokens` row
+    tokens = await login_with_refresh(client)
+    claims = decode_token(
+        tokens["refreshToken"], TokenPurpose.REFRESH, settings.AUTH_REFRESH_TOKEN_SECRET
+    )
+    return create_token(
+        user_id=claims["sub"],
+        purpose=TokenPurpose.REFRESH,
+        expires_delta=timedelta(minutes=settings.AUTH_REFRESH_DURATION),
+        secret=settings.AUTH_REFRESH_TOKEN_SECRET,
+        version=int(claims["ver"]),
+    )
+
+
+@pytest.mark.asyncio
+async def test_untracked_refresh_token_is_accepted_once(client):
+    token = await untracked_refresh_token(client)
+    refresh = "/api/v1/routers/auth/refresh"
+
+    response = await client.post(refresh, json={"refreshToken": token})
+    assert response.status_code == 200
+    rotated = response.json()["refreshToken"]
+
+    response = await client.post(refresh, json={"refreshToken": token})
+    assert response.status_code == 401
+
+    # Replaying the recorded token revoked its successor like any other reuse
+    response = await client.post(refresh, json={"refreshToken": rotated})
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_untracked_refresh_token_rejected_after_transition(client, monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_REFRESH_ACCEPT_UNTRACKED", False)
+    token = await untracked_refresh_token(client)
+
+    response = await client.post(
+        "/api/v1/routers/auth/refresh", json={"refreshToken": token}
+    )
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_refresh_rejects_session_and_garbage_tokens(client):
+    tokens = await login_with_refresh(client)
+
+    for token in (tokens["sessionToken"], "not.a.token"):
+        response = await client.post(
+            "/api/v1/routers/auth/refresh", json={"refreshToken": token}
+        )
+        assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_refresh_storm_costs_one_lookup(client, monkeypatch, token_version_cache):
+    tokens = await login_with_refresh(client)
+    lookups = []
+    real_load = token_version_cache._load
+
+    async def counting_load(user_id):
+        lookups.append(user_id)
+        return await real_load(user_id)
+
+    monkeypatch.setattr(token_version_cache, "_load", counting_load)
+
+    for _ in range(5):
+        response = await client.post(
+            "/api/v1/routers/auth/refresh",
+            json={"refreshToken": tokens["refreshToken"]},
+        )
+        assert response.status_code == 200
+        tokens = response.json()
+    assert len(lookups) == 1
+
+
+@pytest.mark.asyncio
+async def test_logout_all_revokes_refresh_and_session_tokens(client, monkeypatch):
+    monkeypatch.setattr(
+        auth, "_authenticator", SessionAuthenticator(check_version=True)
+    )
+    tokens = await login_with_refresh(client)
+    headers = {"Authorization": f"Bearer {tokens['sessionToken']}"}
+
+    response = await client.post("/api/v1/routers/auth/logout-all", headers=headers)
+    assert response.status_code == 200
+
+    response = await client.post(
+        "/api/v1/routers/auth/refresh",
+        json={"refreshToken": tokens["refreshToken"]},
+    )
+    assert response.status_code == 401
+    response = await client.get("/api/v1/routers/auth/me", headers=headers)
+    assert response.status_code == 401
+
+
 async def create_test_user(client) -> dict:
     payload = {
         "email": unique_email(),
@@ -3,20 +3,24 @@ Integration tests for the user registration flow.
 
 These tests verify:
 - Successful user registration with valid input
+- Duplicate registrations rejected before password hashing
+- Registration writes all rows in one transaction without refreshes
 - Error responses for missing or incomplete payloads
 - Server-side validation feedback consistency
 """
 
 from datetime import datetime, timezone
+from unittest.mock import AsyncMock
 
 import pytest
-from conftest import unique_email, unique_username
-from sqlalchemy import select
+from conftest import deliver_outbox, engine_test, unique_email, unique_username
+from sqlalchemy import event, select
 
 from app.constants.messages import Registration
+from app.core.outbox import OutboxStatus
 from app.core.tokens.purposes import TokenPurpose
 from app.core.tokens.status import TokenStatus
-from app.models import UsedToken, User
+from app.models import EmailOutbox, UsedToken, User
 
 
 @pytest.mark.asyncio
@@ -26,7 +30,8 @@ async def test_api_auth_register(client, db_session):
 
     Asserts:
         - HTTP 200 response
-        - Email verification trigger
+        - Verification email queued in the outbox
+        - Token issued once the outbox is delivered
         - User ID returned
     """
     payload = {
@@ -66,7 +71,24 @@ async def test_api_auth_register(client, db_session):
     assert token.purpose == TokenPurpose.EMAIL_VERIFICATION
     assert token.created_at < datetime.now(tz=timezone.utc)
     assert token.redeemed_at is None
-    assert token.status == TokenStatus.ISSUED
+    assert token.status == TokenStatus.PENDING
+
+    # The email is queued in the outbox, not sent inline
+    stmt = select(EmailOutbox).where(EmailOutbox.user_id == user.id)
+    result = await db_session.execute(stmt)
+    entry = result.scalar_one()
+    assert entry.status == OutboxStatus.PENDING
+
+    # Delivering the outbox entry issues the token
+    assert await deliver_outbox() == 1
+
+    stmt = (
+        select(UsedToken)
+        .where(UsedToken.user_id == user.id)
+        .execution_options(populate_existing=True)
+    )
+    result = await db_session.execute(stmt)
+    assert result.scalar_one().status == TokenStatus.ISSUED
 
 
 @pytest.mark.parametrize(
@@ -96,6 +118,32 @@ async def test_register_missing_fields(client, missing_field):
     assert data["field"] == missing_field
 
 
+@pytest.mark.asyncio
+async def test_register_statement_count(client):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split(None, 1)[0].upper())
+
+    payload = {
+        "email": unique_email(),
+        "password": "ValidPassword1!",
+        "user_name": unique_username(),
+        "display_name": "Test User",
+    }
+
+    event.listen(engine_test.sync_engine, "before_cursor_execute", record)
+    try:
+        response = await client.post("/api/v1/routers/auth/register", json=payload)
+    finally:
+        event.remove(engine_test.sync_engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    # Duplicate pre-check, then one INSERT each for user, token and outbox
+    # entry, all flushed by a single commit; no refresh SELECTs
+    assert statements == ["SELECT", "INSERT", "INSERT", "INSERT"]
+
+
 @pytest.mark.parametrize("dupe", ["email", "user_name"])
 @pytest.mark.asyncio
 async def test_duplicate_registration(client, dupe, db_session):
@@ -131,6 +179,34 @@ async def test_duplicate_registration(client, dupe, db_session):
     assert data["errorMessage"] == Registration.DUPE_USER
 
 
+@pytest.mark.parametrize("dupe", ["email", "user_name"])
+@pytest.mark.asyncio
+async def test_duplicate_registration_skips_hashing(client, dupe, monkeypatch):
+    payload = {
+        "email": unique_email(),
+        "password": "ValidPassword1!",
+        "user_name": unique_username(),
+        "display_name": "Test User",
+    }
+
+    response = await client.post("/api/v1/routers/auth/register", json=payload)
+    assert response.status_code == 200
+
+    hash_mock = AsyncMock()
+    monkeypatch.setattr("app.services.user.hash_password_async", hash_mock)
+
+    dupe_payload = dict(payload)
+    if dupe == "email":
+        dupe_payload["user_name"] = unique_username()
+        dupe_payload["email"] = payload["email"].upper()
+    else:
+        dupe_payload["email"] = unique_email()
+
+    response = await client.post("/api/v1/routers/auth/register", json=dupe_payload)
+    assert response.status_code == 409
+    hash_mock.assert_not_awaited()
+
+
 @pytest.mark.parametrize(
     "field,value,expected_field",
     [
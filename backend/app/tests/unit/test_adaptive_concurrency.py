@@ -0,0 +1,183 @@
+"""
+Unit tests for the adaptive concurrency limit and load shedding middleware.
+
+These tests verify:
+- That the limit grows additively while latency stays near the baseline
+- That slow or failed responses back the limit off, once per baseline
+- That requests over the limit are shed with 503 and Retry-After
+- That unlisted paths such as /health are never limited
+- That early 4xx answers stay out of the latency baseline, while 401s count
+"""
+
+import asyncio
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.core.concurrency import AdaptiveConcurrency, AdaptiveConcurrencyMiddleware
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _limiter(clock=None, **overrides) -> AdaptiveConcurrency:
+    options = dict(
+        initial_limit=4, min_limit=1, max_limit=10, tolerance=2.0, backoff=0.5
+    )
+    options.update(overrides)
+    return AdaptiveConcurrency("/test", clock=clock or FakeClock(), **options)
+
+
+def test_limit_grows_while_latency_is_steady():
+    limiter = _limiter()
+
+    for _ in range(8):
+        for _ in range(4):
+            assert limiter.try_acquire()
+        for _ in range(4):
+            limiter.release(0.1)
+
+    assert limiter.limit > 5
+    assert limiter.in_flight == 0
+
+
+def test_limit_does_not_grow_when_mostly_idle():
+    limiter = _limiter()
+
+    for _ in range(20):
+        assert limiter.try_acquire()
+        limiter.release(0.1)
+
+    assert limiter.limit == 4
+
+
+def test_slow_response_backs_off_once_per_baseline():
+    clock = FakeClock()
+    limiter = _limiter(clock=clock, initial_limit=8)
+    limiter.try_acquire()
+    limiter.release(0.1)
+
+    for _ in range(3):
+        limiter.try_acquire()
+        limiter.release(1.0)
+    assert limiter.limit == 4
+
+    clock.now += 0.2
+    limiter.try_acquire()
+    limiter.release(1.0)
+    assert limiter.limit == 2
+
+
+def test_overloaded_response_backs_off_and_respects_floor():
+    clock = FakeClock()
+    limiter = _limiter(clock=clock, initial_limit=2)
+
+    for _ in range(3):
+        limiter.try_acquire()
+        limiter.release(0.1, overloaded=True)
+        clock.now += 1
+
+    assert limiter.limit == 1
+
+
+def test_unsampled_release_keeps_baseline():
+    limiter = _limiter()
+    limiter.try_acquire()
+    limiter.release(0.2)
+
+    limiter.try_acquire()
+    limiter.release(None)
+
+    assert limiter.baseline == 0.2
+    assert limiter.in_flight == 0
+
+
+def _app(release: asyncio.Event, limit: int) -> AdaptiveConcurrencyMiddleware:
+    async def login(request):
+        await release.wait()
+        return JSONResponse({"ok": True})
+
+    async def health(request):
+        return JSONResponse({"status": "ok"})
+
+    async def bad(request):
+        return JSONResponse({"error": "bad"}, status_code=422)
+
+    async def denied(request):
+        return JSONResponse({"error": "denied"}, status_code=401)
+
+    app = Starlette(
+        routes=[
+            Route("/login", login, methods=["POST"]),
+            Route("/health", health),
+            Route("/bad", bad, methods=["POST"]),
+            Route("/denied", denied, methods=["POST"]),
+        ]
+    )
+    middleware = AdaptiveConcurrencyMiddleware(app, paths=["/login", "/bad", "/denied"])
+    for limiter in middleware.limits.values():
+        limiter.limit = float(limit)
+    return middleware
+
+
+@pytest.mark.asyncio
+async def test_middleware_sheds_over_limit_and_never_limits_health():
+    release = asyncio.Event()
+    app = _app(release, limit=1)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        first = asyncio.create_task(client.post("/login"))
+        while app.limits["/login"].in_flight == 0:
+            await asyncio.sleep(0)
+
+        shed = await client.post("/login")
+        health = await client.get("/health")
+
+        release.set()
+        admitted = await first
+
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"] == "1"
+    assert shed.json()["errorCode"] == "SERVER_BUSY"
+    assert health.status_code == 200
+    assert admitted.status_code == 200
+    assert app.limits["/login"].in_flight == 0
+    assert "/health" not in app.limits
+
+
+@pytest.mark.asyncio
+async def test_middleware_does_not_sample_early_client_errors():
+    app = _app(asyncio.Event(), limit=4)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.post("/bad")
+
+    assert response.status_code == 422
+    assert app.limits["/bad"].baseline is None
+    assert app.limits["/bad"].in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_middleware_samples_failed_logins():
+    app = _app(asyncio.Event(), limit=4)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.post("/denied")
+
+    assert response.status_code == 401
+    assert app.limits["/denied"].baseline is not None
+    assert app.limits["/denied"].in_flight == 0
@@ -0,0 +1,46 @@
+"""
+Unit tests for the Bloom filter used to screen identifier lookups.
+
+These tests verify:
+- That every inserted key is reported as present (no false negatives)
+- That the observed false-positive rate stays near the configured target
+- That sizing follows the requested capacity and error rate
+"""
+
+import pytest
+
+from app.core.bloom import BloomFilter
+
+
+def test_no_false_negatives():
+    bloom = BloomFilter(capacity=5000, error_rate=0.01)
+    keys = [f"e:user{i}@example.com" for i in range(5000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+
+
+def test_false_positive_rate_near_target():
+    bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+    for i in range(10_000):
+        bloom.add(f"u:member{i}")
+
+    probes = 20_000
+    hits = sum(f"u:stranger{i}" in bloom for i in range(probes))
+
+    assert hits / probes < 0.02
+    assert bloom.false_positive_rate == pytest.approx(0.01, rel=0.5)
+
+
+def test_add_reports_new_keys():
+    bloom = BloomFilter(capacity=100, error_rate=0.01)
+
+    assert bloom.add("u:alice") is True
+    assert bloom.add("u:alice") is False
+    assert bloom.count == 1
+
+
+def test_invalid_error_rate():
+    with pytest.raises(ValueError):
+        BloomFilter(capacity=100, error_rate=1.5)
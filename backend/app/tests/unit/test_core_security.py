@@ -5,6 +5,7 @@ These tests verify:
 - That hashed passwords validate correctly
 - That incorrect or tampered hashes fail safely
 - That legacy hashes trigger rehash detection
+- That binary token digests match their hex form
 """
 
 import pytest
@@ -117,3 +118,17 @@ def test_needs_rehash_true_on_weak_hash():
     weak_hash = weak_hasher.hash("StrongPass1!")
 
     assert security.needs_rehash(weak_hash) is True
+
+
+def test_hash_token_matches_hash_str():
+    """
+    Ensure the stored binary token digest is the hex digest in raw form.
+
+    Asserts:
+        hash_token returns 32 bytes equal to the decoded hash_str output.
+    """
+    digest = security.hash_token("some.jwt.value", "email_verification")
+
+    assert len(digest) == 32
+    assert digest.hex() == security.hash_str("some.jwt.value", "email_verification")
+    assert digest != security.hash_token("some.jwt.value", "password_reset")
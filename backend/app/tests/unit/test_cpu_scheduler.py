@@ -0,0 +1,160 @@
+"""
+Unit tests for the weighted fair CPU scheduler.
+
+These tests verify:
+- That free slots are granted immediately and queued jobs run by weight
+- That full lanes and unmeetable deadlines are rejected up front
+- That jobs whose deadline passed while queued are rejected, not run
+- That cancelled jobs neither run nor leak a slot
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.cpu_scheduler import CpuScheduler, Lane
+from app.exceptions.handlers import HashingUnavailableError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _scheduler(slots=1, clock=None, **overrides) -> CpuScheduler:
+    lanes = {
+        "login": Lane("login", weight=3, max_queue=10, deadline=5.0),
+        "register": Lane("register", weight=1, max_queue=10, deadline=5.0),
+    }
+    for name, changes in overrides.items():
+        for key, value in changes.items():
+            setattr(lanes[name], key, value)
+    return CpuScheduler(slots, lanes=lanes, clock=clock or FakeClock())
+
+
+async def _hold(scheduler, lane, order, release: asyncio.Event):
+    async with scheduler.slot(lane):
+        order.append(lane)
+        await release.wait()
+
+
+async def _run(scheduler, lane, order):
+    async with scheduler.slot(lane):
+        order.append(lane)
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_queued_jobs_share_slots_by_weight():
+    scheduler = _scheduler()
+    order, release = [], asyncio.Event()
+    blocker = asyncio.create_task(_hold(scheduler, "register", [], release))
+    await _settle()
+
+    tasks = [
+        asyncio.create_task(_run(scheduler, lane, order))
+        for lane in ["register"] * 4 + ["login"] * 6
+    ]
+    await _settle()
+    assert scheduler.queued == 10
+
+    release.set()
+    await asyncio.gather(blocker, *tasks)
+    assert order[:4] == ["login", "login", "login", "register"]
+    assert order.count("login") == 6 and scheduler.queued == 0
+    assert scheduler._free == 1
+
+
+@pytest.mark.asyncio
+async def test_full_lane_is_rejected_immediately():
+    scheduler = _scheduler(register={"max_queue": 1})
+    release = asyncio.Event()
+    blocker = asyncio.create_task(_hold(scheduler, "login", [], release))
+    await _settle()
+    queued = asyncio.create_task(_run(scheduler, "register", []))
+    await _settle()
+
+    with pytest.raises(HashingUnavailableError):
+        async with scheduler.slot("register"):
+            pass
+
+    # Other lanes still queue
+    login = asyncio.create_task(_run(scheduler, "login", []))
+    await _settle()
+    release.set()
+    await asyncio.gather(blocker, queued, login)
+
+
+@pytest.mark.asyncio
+async def test_unmeetable_deadline_is_rejected_up_front():
+    scheduler = _scheduler(register={"deadline": 1.0})
+    scheduler.service_time = 0.4
+    release = asyncio.Event()
+    blocker = asyncio.create_task(_hold(scheduler, "login", [], release))
+    await _settle()
+    queued = [asyncio.create_task(_run(scheduler, "register", [])) for _ in range(2)]
+    await _settle()
+
+    # Third in line: 3 * 0.4s > 1s
+    with pytest.raises(HashingUnavailableError):
+        async with scheduler.slot("register"):
+            pass
+    assert scheduler.queued == 2
+
+    release.set()
+    await asyncio.gather(blocker, *queued)
+
+
+@pytest.mark.asyncio
+async def test_job_past_deadline_is_not_run():
+    clock = FakeClock()
+    scheduler = _scheduler(clock=clock, register={"deadline": 1.0})
+    order, release = [], asyncio.Event()
+    blocker = asyncio.create_task(_hold(scheduler, "login", [], release))
+    await _settle()
+    late = asyncio.create_task(_run(scheduler, "register", order))
+    await _settle()
+
+    clock.now = 2.0
+    release.set()
+    await blocker
+    with pytest.raises(HashingUnavailableError):
+        await late
+    assert order == [] and scheduler._free == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_jobs_do_not_leak_slots():
+    scheduler = _scheduler()
+    release = asyncio.Event()
+    blocker = asyncio.create_task(_hold(scheduler, "login", [], release))
+    await _settle()
+    waiting = asyncio.create_task(_run(scheduler, "register", []))
+    await _settle()
+
+    waiting.cancel()
+    await _settle()
+    assert scheduler.queued == 0
+
+    release.set()
+    await blocker
+    assert scheduler._free == 1
+
+    # Granted, then cancelled before it could resume
+    release.clear()
+    blocker = asyncio.create_task(_hold(scheduler, "login", [], release))
+    await _settle()
+    granted = asyncio.create_task(_run(scheduler, "register", []))
+    await _settle()
+    release.set()
+    await blocker
+    granted.cancel()
+    await asyncio.gather(granted, return_exceptions=True)
+    assert scheduler._free == 1
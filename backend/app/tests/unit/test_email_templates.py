@@ -0,0 +1,82 @@
+"""
+Unit tests for email template rendering and message assembly.
+
+These tests verify:
+- That both variants render from the compiled registry
+- That templates are compiled once and reused across renders
+- That only requested variants are rendered
+- That rendered bodies form a multipart/alternative message
+"""
+
+import pytest
+
+from app.services.email.template import (
+    TemplateRegistry,
+    build_email_message,
+    get_template_registry,
+    render_dual_template,
+)
+
+CONTEXT = {
+    "display_name": "Tom & Jerry",
+    "email": "tom@example.com",
+    "verification_url": "https://example.com/verify-email?token=abc",
+}
+
+
+def test_render_dual_template_escapes_html_only():
+    html_body, text_body = render_dual_template("verification", CONTEXT)
+
+    assert "Tom &amp; Jerry" in html_body
+    assert "Tom & Jerry" in text_body
+    assert CONTEXT["verification_url"] in text_body
+
+
+def test_registry_compiles_once():
+    registry = get_template_registry()
+    registry.render("verification", CONTEXT)
+
+    compiled = registry._templates["verification.html"]
+    registry.render("verification", CONTEXT)
+
+    assert registry._templates["verification.html"] is compiled
+    assert get_template_registry() is registry
+
+
+def test_render_only_requested_variants():
+    rendered = TemplateRegistry().render("verification", CONTEXT, variants=("txt",))
+
+    assert list(rendered) == ["txt"]
+
+
+def test_missing_template_raises():
+    with pytest.raises(ValueError, match="No templates found"):
+        render_dual_template("does_not_exist", CONTEXT)
+
+
+def test_build_multipart_alternative_message():
+    html_body, text_body = render_dual_template("verification", CONTEXT)
+
+    message = build_email_message(
+        subject="Subject",
+        sender="Nox <noreply@example.com>",
+        recipient="tom@example.com",
+        html_body=html_body,
+        text_body=text_body,
+    )
+
+    assert message.get_content_type() == "multipart/alternative"
+    parts = [part.get_content_type() for part in message.iter_parts()]
+    assert parts == ["text/plain", "text/html"]
+
+
+def test_build_html_only_message():
+    message = build_email_message(
+        subject="Subject",
+        sender="noreply@example.com",
+        recipient="tom@example.com",
+        html_body="<p>hi</p>",
+        text_body=None,
+    )
+
+    assert message.get_content_type() == "text/html"
@@ -0,0 +1,101 @@
+"""
+Unit tests for Argon2 parameter calibration.
+
+These tests verify:
+- That calibration picks the strongest parameters within the latency target
+- That the security floor holds even when the host is too slow for the target
+- That parameters round-trip through the shared file, and files below the
+  floor are ignored
+"""
+
+import json
+
+from app.core.config import settings
+from app.core.hash_calibration import (
+    Argon2Params,
+    calibrate,
+    load_params,
+    max_memory_kib,
+    save_params,
+)
+
+
+def _linear_cost(ms_per_pass_per_mib: float):
+    """Fake host where hash time is linear in time_cost and memory."""
+    measured = []
+
+    def measure(params: Argon2Params) -> float:
+        measured.append(params)
+        mib = params.memory_cost / 1024
+        return params.time_cost * mib * ms_per_pass_per_mib / 1000
+
+    return measure, measured
+
+
+def test_memory_ceiling_shares_budget_across_cores(monkeypatch):
+    monkeypatch.setattr(settings, "HASH_POOL_MEMORY_BUDGET_MB", 512)
+    monkeypatch.setattr(settings, "ARGON2_MAX_MEMORY_KIB", 262144)
+
+    assert max_memory_kib(1) == 262144
+    assert max_memory_kib(8) == 65536
+    assert max_memory_kib(6) == 65536  # rounded down to a power of two
+    assert max_memory_kib(1024) == settings.ARGON2_MIN_MEMORY_KIB
+
+
+def test_calibrate_fills_target(monkeypatch):
+    monkeypatch.setattr(settings, "HASH_POOL_MEMORY_BUDGET_MB", 512)
+    measure, _ = _linear_cost(ms_per_pass_per_mib=0.5)
+
+    params = calibrate(target_ms=250, cpu_count=8, measure=measure)
+
+    # 64 MiB fits all 8 cores; 0.5 ms per pass per MiB allows 7 passes
+    assert (params.memory_cost, params.time_cost, params.parallelism) == (
+        65536,
+        7,
+        4,
+    )
+    assert params.hash_ms <= 250
+    assert params.cpu_count == 8
+
+
+def test_calibrate_shrinks_memory_before_floor(monkeypatch):
+    monkeypatch.setattr(settings, "HASH_POOL_MEMORY_BUDGET_MB", 512)
+    measure, measured = _linear_cost(ms_per_pass_per_mib=3)
+
+    params = calibrate(target_ms=250, cpu_count=2, measure=measure)
+
+    assert [p.memory_cost for p in measured[:3]] == [262144, 131072, 65536]
+    assert params.memory_cost == 32768
+    assert params.time_cost == settings.ARGON2_MIN_TIME_COST
+    assert params.meets_floor()
+
+
+def test_calibrate_never_goes_below_floor(monkeypatch):
+    measure, _ = _linear_cost(ms_per_pass_per_mib=100)
+
+    params = calibrate(target_ms=50, cpu_count=1, measure=measure)
+
+    assert params.memory_cost == settings.ARGON2_MIN_MEMORY_KIB
+    assert params.time_cost == settings.ARGON2_MIN_TIME_COST
+    assert params.hash_ms > 50
+
+
+def test_params_round_trip(tmp_path):
+    path = tmp_path / "argon2_params.json"
+    params = Argon2Params(4, 65536, 2, hash_ms=180.0, cpu_count=2)
+
+    save_params(params, path)
+
+    assert load_params(path) == params
+    assert not list(tmp_path.glob(".*.tmp"))
+
+
+def test_load_ignores_missing_and_weak_files(tmp_path):
+    path = tmp_path / "argon2_params.json"
+    assert load_params(path) is None
+
+    path.write_text(json.dumps({"time_cost": 1, "memory_cost": 8192, "parallelism": 1}))
+    assert load_params(path) is None
+
+    path.write_text("not json")
+    assert load_params(path) is None
@@ -0,0 +1,71 @@
+"""
+Unit tests for the password hashing process pool.
+
+These tests verify:
+- That async hashing and verification round-trip through worker processes
+- That the pool is sized within the configured memory budget
+- That a saturated pool rejects new work instead of queueing it
+"""
+
+import asyncio
+import time
+
+import pytest
+
+import app.core.security as security
+from app.core.hash_pool import HashPool, compute_pool_size, shutdown_hash_pool
+from app.exceptions.handlers import HashingUnavailableError
+
+
+@pytest.mark.asyncio
+async def test_async_hash_round_trip():
+    """
+    Ensure a password hashed in the pool verifies in the pool.
+
+    Asserts:
+        - The correct password verifies
+        - A wrong password does not
+    """
+    try:
+        hashed = await security.hash_password_async("StrongPass1!")
+
+        assert await security.check_password_async("StrongPass1!", hashed) is True
+        assert await security.check_password_async("WrongPass1!", hashed) is False
+    finally:
+        shutdown_hash_pool()
+
+
+def test_pool_size_respects_memory_budget(monkeypatch):
+    """
+    Ensure the worker count never exceeds what the memory budget allows.
+
+    Asserts:
+        - A 1 GiB per-hash cost with a 512 MiB budget still yields one worker
+        - A 64 MiB per-hash cost with a 128 MiB budget yields at most two
+    """
+    monkeypatch.setattr("app.core.hash_pool.settings.HASH_POOL_MEMORY_BUDGET_MB", 512)
+    assert compute_pool_size(memory_cost=1024 * 1024) == 1
+
+    monkeypatch.setattr("app.core.hash_pool.settings.HASH_POOL_MEMORY_BUDGET_MB", 128)
+    assert compute_pool_size(memory_cost=65536) <= 2
+
+
+@pytest.mark.asyncio
+async def test_saturated_pool_rejects_work():
+    """
+    Ensure jobs beyond workers + queue are rejected immediately.
+
+    Asserts:
+        HashingUnavailableError is raised while the only slot is busy.
+    """
+    pool = HashPool(max_workers=1, max_queue=0)
+    try:
+        busy = asyncio.create_task(pool.run(time.sleep, 1))
+        await asyncio.sleep(0)
+
+        with pytest.raises(HashingUnavailableError):
+            await pool.run(time.sleep, 0)
+
+        await busy
+    finally:
+        pool.shutdown()
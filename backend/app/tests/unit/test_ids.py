@@ -0,0 +1,42 @@
+"""
+Unit tests for time-ordered ID generation.
+
+These tests verify:
+- That generated IDs are RFC 9562 version 7 UUIDs
+- That IDs sort in generation order, even within one millisecond
+- That the embedded timestamp reflects the generation time
+"""
+
+import time
+import uuid
+
+from app.core import ids
+from app.core.ids import uuid7, uuid7_timestamp
+
+
+def test_version_and_variant():
+    value = uuid7()
+
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+
+
+def test_ids_are_monotonic():
+    values = [uuid7() for _ in range(10_000)]
+
+    assert values == sorted(values)
+    assert len(set(values)) == len(values)
+
+
+def test_monotonic_when_clock_steps_back(monkeypatch):
+    first = uuid7()
+    monkeypatch.setattr(ids.time, "time_ns", lambda: 0)
+
+    assert uuid7() > first
+
+
+def test_embedded_timestamp():
+    before = time.time()
+    value = uuid7()
+
+    assert before - 0.001 <= uuid7_timestamp(value) <= time.time() + 0.001
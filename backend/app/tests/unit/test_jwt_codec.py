@@ -0,0 +1,133 @@
+"""
+Unit tests for the HS256 JWT codec.
+
+These tests verify:
+- That tokens are byte-identical to, and interchangeable with, python-jose's
+- That forged, malformed and non-HS256 tokens are rejected
+- That `exp` and `nbf` are enforced, with optional leeway
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from jose import jwt
+
+from app.core.tokens.codec import HS256Codec, JWTDecodeError, b64url_encode, get_codec
+
+SECRET = "unit-test-secret"
+
+
+def _claims(**overrides) -> dict:
+    claims = {
+        "sub": "9f1c2d3e-0000-7000-8000-000000000001",
+        "exp": int(time.time()) + 600,
+        "purpose": "email_verification",
+        "jti": "abc123",
+    }
+    claims.update(overrides)
+    return claims
+
+
+def test_matches_jose_encoding():
+    claims = _claims(exp=datetime.now(timezone.utc) + timedelta(minutes=5))
+    assert HS256Codec(SECRET).encode(claims) == jwt.encode(
+        claims, SECRET, algorithm="HS256"
+    )
+
+
+def test_decodes_jose_tokens():
+    claims = _claims(ver="3")
+    token = jwt.encode(claims, SECRET, algorithm="HS256")
+    assert HS256Codec(SECRET).decode(token) == claims
+
+
+def test_jose_decodes_codec_tokens():
+    claims = _claims()
+    token = HS256Codec(SECRET).encode(claims)
+    assert jwt.decode(token, SECRET, algorithms=["HS256"]) == claims
+
+
+def test_accepts_reordered_hs256_header():
+    claims = _claims()
+    token = jwt.encode(claims, SECRET, algorithm="HS256", headers={"kid": "k1"})
+    assert HS256Codec(SECRET).decode(token) == claims
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        jwt.encode(_claims(), "other-secret", algorithm="HS256"),
+        jwt.encode(_claims(), SECRET, algorithm="HS512"),
+        "not.a.token",
+        "only.two",
+        "a.b.c.d",
+        "",
+    ],
+    ids=["wrong-secret", "hs512", "garbage", "two-segments", "four-segments", "empty"],
+)
+def test_rejects_invalid_tokens(token):
+    with pytest.raises(JWTDecodeError):
+        HS256Codec(SECRET).decode(token)
+
+
+def test_rejects_alg_none():
+    header = b64url_encode(b'{"alg":"none","typ":"JWT"}')
+    payload = HS256Codec(SECRET).encode(_claims()).split(".")[1]
+    with pytest.raises(JWTDecodeError):
+        HS256Codec(SECRET).decode(f"{header}.{payload}.")
+
+
+def test_rejects_tampered_payload():
+    header, _, signature = HS256Codec(SECRET).encode(_claims()).split(".")
+    forged = b64url_encode(b'{"sub":"someone-else","exp":9999999999}')
+    with pytest.raises(JWTDecodeError):
+        HS256Codec(SECRET).decode(f"{header}.{forged}.{signature}")
+
+
+def test_rejects_non_object_payload():
+    codec = HS256Codec(SECRET, require_exp=False)
+    header = HS256Codec(SECRET).encode(_claims()).split(".")[0]
+    payload = b64url_encode(b"[1,2,3]")
+    signature = b64url_encode(codec._sign(f"{header}.{payload}".encode()))
+    with pytest.raises(JWTDecodeError, match="JSON object"):
+        codec.decode(f"{header}.{payload}.{signature}")
+
+
+def test_expiry_and_leeway():
+    now = time.time()
+    token = HS256Codec(SECRET).encode(_claims(exp=int(now) - 5))
+
+    with pytest.raises(JWTDecodeError, match="expired"):
+        HS256Codec(SECRET).decode(token, now=now)
+    assert HS256Codec(SECRET, leeway=30).decode(token, now=now)["jti"] == "abc123"
+
+
+def test_not_before():
+    now = time.time()
+    token = HS256Codec(SECRET).encode(_claims(nbf=int(now) + 60))
+
+    with pytest.raises(JWTDecodeError, match="not yet valid"):
+        HS256Codec(SECRET).decode(token, now=now)
+    assert HS256Codec(SECRET).decode(token, now=now + 61)
+
+
+def test_exp_is_required_by_default():
+    claims = _claims()
+    del claims["exp"]
+    token = HS256Codec(SECRET).encode(claims)
+
+    with pytest.raises(JWTDecodeError, match="no expiration"):
+        HS256Codec(SECRET).decode(token)
+    assert HS256Codec(SECRET, require_exp=False).decode(token) == claims
+
+
+def test_rejects_non_numeric_exp():
+    token = HS256Codec(SECRET).encode(_claims(exp="tomorrow"))
+    with pytest.raises(JWTDecodeError, match="must be a number"):
+        HS256Codec(SECRET).decode(token)
+
+
+def test_get_codec_is_cached_per_secret():
+    assert get_codec(SECRET) is get_codec(SECRET)
+    assert get_codec(SECRET) is not get_codec("another-secret")
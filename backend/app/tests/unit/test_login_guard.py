@@ -0,0 +1,139 @@
+"""
+Unit tests for the per-identifier login guard.
+
+These tests verify:
+- That free attempts pass and further failures back off exponentially
+- That failures outside the sliding window no longer count
+- That a successful login clears the identifier
+- That attempts in flight count against the free allowance until released
+- That the number of tracked identifiers is bounded
+"""
+
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.exceptions.handlers import LoginThrottledError
+from app.services.login_guard import LoginGuard
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def guard(clock):
+    return LoginGuard(
+        window=600,
+        free_attempts=3,
+        base_delay=2,
+        max_delay=60,
+        max_entries=100,
+        clock=clock,
+    )
+
+
+def test_backoff_starts_after_free_attempts(guard, clock):
+    for _ in range(4):
+        guard.check("alice")
+        guard.record_failure("alice")
+        guard.release("alice")
+
+    with pytest.raises(LoginThrottledError) as exc:
+        guard.check("alice")
+    assert exc.value.retry_after == 2
+
+    clock.now += 2
+    guard.check("alice")
+    guard.record_failure("alice")
+    guard.release("alice")
+
+    with pytest.raises(LoginThrottledError) as exc:
+        guard.check("alice")
+    assert exc.value.retry_after == 4
+
+
+def test_backoff_is_capped(guard, clock):
+    for _ in range(20):
+        guard.record_failure("alice")
+
+    with pytest.raises(LoginThrottledError) as exc:
+        guard.check("alice")
+    assert exc.value.retry_after == 60
+
+
+def test_failures_expire_from_window(guard, clock):
+    for _ in range(3):
+        guard.record_failure("alice")
+
+    clock.now += 601
+    guard.record_failure("alice")
+
+    guard.check("alice")
+
+
+def test_identifiers_are_independent(guard):
+    for _ in range(5):
+        guard.record_failure("alice")
+
+    guard.check("bob")
+
+
+def test_success_clears_identifier(guard):
+    user = SimpleNamespace(id=uuid4(), failed_login_count=4)
+    for _ in range(4):
+        guard.record_failure("alice", user.id)
+
+    guard.record_success("alice", user)
+
+    guard.check("alice")
+    assert guard._pending_failures == {}
+    assert guard._pending_resets == {user.id}
+
+
+def test_tracked_identifiers_are_bounded(guard):
+    for i in range(150):
+        guard.record_failure(f"user{i}")
+
+    assert len(guard._attempts) == 100
+    assert "user0" not in guard._attempts
+
+
+def test_attempts_in_flight_use_up_free_allowance(guard):
+    for _ in range(3):
+        guard.check("alice")
+
+    with pytest.raises(LoginThrottledError) as exc:
+        guard.check("alice")
+    assert exc.value.retry_after == 1
+
+    guard.release("alice")
+    guard.check("alice")
+
+
+def test_recent_failures_leave_one_attempt_at_a_time(guard, clock):
+    for _ in range(3):
+        guard.check("alice")
+        guard.record_failure("alice")
+        guard.release("alice")
+
+    guard.check("alice")
+    with pytest.raises(LoginThrottledError):
+        guard.check("alice")
+
+
+def test_release_forgets_idle_identifiers(guard):
+    guard.check("alice")
+    guard.release("alice")
+
+    assert "alice" not in guard._attempts
@@ -0,0 +1,76 @@
+"""
+Unit tests for the event loop lag monitor.
+
+These tests verify:
+- That lag samples are summarized as percentiles over the recent window
+- That a blocking callback is detected and its stack logged once
+- That a stall is caught however it lines up with the probe interval
+"""
+
+import asyncio
+import time
+
+import pytest
+from loguru import logger
+
+from app.core.loop_monitor import LoopMonitor
+
+
+def test_percentiles_cover_recent_window():
+    monitor = LoopMonitor(interval=0.1, threshold_ms=100, window=100)
+    assert monitor.percentiles() == {}
+
+    for ms in range(1, 201):
+        monitor.record(ms / 1000)
+
+    # Only the last 100 samples (101..200 ms) count
+    result = monitor.percentiles()
+    assert result["max"] == pytest.approx(0.2)
+    assert result["0.5"] == pytest.approx(0.1505, abs=1e-3)
+    assert result["0.99"] == pytest.approx(0.199, abs=1e-3)
+
+
+def blocking_call():
+    time.sleep(0.3)
+
+
+@pytest.mark.asyncio
+async def test_blocking_callback_stack_is_logged():
+    messages = []
+    sink = logger.add(messages.append, level="WARNING", format="{message}")
+    monitor = LoopMonitor(interval=0.01, threshold_ms=50)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        blocking_call()
+        await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+        logger.remove(sink)
+
+    stalls = [m for m in messages if "Event loop blocked" in m]
+    assert len(stalls) == 1
+    assert "blocking_call" in stalls[0]
+    assert monitor.percentiles()["max"] >= 0.25
+
+
+@pytest.mark.asyncio
+async def test_stall_right_after_a_tick_is_logged():
+    messages = []
+    sink = logger.add(messages.append, level="WARNING", format="{message}")
+    # A probe interval far above the threshold must not hide the stall
+    monitor = LoopMonitor(interval=1.0, threshold_ms=100)
+    monitor.start()
+    try:
+        last_tick = monitor._last_tick
+        while monitor._last_tick == last_tick:
+            await asyncio.sleep(0.001)
+        time.sleep(0.15)
+        await asyncio.sleep(0)
+    finally:
+        await monitor.stop()
+        logger.remove(sink)
+
+    stalls = [m for m in messages if "Event loop blocked" in m]
+    assert len(stalls) == 1
+    assert "test_stall_right_after_a_tick_is_logged" in stalls[0]
@@ -0,0 +1,107 @@
+"""
+Unit tests for the session token authenticator.
+
+These tests verify:
+- That verified claims are served from the cache until the token expires
+- That the cache is bounded and evicts the least recently used token
+- That invalid, expired and non-session tokens are rejected with a 401
+"""
+
+import uuid
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.tokens.base import create_token
+from app.core.tokens.purposes import TokenPurpose
+from app.services import auth
+from app.services.auth import SessionAuthenticator
+
+
+def _session_token(
+    user_id=None, minutes: float = 15, purpose=TokenPurpose.SESSION, version=0
+) -> str:
+    return create_token(
+        user_id=user_id or uuid.uuid4(),
+        purpose=purpose,
+        expires_delta=timedelta(minutes=minutes),
+        secret=settings.AUTH_SESSION_TOKEN_SECRET,
+        version=version,
+    )
+
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    calls = []
+    real_decode = auth.decode_token
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(auth, "decode_token", counting_decode)
+    return calls
+
+
+def test_verify_returns_principal():
+    user_id = uuid.uuid4()
+    user = SessionAuthenticator().verify(_session_token(user_id, version=3))
+
+    assert user.id == user_id
+    assert user.token_version == 3
+    assert user.expires_at > 0
+
+
+def test_cache_hit_skips_decoding(decode_calls):
+    authenticator = SessionAuthenticator()
+    token = _session_token()
+
+    first = authenticator.verify(token)
+    assert authenticator.verify(token) is first
+    assert len(decode_calls) == 1
+
+
+def test_expired_cache_entry_is_reverified(decode_calls, monkeypatch):
+    authenticator = SessionAuthenticator()
+    token = _session_token()
+    user = authenticator.verify(token)
+
+    monkeypatch.setattr(auth, "time", SimpleNamespace(time=lambda: user.expires_at))
+    authenticator.verify(token)
+    assert len(decode_calls) == 2
+
+
+def test_cache_evicts_least_recently_used(decode_calls):
+    authenticator = SessionAuthenticator(max_entries=2)
+    first, second, third = (_session_token() for _ in range(3))
+
+    authenticator.verify(first)
+    authenticator.verify(second)
+    authenticator.verify(first)
+    authenticator.verify(third)  # evicts `second`
+
+    authenticator.verify(first)
+    authenticator.verify(second)
+    assert decode_calls == [first, second, third, second]
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        _session_token(minutes=-1),
+        _session_token(purpose=TokenPurpose.REFRESH),
+        "not.a.token",
+    ],
+    ids=["expired", "refresh-token", "garbage"],
+)
+def test_rejects_invalid_tokens(token):
+    authenticator = SessionAuthenticator()
+    with pytest.raises(HTTPException) as exc_info:
+        authenticator.verify(token)
+
+    assert exc_info.value.status_code == 401
+    assert exc_info.value.headers["WWW-Authenticate"] == "Bearer"
+    assert not authenticator._cache
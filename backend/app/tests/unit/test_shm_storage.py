@@ -0,0 +1,123 @@
+"""
+Unit tests for the shared-memory rate limit storage.
+
+These tests verify:
+- That fixed and sliding window counters follow the limits contract
+- That the previous window is weighted into the sliding count
+- That separate processes share and atomically update the same counters
+- That expired slots are swept and reused
+"""
+
+import multiprocessing
+from types import SimpleNamespace
+
+import pytest
+from limits import RateLimitItemPerMinute
+from limits.errors import ConfigurationError
+from limits.storage import storage_from_string
+from limits.strategies import SlidingWindowCounterRateLimiter
+
+from app.core import shm_storage
+from app.core.shm_storage import SharedMemoryStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return SharedMemoryStorage(f"shm://{tmp_path}/limits?buckets=64&stripes=8")
+
+
+def test_scheme_is_registered(tmp_path):
+    storage = storage_from_string(f"shm://{tmp_path}/limits")
+    assert isinstance(storage, SharedMemoryStorage)
+
+
+def test_fixed_window_counter(storage):
+    assert storage.incr("k", expiry=60) == 1
+    assert storage.incr("k", expiry=60, amount=2) == 3
+    assert storage.get("k") == 3
+    assert storage.get_expiry("k") > 0
+
+    storage.clear("k")
+    assert storage.get("k") == 0
+
+
+def test_sliding_window_limit(storage):
+    limiter = SlidingWindowCounterRateLimiter(storage)
+    limit = RateLimitItemPerMinute(5)
+
+    assert all(limiter.hit(limit, "client") for _ in range(5))
+    assert not limiter.hit(limit, "client")
+    assert limiter.hit(limit, "other")
+
+
+def test_previous_window_is_weighted(storage, monkeypatch):
+    now = [600.0]
+    monkeypatch.setattr(shm_storage, "time", SimpleNamespace(time=lambda: now[0]))
+
+    for _ in range(10):
+        assert storage.acquire_sliding_window_entry("k", limit=10, expiry=60)
+
+    # A quarter into the next window, 75% of the previous count still applies
+    now[0] = 675.0
+    previous, previous_ttl, current, _ = storage.get_sliding_window("k", 60)
+    assert (previous, current) == (10, 0)
+    assert previous_ttl == pytest.approx(45)
+
+    assert storage.acquire_sliding_window_entry("k", limit=10, expiry=60, amount=3)
+    assert not storage.acquire_sliding_window_entry("k", limit=10, expiry=60)
+
+
+def test_geometry_mismatch_is_rejected(tmp_path):
+    SharedMemoryStorage(f"shm://{tmp_path}/limits?buckets=64")
+
+    with pytest.raises(ConfigurationError):
+        SharedMemoryStorage(f"shm://{tmp_path}/limits?buckets=128")
+
+
+def test_sweep_frees_expired_slots(storage, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(shm_storage, "time", SimpleNamespace(time=lambda: now[0]))
+
+    for i in range(20):
+        storage.incr(f"key{i}", expiry=10)
+
+    now[0] += 11
+    assert storage.sweep() == 20
+    assert storage.get("key0") == 0
+
+
+def test_full_bucket_evicts_soonest_expiry(tmp_path):
+    storage = SharedMemoryStorage(f"shm://{tmp_path}/limits?buckets=1&bucket_size=2")
+
+    storage.incr("short", expiry=10)
+    storage.incr("long", expiry=1000)
+    storage.incr("new", expiry=100)
+
+    assert storage.get("short") == 0
+    assert storage.get("long") == 1
+    assert storage.get("new") == 1
+
+
+def _hammer(uri: str, hits: int, results) -> None:
+    storage = SharedMemoryStorage(uri)
+    granted = sum(
+        storage.acquire_sliding_window_entry("shared", limit=150, expiry=3600)
+        for _ in range(hits)
+    )
+    results.put(granted)
+
+
+def test_limits_are_shared_across_processes(tmp_path):
+    uri = f"shm://{tmp_path}/limits?buckets=64&stripes=8"
+    SharedMemoryStorage(uri)
+
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_hammer, args=(uri, 100, results)) for _ in range(4)]
+    for proc in procs:
+        proc.start()
+    granted = sum(results.get(timeout=30) for _ in procs)
+    for proc in procs:
+        proc.join(timeout=30)
+
+    assert granted == 150
@@ -0,0 +1,94 @@
+"""
+Unit tests for request metrics and multi-process metric aggregation.
+
+These tests verify:
+- That requests are timed by route template, method and status
+- That unmatched paths and unknown methods share bounded labels
+- That `/metrics` sums counters and live gauges across worker processes
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from prometheus_client import REGISTRY
+
+from app.core import telemetry
+from app.core.telemetry import UNMATCHED_ROUTE, RequestMetricsMiddleware
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+
+
+def _count(method: str, route: str, status: str) -> float:
+    value = REGISTRY.get_sample_value(
+        "nox_http_request_duration_seconds_count",
+        {"method": method, "route": route, "status": status},
+    )
+    return value or 0.0
+
+
+api = FastAPI()
+
+
+@api.get("/items/{item_id}")
+async def _item(item_id: str):
+    return {"id": item_id}
+
+
+app = RequestMetricsMiddleware(api)
+
+
+@pytest.mark.asyncio
+async def test_requests_are_timed_by_route_template():
+    before = _count("GET", "/items/{item_id}", "200")
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        for item_id in ("a", "b", "c"):
+            assert (await client.get(f"/items/{item_id}")).status_code == 200
+
+    assert _count("GET", "/items/{item_id}", "200") == before + 3
+    assert _count("GET", "/items/a", "200") == 0
+
+
+@pytest.mark.asyncio
+async def test_unmatched_paths_and_unknown_methods_are_bounded():
+    before_unmatched = _count("GET", UNMATCHED_ROUTE, "404")
+    before_other = _count("OTHER", "/items/{item_id}", "405")
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        await client.get("/random/path/1")
+        await client.get("/random/path/2")
+        await client.request("BREW", "/items/a")
+
+    assert _count("GET", UNMATCHED_ROUTE, "404") == before_unmatched + 2
+    assert _count("OTHER", "/items/{item_id}", "405") == before_other + 1
+
+
+def _worker(directory: Path, code: str) -> None:
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(directory)}
+    subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, check=True)
+
+
+def test_metrics_are_aggregated_across_processes(tmp_path, monkeypatch):
+    code = (
+        "from app.core.metrics import ADAPTIVE_CONCURRENCY_LIMIT, LIMITER_REJECTIONS\n"
+        "LIMITER_REJECTIONS.labels(limiter='rate_limit', route='/x').inc()\n"
+        "ADAPTIVE_CONCURRENCY_LIMIT.labels(route='/x').set(5)\n"
+    )
+    _worker(tmp_path, code)
+    _worker(tmp_path, code)
+
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    monkeypatch.setattr(telemetry, "_registry", None)
+    body = telemetry.metrics_endpoint(None).body.decode()
+
+    assert 'nox_limiter_rejections_total{limiter="rate_limit",route="/x"} 2.0' in body
+    assert 'nox_adaptive_concurrency_limit{route="/x"} 10.0' in body
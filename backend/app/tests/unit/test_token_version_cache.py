@@ -0,0 +1,102 @@
+"""
+Unit tests for the per-worker token version cache.
+
+These tests verify:
+- That cached versions are served until the TTL expires
+- That concurrent misses for one user share a single lookup
+- That a failed lookup propagates to every waiter and is not cached
+"""
+
+import asyncio
+import uuid
+
+import pytest
+
+from app.services.auth import TokenVersionCache, _VersionEntry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _cache(loads, clock=None, ttl=10, version=0, release=None):
+    clock = clock or FakeClock()
+    cache = TokenVersionCache(session_factory=None, ttl=ttl, clock=clock)
+
+    async def load(user_id):
+        loads.append(user_id)
+        if release is not None:
+            await release.wait()
+        return _VersionEntry(version, False, clock())
+
+    cache._load = load
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_serves_cached_version_until_ttl():
+    loads, clock = [], FakeClock()
+    cache = _cache(loads, clock=clock)
+    user_id = uuid.uuid4()
+
+    await cache.get(user_id)
+    clock.now = 9.9
+    await cache.get(user_id)
+    assert len(loads) == 1
+
+    clock.now = 10.0
+    await cache.get(user_id)
+    assert len(loads) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_lookup():
+    loads, release = [], asyncio.Event()
+    cache = _cache(loads, version=4, release=release)
+    user_id = uuid.uuid4()
+
+    waiters = [asyncio.create_task(cache.get(user_id)) for _ in range(50)]
+    await asyncio.sleep(0)
+    release.set()
+    entries = await asyncio.gather(*waiters)
+
+    assert loads == [user_id]
+    assert {entry.token_version for entry in entries} == {4}
+    assert not cache._inflight
+
+
+@pytest.mark.asyncio
+async def test_failed_lookup_reaches_all_waiters():
+    release = asyncio.Event()
+    cache = TokenVersionCache(session_factory=None, ttl=10)
+
+    async def failing_load(user_id):
+        await release.wait()
+        raise ConnectionError("database unavailable")
+
+    cache._load = failing_load
+    user_id = uuid.uuid4()
+    waiters = [asyncio.create_task(cache.get(user_id)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert not cache._entries and not cache._inflight
+
+
+@pytest.mark.asyncio
+async def test_evicts_least_recently_used():
+    loads = []
+    cache = _cache(loads)
+    cache.max_entries = 2
+    first, second, third = (uuid.uuid4() for _ in range(3))
+
+    for user_id in (first, second, first, third):
+        await cache.get(user_id)
+
+    assert list(cache._entries) == [first, third]
@@ -0,0 +1,64 @@
+"""
+Per-request overhead of the rate limit storages.
+
+Times `RateLimiter.hit` against slowapi's default in-process `memory://`
+storage and the host-wide `shm://` storage, for both the fixed window and
+the sliding window counter strategies, spreading hits over many client keys
+the way per-IP limits do.
+
+Run from the backend directory:
+    python -m benchmarks.bench_rate_limit [--hits 200000] [--keys 5000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from limits import RateLimitItemPerMinute
+from limits.storage import MemoryStorage
+from limits.strategies import FixedWindowRateLimiter, SlidingWindowCounterRateLimiter
+
+from app.core.shm_storage import SharedMemoryStorage
+
+
+def bench(strategy, storage, hits: int, keys: list[str]) -> float:
+    limiter = strategy(storage)
+    limit = RateLimitItemPerMinute(1_000_000)
+    n = len(keys)
+
+    start = time.perf_counter()
+    for i in range(hits):
+        limiter.hit(limit, keys[i % n])
+    return (time.perf_counter() - start) / hits * 1e6
+
+
+def main(hits: int, key_count: int) -> None:
+    keys = [f"10.0.{i // 256}.{i % 256}" for i in range(key_count)]
+
+    with tempfile.TemporaryDirectory(
+        dir="/dev/shm" if os.path.isdir("/dev/shm") else None
+    ) as tmp:
+        for label, strategy in (
+            ("fixed window", FixedWindowRateLimiter),
+            ("sliding window counter", SlidingWindowCounterRateLimiter),
+        ):
+            memory = bench(strategy, MemoryStorage(), hits, keys)
+            shared = bench(
+                strategy,
+                SharedMemoryStorage(f"shm://{tmp}/{strategy.__name__}"),
+                hits,
+                keys,
+            )
+            print(
+                f"{label:24s} memory:// {memory:6.2f} µs/hit   "
+                f"shm:// {shared:6.2f} µs/hit   (+{shared - memory:5.2f} µs)"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hits", type=int, default=200_000)
+    parser.add_argument("--keys", type=int, default=5000)
+    args = parser.parse_args()
+    main(args.hits, args.keys)
@@ -0,0 +1,107 @@
+"""
+SMTP delivery throughput: FastAPI-Mail vs. the pooled transport.
+
+Starts a local aiosmtpd sink and sends the same number of messages through
+`FastMail.send_message` (one SMTP session per message) and through
+`SMTPPool.send` (persistent sessions), then prints messages/second.
+
+Run from the backend directory:
+    python -m benchmarks.bench_smtp [--messages 500] [--pool-size 4]
+"""
+
+import argparse
+import asyncio
+import socket
+import time
+from email.message import EmailMessage
+
+from aiosmtpd.controller import Controller
+from fastapi_mail import ConnectionConfig, FastMail, MessageSchema, MessageType
+
+from app.core.smtp_pool import SMTPPool
+
+
+class _Sink:
+    async def handle_DATA(self, server, session, envelope):
+        return "250 OK"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def bench_fastmail(host: str, port: int, messages: int, concurrency: int):
+    mailer = FastMail(
+        ConnectionConfig(
+            MAIL_USERNAME="",
+            MAIL_PASSWORD="",
+            MAIL_PORT=port,
+            MAIL_SERVER=host,
+            MAIL_STARTTLS=False,
+            MAIL_SSL_TLS=False,
+            MAIL_FROM="noreply@example.com",
+            USE_CREDENTIALS=False,
+            VALIDATE_CERTS=False,
+        )
+    )
+    gate = asyncio.Semaphore(concurrency)
+
+    async def send(i: int):
+        async with gate:
+            await mailer.send_message(
+                MessageSchema(
+                    subject=f"Message {i}",
+                    recipients=[f"user{i}@example.com"],
+                    body="<p>hello</p>",
+                    subtype=MessageType.html,
+                )
+            )
+
+    start = time.perf_counter()
+    await asyncio.gather(*(send(i) for i in range(messages)))
+    return messages / (time.perf_counter() - start)
+
+
+async def bench_pool(host: str, port: int, messages: int, size: int):
+    pool = SMTPPool(host, port, size=size)
+
+    def build(i: int) -> EmailMessage:
+        message = EmailMessage()
+        message["Subject"] = f"Message {i}"
+        message["From"] = "noreply@example.com"
+        message["To"] = f"user{i}@example.com"
+        message.set_content("<p>hello</p>", subtype="html")
+        return message
+
+    start = time.perf_counter()
+    await asyncio.gather(*(pool.send(build(i)) for i in range(messages)))
+    rate = messages / (time.perf_counter() - start)
+    await pool.close()
+    return rate
+
+
+async def main(messages: int, pool_size: int) -> None:
+    controller = Controller(_Sink(), hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    try:
+        host, port = controller.hostname, controller.port
+        before = await bench_fastmail(host, port, messages, pool_size)
+        after = await bench_pool(host, port, messages, pool_size)
+    finally:
+        controller.stop()
+
+    print(f"messages:               {messages}")
+    print(f"concurrency/pool size:  {pool_size}")
+    print(f"FastMail (per-message): {before:8.1f} msg/s")
+    print(f"SMTPPool (persistent):  {after:8.1f} msg/s")
+    print(f"speed-up:               {after / before:8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--pool-size", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.messages, args.pool_size))
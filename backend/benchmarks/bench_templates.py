@@ -0,0 +1,66 @@
+"""
+Per-render cost of the verification email templates.
+
+Compares the previous approach (a fresh Jinja2 Environment per send, which
+re-reads and re-compiles both templates) with the compiled registry, and
+also reports the cost of assembling the multipart/alternative message.
+
+Run from the backend directory:
+    python -m benchmarks.bench_templates [--iterations 2000]
+"""
+
+import argparse
+import timeit
+
+from jinja2 import Environment, FileSystemLoader
+
+from app.services.email.template import (
+    DEFAULT_TEMPLATE_DIR,
+    build_email_message,
+    get_template_registry,
+    render_dual_template,
+)
+
+CONTEXT = {
+    "display_name": "Benchmark User",
+    "email": "bench@example.com",
+    "verification_url": "https://example.com/verify-email?token=" + "x" * 180,
+}
+
+
+def render_uncached() -> None:
+    env = Environment(
+        loader=FileSystemLoader(str(DEFAULT_TEMPLATE_DIR)), autoescape=True
+    )
+    env.get_template("verification.html").render(**CONTEXT)
+    env.get_template("verification.txt").render(**CONTEXT)
+
+
+def render_cached() -> None:
+    render_dual_template("verification", CONTEXT)
+
+
+def render_and_build() -> None:
+    html_body, text_body = render_dual_template("verification", CONTEXT)
+    build_email_message(
+        "Subject", "noreply@example.com", "a@example.com", html_body, text_body
+    )
+
+
+def main(iterations: int) -> None:
+    get_template_registry().compile_all()
+
+    for label, fn in (
+        ("fresh Environment per render", render_uncached),
+        ("compiled registry", render_cached),
+        ("registry + multipart build", render_and_build),
+    ):
+        seconds = min(timeit.repeat(fn, number=iterations, repeat=3))
+        print(f"{label:30s} {seconds / iterations * 1e6:10.1f} µs/render")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.iterations)
@@ -0,0 +1,84 @@
+"""
+Insert throughput and index growth: UUIDv4 vs UUIDv7 primary keys.
+
+Creates two scratch tables shaped like `used_tokens` in the database named
+by DATABASE_URL, bulk-inserts the same number of rows into each (one key
+version per table), and reports rows/second, primary key index size, and
+WAL generated. The scratch tables are dropped afterwards.
+
+Run from the backend directory:
+    python -m benchmarks.bench_uuid_insert [--rows 200000] [--batch 1000]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+import uuid
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.core.ids import uuid7
+
+DDL = """
+CREATE TABLE {table} (
+    id uuid PRIMARY KEY,
+    user_id uuid NOT NULL,
+    token_hash bytea NOT NULL,
+    created_at timestamptz NOT NULL DEFAULT now()
+)
+"""
+
+
+async def bench(conn, table: str, make_id, rows: int, batch: int) -> tuple:
+    await conn.execute(f"DROP TABLE IF EXISTS {table}")
+    await conn.execute(DDL.format(table=table))
+    user_id = uuid.uuid4()
+
+    wal_start = await conn.fetchval("SELECT pg_current_wal_insert_lsn()")
+    start = time.perf_counter()
+    for _ in range(rows // batch):
+        records = [(make_id(), user_id, os.urandom(32)) for _ in range(batch)]
+        await conn.executemany(
+            f"INSERT INTO {table} (id, user_id, token_hash) VALUES ($1, $2, $3)",
+            records,
+        )
+    elapsed = time.perf_counter() - start
+    wal_bytes = await conn.fetchval(
+        "SELECT pg_current_wal_insert_lsn() - $1::pg_lsn", wal_start
+    )
+    index_bytes = await conn.fetchval(
+        f"SELECT pg_relation_size('{table}_pkey'::regclass)"
+    )
+    await conn.execute(f"DROP TABLE {table}")
+    return rows / elapsed, index_bytes, int(wal_bytes)
+
+
+async def main(rows: int, batch: int) -> None:
+    dsn = (
+        make_url(settings.DATABASE_URL)
+        .set(drivername="postgresql")
+        .render_as_string(hide_password=False)
+    )
+    conn = await asyncpg.connect(dsn)
+    try:
+        for label, make_id in (("uuid4", uuid.uuid4), ("uuid7", uuid7)):
+            rate, index_bytes, wal_bytes = await bench(
+                conn, f"bench_ids_{label}", make_id, rows, batch
+            )
+            print(
+                f"{label}: {rate:9.0f} rows/s   pkey {index_bytes / 2**20:6.1f} MiB"
+                f"   WAL {wal_bytes / 2**20:7.1f} MiB"
+            )
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.batch))